@@ -0,0 +1,97 @@
+"""Benchmark: staged campaign execution vs. one customer at a time.
+
+Runs `CampaignService.execute_campaign` for --customers customers with the
+LLM call and the email sender replaced by sleeps of --generate-ms and
+--send-ms, first with one worker per stage and then with --workers
+generation and send workers each. The sequential loop took
+customers * (generate + send); the pipeline should approach the slower
+stage's time divided by its worker count.
+
+Usage: python benchmarks/bench_campaign_pipeline.py [--customers 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from marketing_bot.models.campaign import (  # noqa: E402
+    Campaign,
+    CampaignStatus,
+    CampaignType,
+)
+from marketing_bot.services import campaign_service as module  # noqa: E402
+
+
+def customers(count: int) -> list[dict]:
+    return [
+        {
+            "customer_id": f"C{i:08d}",
+            "email": f"user{i}@example.com",
+            "recency_days": i % 365,
+            "frequency": i % 50 + 1,
+            "monetary_value": float(i % 1000),
+        }
+        for i in range(count)
+    ]
+
+
+async def run(customer_data: list[dict], workers: int, queue_size: int) -> float:
+    campaign = Campaign(
+        name="Bench",
+        campaign_type=CampaignType.EMAIL,
+        segment_name="all",
+        product_name="Widget",
+        goal="sales",
+        offer="20% off",
+        status=CampaignStatus.ACTIVE,
+    )
+    repo = AsyncMock()
+    repo.get_by_id.return_value = campaign
+    service = module.CampaignService(repo, AsyncMock())
+    service.generation_workers = service.send_workers = workers
+    service.queue_size = queue_size
+
+    start = time.perf_counter()
+    results = await service.execute_campaign(campaign.id, customer_data)
+    elapsed = time.perf_counter() - start
+    assert len(results) == len(customer_data)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--generate-ms", type=float, default=20.0)
+    parser.add_argument("--send-ms", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--queue-size", type=int, default=64)
+    args = parser.parse_args()
+
+    module.generate_marketing_text = lambda prompt, tone: (
+        time.sleep(args.generate_ms / 1000) or "Subject: Offer\n\nBody"
+    )
+    module.send_email = lambda msg: time.sleep(args.send_ms / 1000)
+    module.logger.disabled = True
+    data = customers(args.customers)
+
+    sequential = args.customers * (args.generate_ms + args.send_ms) / 1000
+    bound = args.customers * max(args.generate_ms, args.send_ms) / 1000
+    print(f"sequential loop (computed): {sequential:.2f}s")
+    for workers in (1, args.workers):
+        elapsed = asyncio.run(run(data, workers, args.queue_size))
+        print(
+            f"{workers} worker(s) per stage: {elapsed:.2f}s "
+            f"(slower stage alone: {bound / workers:.2f}s, "
+            f"{args.customers / elapsed:,.0f} customers/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
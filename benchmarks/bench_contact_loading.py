@@ -0,0 +1,110 @@
+"""Benchmark: vectorized contact loading vs. the iterrows loader.
+
+Writes --contacts contacts over --segments segments to a contacts CSV, then
+times building the memory-mapped contact snapshot, loading all contacts,
+loading one segment and counting segments (the last three read the
+snapshot, as a second process opening the same data dir would). The
+old `iterrows` loader is measured at --legacy-contacts, since it takes
+minutes at a million rows.
+
+Usage: python benchmarks/bench_contact_loading.py [--contacts 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from marketing_bot.database.email_database import (  # noqa: E402
+    EmailContact,
+    EmailDatabase,
+)
+
+
+def write_contacts(path: Path, count: int, segments: int) -> None:
+    rng = np.random.default_rng(0)
+    ids = np.arange(count)
+    pd.DataFrame(
+        {
+            "email": [f"user{i}@example.com" for i in ids],
+            "name": [f"User {i}" for i in ids],
+            "segment": [f"segment_{i % segments}" for i in ids],
+            "customer_id": [f"C{i:08d}" for i in ids],
+            "recency_days": rng.integers(0, 365, count),
+            "frequency": rng.integers(1, 50, count),
+            "monetary_value": rng.random(count) * 1000,
+        }
+    ).to_csv(path, index=False)
+
+
+def legacy_load(path: Path) -> list:
+    df = pd.read_csv(path)
+    contacts = []
+    for _, row in df.iterrows():
+        contacts.append(
+            EmailContact(
+                email=row["email"],
+                name=row.get("name"),
+                segment=row.get("segment"),
+                customer_id=row.get("customer_id"),
+                recency_days=row.get("recency_days"),
+                frequency=row.get("frequency"),
+                monetary_value=row.get("monetary_value"),
+            )
+        )
+    return contacts
+
+
+def timed(label: str, fn, count: int) -> None:
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label}: {len(result)} in {elapsed:.3f}s "
+        f"({count / elapsed:,.0f} rows scanned/s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--contacts", type=int, default=1_000_000)
+    parser.add_argument("--segments", type=int, default=10)
+    parser.add_argument("--legacy-contacts", type=int, default=100_000)
+    parser.add_argument("--dir", type=Path, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        db = EmailDatabase(Path(tmp))
+        write_contacts(db.contacts_file, args.contacts, args.segments)
+
+        start = time.perf_counter()
+        db.snapshots.rebuild()
+        print(f"snapshot build: {time.perf_counter() - start:.3f}s")
+        db = EmailDatabase(Path(tmp))
+        timed("load_contacts", db.load_contacts, args.contacts)
+        timed(
+            "get_contacts_by_segment",
+            lambda: db.get_contacts_by_segment("segment_0"),
+            args.contacts,
+        )
+        timed(
+            "get_contact_count_by_segment",
+            db.get_contact_count_by_segment,
+            args.contacts,
+        )
+
+        legacy = Path(tmp) / "legacy.csv"
+        write_contacts(legacy, args.legacy_contacts, args.segments)
+        timed("legacy iterrows load", lambda: legacy_load(legacy), args.legacy_contacts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark: per-recipient MIME building vs. the pre-rendered campaign payload.
+
+Usage: python benchmarks/bench_mime_cache.py [--recipients 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from email import policy
+from email.message import EmailMessage
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from marketing_bot.senders.email_sender import prepare_email  # noqa: E402
+
+SUBJECT = "Your exclusive summer offer"
+BODY = "\n".join(
+    [
+        "Hello!",
+        "Take 20% off the Pro Widget 3000 for the next 72 hours.",
+        "Click the button below to claim your discount.",
+    ]
+    * 8
+)
+FROM = "Marketing Bot <marketing@example.com>"
+
+
+def naive(recipients: list[str]) -> int:
+    total = 0
+    for to in recipients:
+        message = EmailMessage()
+        message["From"] = FROM
+        message["To"] = to
+        message["Subject"] = SUBJECT
+        message.set_content(BODY)
+        message.add_alternative(BODY.replace("\n", "<br>"), subtype="html")
+        total += len(message.as_bytes(policy=policy.SMTP))
+    return total
+
+
+def cached(recipients: list[str]) -> int:
+    prepared = prepare_email(SUBJECT, BODY, "Marketing Bot", "marketing@example.com")
+    total = 0
+    for to in recipients:
+        total += len(prepared.render_for(to))
+    return total
+
+
+def measure(fn, recipients: list[str], alloc_sample: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    fn(recipients)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn(recipients[:alloc_sample])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=100_000)
+    parser.add_argument("--alloc-sample", type=int, default=10_000)
+    args = parser.parse_args()
+
+    recipients = [f"customer{i}@example{i % 50}.com" for i in range(args.recipients)]
+    print(f"{args.recipients} recipients, body {len(BODY)} chars")
+    for name, fn in (("per-recipient build", naive), ("pre-rendered", cached)):
+        elapsed, peak = measure(fn, recipients, args.alloc_sample)
+        print(
+            f"{name:>20}: {elapsed:8.2f}s  {args.recipients / elapsed:10.0f} msg/s  "
+            f"peak alloc ({args.alloc_sample} msgs) {peak / 1024:8.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark: partitioned append-only results vs. the single JSON array file.
+
+Fills a partitioned store with --results stored results over --campaigns
+campaigns, then times saving one campaign's new batch and reading one
+campaign back. The legacy whole-file rewrite is measured at
+--legacy-results, since every legacy save parses and rewrites the whole
+file.
+
+Usage: python benchmarks/bench_result_store.py [--results 10000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from marketing_bot.repositories.result_store import PartitionedResultStore  # noqa: E402
+
+
+def result(campaign_id: str, i: int) -> dict:
+    return {
+        "id": uuid.uuid4().hex,
+        "campaign_id": campaign_id,
+        "customer_id": f"C{i:08d}",
+        "content_type": "email",
+        "content": "Take 20% off the Pro Widget 3000 for the next 72 hours.",
+        "sent_at": "2025-01-01T00:00:00",
+        "status": "sent",
+        "metrics": None,
+    }
+
+
+def fill(store: PartitionedResultStore, campaigns: list[str], total: int) -> float:
+    chunk = 100_000
+    start = time.perf_counter()
+    written = 0
+    while written < total:
+        size = min(chunk, total - written)
+        store.append(
+            result(campaigns[(written + i) % len(campaigns)], written + i)
+            for i in range(size)
+        )
+        written += size
+    return time.perf_counter() - start
+
+
+def legacy_save(path: Path, batch: list[dict]) -> float:
+    start = time.perf_counter()
+    existing = json.loads(path.read_text())
+    existing.extend(batch)
+    path.write_text(json.dumps(existing, indent=2, default=str))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, default=10_000_000)
+    parser.add_argument("--campaigns", type=int, default=1_000)
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument("--legacy-results", type=int, default=200_000)
+    parser.add_argument("--dir", type=Path, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        root = Path(tmp)
+        store = PartitionedResultStore(root / "campaign_results")
+        campaigns = [uuid.uuid4().hex for _ in range(args.campaigns)]
+
+        elapsed = fill(store, campaigns, args.results)
+        print(
+            f"filled {args.results} results / {args.campaigns} campaigns in "
+            f"{elapsed:.1f}s ({args.results / elapsed:,.0f} results/s)"
+        )
+
+        target = campaigns[0]
+        batch = [result(target, i) for i in range(args.batch)]
+        start = time.perf_counter()
+        store.append(batch)
+        print(f"partitioned save of {args.batch}: {time.perf_counter() - start:.4f}s")
+
+        start = time.perf_counter()
+        count = sum(1 for _ in store.iter_results(target))
+        print(
+            f"partitioned read of one campaign ({count} results): "
+            f"{time.perf_counter() - start:.4f}s"
+        )
+
+        legacy = root / "campaign_results.json"
+        legacy.write_text(
+            json.dumps([result(target, i) for i in range(args.legacy_results)])
+        )
+        print(
+            f"legacy save of {args.batch} over {args.legacy_results} results: "
+            f"{legacy_save(legacy, batch):.4f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
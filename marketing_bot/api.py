@@ -1,29 +1,71 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
 
 import pandas as pd
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from marketing_bot.metrics.instruments import (
+    CONTENT_TYPE,
+    HTTP_REQUEST_DURATION,
+    REGISTRY,
+)
 from marketing_bot.metrics.tracker import MetricsTracker
-from marketing_bot.repositories.campaign_repository import CampaignRepository
+from marketing_bot.metrics.writer import shutdown_metrics_writers
+from marketing_bot.repositories.factory import (
+    AnyCampaignRepository,
+    get_campaign_repository,
+)
+from marketing_bot.repositories.pagination import DEFAULT_PAGE_SIZE
 from marketing_bot.services.campaign_service import CampaignService
 from marketing_bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Drain queued metrics before the worker exits
+    shutdown_metrics_writers()
+
+
 app = FastAPI(
     title="Marketing Bot API",
     description="Advanced marketing automation with AI-powered content generation",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.labels(
+            method=request.method,
+            # Route template keeps label cardinality bounded
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        ).observe(time.perf_counter() - started)
+
+
 # Dependency injection
-def get_campaign_repo() -> CampaignRepository:
-    return CampaignRepository()
+def get_campaign_repo() -> AnyCampaignRepository:
+    return get_campaign_repository()
 
 
 def get_metrics_tracker() -> MetricsTracker:
@@ -31,7 +73,7 @@ def get_metrics_tracker() -> MetricsTracker:
 
 
 def get_campaign_service(
-    repo: CampaignRepository = Depends(get_campaign_repo),
+    repo: AnyCampaignRepository = Depends(get_campaign_repo),
     metrics: MetricsTracker = Depends(get_metrics_tracker),
 ) -> CampaignService:
     return CampaignService(repo, metrics)
@@ -76,11 +118,19 @@ def healthz() -> Dict[str, str]:
 
 
 @app.get("/metrics")
-def get_metrics(
+def get_metrics() -> Response:
+    """Prometheus/OpenMetrics exposition of in-process instruments."""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/metrics/latency")
+def get_latency_percentiles(
+    operation: Optional[str] = None,
+    hours: float = 1.0,
     metrics: MetricsTracker = Depends(get_metrics_tracker),
-) -> Dict[str, Any]:
-    """Get system metrics."""
-    return {"message": "Metrics endpoint - implement as needed"}
+) -> dict:
+    """Latency percentiles (ms) per operation from the recorded histograms."""
+    return metrics.get_latency_percentiles(operation, hours)
 
 
 @app.post("/campaigns")
@@ -117,21 +167,71 @@ async def create_campaign(
 @app.get("/campaigns")
 async def list_campaigns(
     status: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    response_format: str = Query("json", alias="format"),
     service: CampaignService = Depends(get_campaign_service),
 ):
-    """List campaigns."""
+    """List campaigns a page at a time, or stream them all with format=ndjson."""
     try:
         from marketing_bot.models.campaign import CampaignStatus
 
         status_filter = CampaignStatus(status) if status else None
-        campaigns = await service.list_campaigns(status_filter)
-        return {"campaigns": [c.model_dump() for c in campaigns]}
+        if cursor:
+            # Reject bad or foreign cursors before streaming starts
+            service.check_campaigns_cursor(cursor)
+        if response_format == "ndjson":
+            return _ndjson(
+                c.model_dump()
+                async for c in service.iter_campaigns(status_filter, cursor)
+            )
+        campaigns, next_cursor = await service.list_campaigns_page(
+            status_filter, limit, cursor
+        )
+        return {
+            "campaigns": [c.model_dump() for c in campaigns],
+            "next_cursor": next_cursor,
+        }
 
     except Exception as e:
         logger.error(f"Failed to list campaigns: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/campaigns/{campaign_id}/results")
+async def list_campaign_results(
+    campaign_id: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    response_format: str = Query("json", alias="format"),
+    service: CampaignService = Depends(get_campaign_service),
+):
+    """Campaign results a page at a time, or streamed with format=ndjson."""
+    try:
+        if cursor:
+            service.check_results_cursor(cursor)
+        if response_format == "ndjson":
+            return _ndjson(service.iter_results(campaign_id, cursor))
+        results, next_cursor = await service.get_results_page(
+            campaign_id, limit, cursor
+        )
+        return {"results": results, "next_cursor": next_cursor}
+
+    except Exception as e:
+        logger.error(f"Failed to list results for {campaign_id}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _ndjson(records: AsyncIterator[dict]) -> StreamingResponse:
+    """Stream records one JSON document per line; nothing is buffered."""
+
+    async def lines() -> AsyncIterator[bytes]:
+        async for record in records:
+            yield json.dumps(record, default=str).encode("utf-8") + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @app.post("/campaigns/{campaign_id}/execute")
 async def execute_campaign(
     campaign_id: UUID,
@@ -142,7 +242,7 @@ async def execute_campaign(
     try:
         results = await service.execute_campaign(campaign_id, request.customer_data)
         return {
-            "results": [r.model_dump() for r in results],
+            "results": list(results.to_records()),
             "message": f"Campaign executed for {len(results)} customers",
         }
 
@@ -153,6 +253,21 @@ async def execute_campaign(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/campaigns/{campaign_id}/metrics/timeseries")
+async def campaign_timeseries(
+    campaign_id: UUID,
+    start: datetime,
+    end: Optional[datetime] = None,
+    resolution: Optional[str] = None,
+    metrics: MetricsTracker = Depends(get_metrics_tracker),
+):
+    """Outcome counts per minute/hour/day bucket, served from rollups."""
+    try:
+        return metrics.get_timeseries(campaign_id, start, end, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.post("/segment")
 def segment(req: SegmentRequest) -> List[Dict[str, Any]]:
     """Legacy segmentation endpoint."""
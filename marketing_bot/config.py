@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -17,6 +18,12 @@ class Settings(BaseSettings):
     EMAIL_SENDER_NAME: str = "Marketing Bot"
     EMAIL_SENDER_ADDR: str = "marketing@example.com"
 
+    # Storage backends
+    CAMPAIGN_REPOSITORY_BACKEND: str = "json"  # json, sqlite
+    CAMPAIGN_CACHE_SIZE: int = 1024
+    EMAIL_DB_BACKEND: str = "csv"  # csv, sqlite
+    EMAIL_MX_CACHE_FILE: str | None = None  # JSON {domain: mx hosts or false}
+
     # SMTP
     SMTP_HOST: str | None = None
     SMTP_PORT: int = 587
@@ -28,6 +35,45 @@ class Settings(BaseSettings):
     SENDGRID_API_KEY: str | None = None
     SENDGRID_FROM_EMAIL: str | None = None
 
+    # Per-recipient-domain send throttling
+    EMAIL_DOMAIN_RATE_PER_SEC: float = 5.0
+    EMAIL_DOMAIN_BURST: int = 10
+    EMAIL_DEFERRAL_BACKOFF_SEC: float = 60.0
+    EMAIL_MAX_DEFERRALS: int = 3
+
+    # Social publishing
+    SOCIAL_API_BASE_URL: str | None = None
+    SOCIAL_RATE_LIMIT_PER_SEC: float = 1.0
+    SOCIAL_MAX_CONCURRENCY: int = 4
+    SELENIUM_MAX_BROWSERS: int = 2
+    TWITTER_BEARER_TOKEN: str | None = None
+    FACEBOOK_PAGE_ID: str | None = None
+    FACEBOOK_PAGE_TOKEN: str | None = None
+    INSTAGRAM_USER_ID: str | None = None
+    INSTAGRAM_ACCESS_TOKEN: str | None = None
+    LINKEDIN_AUTHOR_URN: str | None = None
+    LINKEDIN_ACCESS_TOKEN: str | None = None
+
+    # Campaign execution pipeline
+    CAMPAIGN_GENERATION_WORKERS: int = Field(8, ge=1)
+    CAMPAIGN_SEND_WORKERS: int = Field(8, ge=1)
+    CAMPAIGN_QUEUE_SIZE: int = 64
+
+    # Scheduled send windows
+    SCHEDULER_RATE_PER_SEC: float = 10.0
+    SCHEDULER_BUCKET_SECONDS: int = 300
+
+    # Background metrics writer
+    METRICS_QUEUE_SIZE: int = 10_000
+    METRICS_BATCH_SIZE: int = 500
+    METRICS_FLUSH_INTERVAL_SEC: float = 0.5
+    METRICS_QUEUE_POLICY: str = "drop_oldest"  # drop_oldest, drop_newest, block
+
+    # Metrics history retention (rollups by day are kept forever)
+    METRICS_RAW_RETENTION_DAYS: float = 30.0
+    METRICS_MINUTE_ROLLUP_RETENTION_DAYS: float = 2.0
+    METRICS_HOUR_ROLLUP_RETENTION_DAYS: float = 90.0
+
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=False
     )
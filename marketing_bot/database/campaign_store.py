@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import datetime
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS email_campaigns (
+    campaign_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    sent_count INTEGER NOT NULL DEFAULT 0,
+    success_count INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+CAMPAIGN_COLUMNS = (
+    "campaign_id",
+    "name",
+    "subject",
+    "body",
+    "segment",
+    "created_at",
+    "sent_count",
+    "success_count",
+)
+SELECT_SQL = f"SELECT {', '.join(CAMPAIGN_COLUMNS)} FROM email_campaigns"
+
+
+class EmailCampaignStore:
+    """Email campaigns and their send counters in SQLite (`email.db`).
+
+    Counters are updated with `UPDATE ... SET n = n + ?`, so concurrent sends
+    never lose each other's increments, and each update touches one row.
+    Every read is a single statement and so sees one consistent snapshot.
+    """
+
+    def __init__(self, db_path: Path = Path("data") / "email.db"):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(db_path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def create(
+        self,
+        campaign_id: str,
+        name: str,
+        subject: str,
+        body: str,
+        segment: str,
+        sent_count: int = 0,
+        success_count: int = 0,
+        created_at: Optional[str] = None,
+    ) -> None:
+        row = (
+            campaign_id,
+            name,
+            subject,
+            body,
+            segment,
+            created_at or datetime.datetime.now().isoformat(),
+            sent_count,
+            success_count,
+        )
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO email_campaigns ({', '.join(CAMPAIGN_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in CAMPAIGN_COLUMNS)})",
+                row,
+            )
+
+    def get(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"{SELECT_SQL} WHERE campaign_id = ?", (campaign_id,)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def increment(self, campaign_id: str, sent: int = 0, success: int = 0) -> None:
+        """Atomically add to a campaign's counters."""
+        if not sent and not success:
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE email_campaigns SET sent_count = sent_count + ?, "
+                "success_count = success_count + ? WHERE campaign_id = ?",
+                (sent, success, campaign_id),
+            )
+
+    def to_frame(self) -> pd.DataFrame:
+        """All campaigns as a DataFrame with the legacy campaigns.csv columns."""
+        with self._lock:
+            rows = self._conn.execute(f"{SELECT_SQL} ORDER BY rowid").fetchall()
+        return pd.DataFrame([tuple(row) for row in rows], columns=CAMPAIGN_COLUMNS)
+
+    def totals(self) -> Dict[str, int]:
+        """{"campaigns", "sent", "success"} across all campaigns."""
+        with self._lock:
+            campaigns, sent, success = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(sent_count), 0), "
+                "COALESCE(SUM(success_count), 0) FROM email_campaigns"
+            ).fetchone()
+        return {"campaigns": campaigns, "sent": sent, "success": success}
+
+    def import_legacy(self, csv_file: Path) -> int:
+        """One-time import of the legacy `campaigns.csv`.
+
+        The file is renamed before reading so only one process imports it,
+        and kept as `<name>.migrated` afterwards. A claim left behind by a
+        crashed import is picked up again; rows are inserted with
+        INSERT OR IGNORE, so a repeated import is harmless.
+        """
+        claimed = csv_file.with_name(csv_file.name + ".migrating")
+        try:
+            os.replace(csv_file, claimed)
+        except FileNotFoundError:
+            if not claimed.exists():
+                return 0
+            logger.warning(f"Resuming interrupted import of {csv_file}")
+        try:
+            df = pd.read_csv(claimed, dtype={"campaign_id": str})
+            df = df.reindex(columns=list(CAMPAIGN_COLUMNS))
+            df[["sent_count", "success_count"]] = (
+                df[["sent_count", "success_count"]].fillna(0).astype(int)
+            )
+            df = df.astype(object).where(df.notna(), "")
+        except Exception as e:
+            logger.error(f"Failed to read legacy campaigns file {csv_file}: {e}")
+            os.replace(claimed, csv_file)
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO email_campaigns "
+                    f"({', '.join(CAMPAIGN_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in CAMPAIGN_COLUMNS)})",
+                    df.itertuples(index=False, name=None),
+                )
+                count = self._conn.total_changes - before
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                os.replace(claimed, csv_file)
+                raise
+        try:
+            os.replace(claimed, csv_file.with_name(csv_file.name + ".migrated"))
+        except FileNotFoundError:
+            pass  # a concurrent resume finished first
+        logger.info(f"Migrated {count} email campaigns to {self.db_path}")
+        return count
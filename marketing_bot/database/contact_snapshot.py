@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from marketing_bot.database.email_validation import normalize_emails
+from marketing_bot.database.suppression import email_hashes
+from marketing_bot.utils.logger import get_logger
+
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+STRING_COLUMNS = ("email", "name", "customer_id", "timezone")
+NUMBER_COLUMNS = ("recency_days", "frequency", "monetary_value")
+SNAPSHOT_FORMAT = 3
+
+ChunkReader = Callable[[], ContextManager[Iterable[pd.DataFrame]]]
+
+
+def file_version(path: Path) -> Optional[list]:
+    """(inode, mtime_ns, size) of `path`, or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+
+
+class _StringColumn:
+    """Strings stored as one UTF-8 heap plus int64 offsets and a null mask."""
+
+    def __init__(self, directory: Path, name: str):
+        self.offsets = np.load(directory / f"{name}.offsets.npy", mmap_mode="r")
+        self.nulls = np.load(directory / f"{name}.nulls.npy", mmap_mode="r")
+        heap_file = directory / f"{name}.heap"
+        if heap_file.stat().st_size:
+            with open(heap_file, "rb") as f:
+                self.heap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.heap = b""
+
+    def take(self, rows: np.ndarray) -> np.ndarray:
+        heap = self.heap
+        values = np.array(
+            [
+                heap[start:end].decode("utf-8")
+                for start, end in zip(
+                    self.offsets[rows].tolist(), self.offsets[rows + 1].tolist()
+                )
+            ],
+            dtype=object,
+        )
+        values[self.nulls[rows]] = None
+        return values
+
+
+def live_rows(hashes: np.ndarray, nulls: np.ndarray) -> np.ndarray:
+    """Physical rows that hold each contact's current values, in contact order.
+
+    The contacts file is append-only for updates: the last row for an email
+    wins, while the contact keeps the position of its first row. Rows
+    without an email are all kept.
+    """
+    present = np.flatnonzero(~nulls)
+    keys = hashes[present]
+    _, first = np.unique(keys, return_index=True)
+    _, from_end = np.unique(keys[::-1], return_index=True)
+    last = len(keys) - 1 - from_end
+    missing = np.flatnonzero(nulls)
+    positions = np.concatenate([present[first], missing])
+    rows = np.concatenate([present[last], missing])
+    return rows[np.argsort(positions, kind="stable")]
+
+
+class ContactSnapshot:
+    """One published, read-only version of the contacts in columnar form.
+
+    Every column is a memory-mapped file, so opening costs nothing, processes
+    reading the same version share the page cache, and filters are NumPy
+    predicates over the mapped arrays. Segments are dictionary-encoded
+    (`segment.codes.npy`, -1 for missing). Row numbers given to and returned
+    by the methods are contact numbers; `rows.npy` maps them to the file's
+    rows when superseded rows are present. Only the rows asked for are
+    decoded into Python objects, by `take()`.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.meta = json.loads((directory / "meta.json").read_text())
+        self.rows: int = self.meta["rows"]
+        self.physical_rows: int = self.meta["physical_rows"]
+        self.segments: list = self.meta["segments"]
+        self._live = (
+            np.load(directory / "rows.npy", mmap_mode="r")
+            if self.physical_rows != self.rows
+            else None
+        )
+        self._hash_index: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.segment_codes = np.load(directory / "segment.codes.npy", mmap_mode="r")
+        self.email_hashes = np.load(directory / "email.hash.npy", mmap_mode="r")
+        self._strings = {
+            name: _StringColumn(directory, name) for name in STRING_COLUMNS
+        }
+        self._numbers = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r")
+            for name in NUMBER_COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def source_version(self) -> Optional[list]:
+        return self.meta["source"]
+
+    @property
+    def superseded_rows(self) -> int:
+        """File rows replaced by a later row for the same email."""
+        return self.physical_rows - self.rows
+
+    def _current(self, column: np.ndarray) -> np.ndarray:
+        """`column` per contact; the mapped array itself when nothing is
+        superseded."""
+        return column if self._live is None else column[self._live]
+
+    def _physical(self, rows: np.ndarray) -> np.ndarray:
+        return rows if self._live is None else self._live[rows]
+
+    def segment_rows(self, segment: Optional[str] = None) -> np.ndarray:
+        """Row numbers, in storage order, of the contacts in `segment` (all
+        contacts when None)."""
+        if segment is None:
+            return np.arange(self.rows)
+        try:
+            code = self.segments.index(segment)
+        except ValueError:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self._current(self.segment_codes) == code)
+
+    def count_by_segment(self) -> Dict[str, int]:
+        """Contacts per segment; missing segments count as "unknown"."""
+        counts = np.bincount(
+            np.asarray(self._current(self.segment_codes)) + 1,
+            minlength=len(self.segments) + 1,
+        )
+        result: Dict[str, int] = {}
+        for segment, count in zip(self.segments, counts[1:].tolist()):
+            if count:
+                result[segment] = result.get(segment, 0) + count
+        if counts[0]:
+            result["unknown"] = result.get("unknown", 0) + int(counts[0])
+        return result
+
+    def position(self, email: str) -> Optional[int]:
+        """Row number of the first contact with `email`, if any."""
+        key = email_hashes(normalize_emails(pd.Series([email], dtype=object)))[0]
+        found = np.flatnonzero(self._current(self.email_hashes) == key)
+        return int(found[0]) if len(found) else None
+
+    def stored_email_hashes(self) -> np.ndarray:
+        """Sorted unique hashes of the stored (non-missing) emails."""
+        return self._index()[0]
+
+    def _index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(sorted email hashes, their rows), built on first use."""
+        if self._hash_index is None:
+            hashes = self._current(self.email_hashes)
+            rows = np.flatnonzero(~self._current(self._strings["email"].nulls))
+            order = np.argsort(hashes[rows], kind="stable")
+            self._hash_index = (np.asarray(hashes[rows][order]), rows[order])
+        return self._hash_index
+
+    def rows_for_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        """Row of each stored email hash (every hash must be stored)."""
+        sorted_hashes, rows = self._index()
+        return rows[np.searchsorted(sorted_hashes, hashes)]
+
+    def take(self, rows: np.ndarray) -> pd.DataFrame:
+        """Decode the given rows into a frame of contact columns."""
+        rows = self._physical(np.asarray(rows, dtype=np.int64))
+        segments = np.array(self.segments + [None], dtype=object)
+        data = {name: column.take(rows) for name, column in self._strings.items()}
+        data["segment"] = segments[self.segment_codes[rows]]
+        data.update({name: column[rows] for name, column in self._numbers.items()})
+        return pd.DataFrame(data)
+
+
+class _NpyWriter:
+    """A 1-D `.npy` file written chunk by chunk. NumPy pads the header so
+    any length fits, and it is rewritten with the final length on close."""
+
+    def __init__(self, path: Path, dtype):
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        self._file = open(path, "wb")
+        self._write_header()
+        self._data_start = self._file.tell()
+
+    def _write_header(self) -> None:
+        np.lib.format.write_array_header_1_0(
+            self._file,
+            {
+                "descr": np.lib.format.dtype_to_descr(self.dtype),
+                "fortran_order": False,
+                "shape": (self.count,),
+            },
+        )
+
+    def write(self, values) -> None:
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self._file.write(values.tobytes())
+        self.count += len(values)
+
+    def close(self) -> None:
+        self._file.seek(0)
+        self._write_header()
+        if self._file.tell() != self._data_start:
+            raise RuntimeError(f"Header of {self._file.name} changed size")
+        self._file.close()
+
+
+def write_snapshot(directory: Path, chunks: Iterable[pd.DataFrame], source) -> int:
+    """Write contact `chunks` as a snapshot into the new `directory`; returns
+    the file's row count. Every column is streamed to disk chunk by chunk;
+    only resolving superseded rows holds per-row keys in memory."""
+    directory.mkdir(parents=True)
+    writers = {}
+
+    def writer(name: str, dtype) -> _NpyWriter:
+        writers[name] = _NpyWriter(directory / f"{name}.npy", dtype)
+        return writers[name]
+
+    offsets = {name: writer(f"{name}.offsets", np.int64) for name in STRING_COLUMNS}
+    nulls = {name: writer(f"{name}.nulls", bool) for name in STRING_COLUMNS}
+    numbers = {name: writer(name, np.float64) for name in NUMBER_COLUMNS}
+    codes = writer("segment.codes", np.int32)
+    hashes = writer("email.hash", np.uint64)
+    categories: Dict[str, int] = {}
+    ends = dict.fromkeys(STRING_COLUMNS, 0)
+    heaps = {name: open(directory / f"{name}.heap", "wb") for name in STRING_COLUMNS}
+    try:
+        for name in STRING_COLUMNS:
+            offsets[name].write([0])
+        for chunk in chunks:
+            for name in STRING_COLUMNS:
+                values = chunk[name]
+                encoded = [v.encode("utf-8") for v in values.fillna("").tolist()]
+                lengths = np.fromiter(map(len, encoded), np.int64, len(encoded))
+                heaps[name].write(b"".join(encoded))
+                offsets[name].write(ends[name] + np.cumsum(lengths))
+                ends[name] += int(lengths.sum())
+                nulls[name].write(values.isna().to_numpy())
+            for name in NUMBER_COLUMNS:
+                numbers[name].write(chunk[name].to_numpy(dtype=np.float64))
+            local, uniques = pd.factorize(chunk["segment"])
+            mapping = [categories.setdefault(u, len(categories)) for u in uniques]
+            codes.write(np.array(mapping + [-1], dtype=np.int32)[local])
+            hashes.write(email_hashes(normalize_emails(chunk["email"].fillna(""))))
+    finally:
+        for heap in heaps.values():
+            heap.close()
+        for array in writers.values():
+            array.close()
+    rows = hashes.count
+    live = live_rows(
+        np.load(directory / "email.hash.npy", mmap_mode="r"),
+        np.load(directory / "email.nulls.npy", mmap_mode="r"),
+    )
+    np.save(directory / "rows.npy", live)
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "rows": len(live),
+        "physical_rows": rows,
+        "segments": list(categories),
+        "source": source,
+    }
+    (directory / "meta.json").write_text(json.dumps(meta))
+    return rows
+
+
+class ContactSnapshots:
+    """Versioned snapshots of a contacts file under `directory`.
+
+    Each version is an immutable `v-*` directory; `CURRENT` names the
+    published one and is swapped with `os.replace`, so readers see either the
+    old or the new version, never a partial one. A snapshot records the
+    (inode, mtime, size) of the file it was built from and is rebuilt when
+    that no longer matches, so writes from any process are picked up. A
+    rebuild re-scans the whole file, streaming columns to disk. Old
+    versions are removed after a publish; readers still mapping them keep
+    their pages until they let go.
+    """
+
+    def __init__(self, directory: Path, source: Path, read_chunks: ChunkReader):
+        self.directory = directory
+        self.source = source
+        self.read_chunks = read_chunks
+        self.current_file = directory / "CURRENT"
+        self.lock_file = directory / "snapshot.lock"
+        self._lock = threading.RLock()
+        self._open: Optional[ContactSnapshot] = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            with open(self.lock_file, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _published(self) -> Optional[ContactSnapshot]:
+        """The published snapshot (reusing the open one), or None."""
+        try:
+            name = self.current_file.read_text().strip()
+        except FileNotFoundError:
+            return None
+        if self._open is None or self._open.directory.name != name:
+            try:
+                snapshot = ContactSnapshot(self.directory / name)
+            except FileNotFoundError:
+                return None
+            if snapshot.meta.get("format") != SNAPSHOT_FORMAT:
+                return None
+            self._open = snapshot
+        return self._open
+
+    def get(self) -> ContactSnapshot:
+        """The snapshot of the contacts file as it is now, rebuilding it
+        first if the file changed since the last build."""
+        with self._lock:
+            snapshot = self._published()
+            if snapshot is not None and snapshot.source_version == file_version(
+                self.source
+            ):
+                return snapshot
+        return self.rebuild()
+
+    def rebuild(self, force: bool = False) -> ContactSnapshot:
+        """Build and publish a snapshot unless another process just did."""
+        with self._locked():
+            version = file_version(self.source)
+            snapshot = self._published()
+            if (
+                not force
+                and snapshot is not None
+                and snapshot.source_version == version
+            ):
+                return snapshot
+            started = time.perf_counter()
+            name = f"v-{time.time_ns()}-{os.getpid()}"
+            tmp = self.directory / f"{name}.tmp"
+            try:
+                with self.read_chunks() as chunks:
+                    rows = write_snapshot(tmp, chunks, version)
+                os.replace(tmp, self.directory / name)
+            except BaseException:
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise
+            pointer = self.directory / "CURRENT.tmp"
+            pointer.write_text(name)
+            os.replace(pointer, self.current_file)
+            self._remove_old(keep=name)
+            logger.info(
+                f"Published contact snapshot {name} ({rows} rows) in "
+                f"{time.perf_counter() - started:.2f}s"
+            )
+            return self._published()
+
+    def _remove_old(self, keep: str) -> None:
+        for path in self.directory.glob("v-*"):
+            if path.name != keep:
+                shutil.rmtree(path, ignore_errors=True)
@@ -1,17 +1,55 @@
 from __future__ import annotations
 
+import asyncio
+import os
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
 
+from marketing_bot.database.campaign_store import EmailCampaignStore
+from marketing_bot.database.contact_snapshot import ContactSnapshot, ContactSnapshots
+from marketing_bot.database.email_validation import MISSING, EmailValidator
+from marketing_bot.database.sharding import Shard
+from marketing_bot.database.suppression import (
+    email_hashes,
+    get_suppression_list,
+    in_sorted,
+)
 from marketing_bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+CONTACT_COLUMNS = (
+    "email",
+    "name",
+    "segment",
+    "customer_id",
+    "recency_days",
+    "frequency",
+    "monetary_value",
+    "timezone",
+)
+# Numbers are read as float64 so NaN-padded integer columns written back by
+# pandas ("3.0") still parse; integer fields are converted when materializing.
+CONTACT_DTYPES = {
+    "email": str,
+    "name": str,
+    "segment": str,
+    "customer_id": str,
+    "recency_days": "float64",
+    "frequency": "float64",
+    "monetary_value": "float64",
+    "timezone": str,
+}
+INT_COLUMNS = ("recency_days", "frequency")
+READ_CHUNK_ROWS = 50_000
 
-@dataclass
+
+@dataclass(slots=True)
 class EmailContact:
     """Email contact with segmentation data."""
 
@@ -22,6 +60,104 @@ class EmailContact:
     recency_days: Optional[int] = None
     frequency: Optional[int] = None
     monetary_value: Optional[float] = None
+    timezone: Optional[str] = None  # IANA zone, e.g. "Europe/Kyiv"
+
+
+def contacts_from_frame(df: pd.DataFrame) -> List[EmailContact]:
+    """Build contacts column-wise from a frame with CONTACT_COLUMNS; missing
+    values become None."""
+    columns: List[List[Any]] = []
+    for column in CONTACT_COLUMNS:
+        values = df[column]
+        if column in INT_COLUMNS:
+            columns.append([None if v != v else int(v) for v in values.tolist()])
+        else:
+            columns.append(values.astype(object).where(values.notna(), None).tolist())
+    return list(map(EmailContact, *columns))
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a contact import.
+
+    `added`, `updated` and `unchanged` count distinct emails that were new,
+    stored with different values, or stored exactly as imported;
+    `duplicates` counts input rows repeating an email seen earlier in
+    the same import (the last row wins); `skipped` counts rows without an
+    email and `rejected` rows with an invalid address. Both are quarantined.
+    """
+
+    rows: int = 0
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    rejected: int = 0
+
+
+def read_import_chunks(
+    csv_file: Path,
+    report: ImportReport,
+    segment: Optional[str] = None,
+    chunk_rows: int = READ_CHUNK_ROWS,
+    validator: Optional[EmailValidator] = None,
+    quarantine_file: Optional[Path] = None,
+) -> Iterator[pd.DataFrame]:
+    """Read an import CSV in chunks of CONTACT_COLUMNS with normalized,
+    valid, chunk-unique emails (the last row per email is kept).
+
+    Rejected rows are appended to `quarantine_file` with a `reason` column;
+    rejections and in-chunk repeats are tallied in `report`.
+    """
+    validator = validator or EmailValidator()
+    with pd.read_csv(
+        csv_file,
+        usecols=lambda column: column in CONTACT_COLUMNS,
+        dtype=CONTACT_DTYPES,
+        chunksize=chunk_rows,
+    ) as reader:
+        for chunk in reader:
+            if "email" not in chunk.columns:
+                raise ValueError("CSV file must contain 'email' column")
+            report.rows += len(chunk)
+            chunk, rejected = validator.split(
+                chunk.reindex(columns=list(CONTACT_COLUMNS))
+            )
+            if len(rejected):
+                missing = int((rejected["reason"] == MISSING).sum())
+                report.skipped += missing
+                report.rejected += len(rejected) - missing
+                if quarantine_file is not None:
+                    _quarantine(quarantine_file, rejected, csv_file)
+            if segment:
+                chunk = chunk.assign(segment=segment)
+            repeated = chunk.duplicated("email", keep="last")
+            report.duplicates += int(repeated.sum())
+            yield chunk[~repeated]
+
+
+def _same_contacts(stored: pd.DataFrame, incoming: pd.DataFrame) -> np.ndarray:
+    """Row-wise equality of two CONTACT_COLUMNS frames; missing equals
+    missing."""
+    same = np.ones(len(incoming), dtype=bool)
+    for column in CONTACT_COLUMNS[1:]:
+        a = stored[column].reset_index(drop=True)
+        b = incoming[column].reset_index(drop=True)
+        same &= ((a == b) | (a.isna() & b.isna())).to_numpy(dtype=bool)
+    return same
+
+
+def _insert_sorted(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Merge `values` into a sorted unique array without re-sorting it."""
+    values = np.unique(values)
+    values = values[~in_sorted(values, sorted_values)]
+    return np.insert(sorted_values, np.searchsorted(sorted_values, values), values)
+
+
+def _quarantine(path: Path, rejected: pd.DataFrame, source: Path) -> None:
+    rejected = rejected.assign(source=str(source))
+    rejected.to_csv(path, mode="a", header=not path.exists(), index=False)
 
 
 class EmailDatabase:
@@ -32,6 +168,12 @@ class EmailDatabase:
         self.data_dir.mkdir(exist_ok=True)
         self.contacts_file = self.data_dir / "email_contacts.csv"
         self.campaigns_file = self.data_dir / "campaigns.csv"
+        self.quarantine_file = self.data_dir / "contacts_quarantine.csv"
+        self.suppression = get_suppression_list(self.data_dir / "suppression")
+        self.campaigns = EmailCampaignStore(self.data_dir / "email.db")
+        self.snapshots = ContactSnapshots(
+            self.data_dir / "contacts_snapshot", self.contacts_file, self._all_chunks
+        )
 
         # Initialize files if they don't exist
         self._init_files()
@@ -39,93 +181,136 @@ class EmailDatabase:
     def _init_files(self) -> None:
         """Initialize database files if they don't exist."""
         if not self.contacts_file.exists():
-            contacts_df = pd.DataFrame(
-                columns=[
-                    "email",
-                    "name",
-                    "segment",
-                    "customer_id",
-                    "recency_days",
-                    "frequency",
-                    "monetary_value",
-                ]
-            )
+            contacts_df = pd.DataFrame(columns=list(CONTACT_COLUMNS))
             contacts_df.to_csv(self.contacts_file, index=False)
             logger.info(f"Created contacts file: {self.contacts_file}")
 
-        if not self.campaigns_file.exists():
-            campaigns_df = pd.DataFrame(
-                columns=[
-                    "campaign_id",
-                    "name",
-                    "subject",
-                    "body",
-                    "segment",
-                    "created_at",
-                    "sent_count",
-                    "success_count",
-                ]
-            )
-            campaigns_df.to_csv(self.campaigns_file, index=False)
-            logger.info(f"Created campaigns file: {self.campaigns_file}")
+        # Campaigns moved from campaigns.csv into email.db
+        self.campaigns.import_legacy(self.campaigns_file)
+
+    def snapshot(self) -> ContactSnapshot:
+        """Memory-mapped columnar view of the contacts file, rebuilt when the
+        file has changed; segment reads and counts are served from it."""
+        return self.snapshots.get()
 
     def load_contacts(self) -> List[EmailContact]:
         """Load all contacts from database."""
         try:
-            df = pd.read_csv(self.contacts_file)
-            contacts = []
-            for _, row in df.iterrows():
-                contact = EmailContact(
-                    email=row["email"],
-                    name=row.get("name"),
-                    segment=row.get("segment"),
-                    customer_id=row.get("customer_id"),
-                    recency_days=row.get("recency_days"),
-                    frequency=row.get("frequency"),
-                    monetary_value=row.get("monetary_value"),
-                )
-                contacts.append(contact)
+            snapshot = self.snapshot()
+            contacts = contacts_from_frame(snapshot.take(snapshot.segment_rows()))
             logger.info(f"Loaded {len(contacts)} contacts from database")
             return contacts
         except Exception as e:
             logger.error(f"Failed to load contacts: {e}")
             return []
 
-    def add_contacts_from_csv(
-        self, csv_file: Path, segment: Optional[str] = None
-    ) -> int:
-        """Add contacts from CSV file to database."""
-        try:
-            df = pd.read_csv(csv_file)
+    def _contact_chunks(self, columns=CONTACT_COLUMNS):
+        return pd.read_csv(
+            self.contacts_file,
+            usecols=lambda column: column in columns,
+            dtype={column: CONTACT_DTYPES[column] for column in columns},
+            chunksize=READ_CHUNK_ROWS,
+        )
 
-            # Validate required columns
-            if "email" not in df.columns:
-                raise ValueError("CSV file must contain 'email' column")
+    @contextmanager
+    def _all_chunks(self) -> Iterator[Iterator[pd.DataFrame]]:
+        """Chunks of the contacts file with every CONTACT_COLUMNS column."""
+        with self._contact_chunks() as reader:
+            yield (chunk.reindex(columns=list(CONTACT_COLUMNS)) for chunk in reader)
 
-            # Add segment if provided
-            if segment:
-                df["segment"] = segment
+    def _rewrite_contacts(self) -> None:
+        """Stream the contacts file into a copy with exactly CONTACT_COLUMNS,
+        then swap it in."""
+        tmp = self.contacts_file.with_suffix(".csv.tmp")
+        pd.DataFrame(columns=list(CONTACT_COLUMNS)).to_csv(tmp, index=False)
+        with self._all_chunks() as chunks:
+            for chunk in chunks:
+                chunk.to_csv(tmp, mode="a", header=False, index=False)
+        os.replace(tmp, self.contacts_file)
 
-            # Load existing contacts
-            existing_df = (
-                pd.read_csv(self.contacts_file)
-                if self.contacts_file.exists()
-                else pd.DataFrame()
-            )
+    def _compact_contacts(self, snapshot: ContactSnapshot) -> None:
+        """Rewrite the contacts file with one row per contact, dropping rows
+        superseded by later updates, then swap it in."""
+        tmp = self.contacts_file.with_suffix(".csv.tmp")
+        pd.DataFrame(columns=list(CONTACT_COLUMNS)).to_csv(tmp, index=False)
+        for begin in range(0, len(snapshot), READ_CHUNK_ROWS):
+            rows = np.arange(begin, min(begin + READ_CHUNK_ROWS, len(snapshot)))
+            frame = snapshot.take(rows).reindex(columns=list(CONTACT_COLUMNS))
+            frame.to_csv(tmp, mode="a", header=False, index=False)
+        os.replace(tmp, self.contacts_file)
+        logger.info(
+            f"Compacted contacts file: dropped {snapshot.superseded_rows} "
+            "superseded rows"
+        )
 
-            # Merge with existing data (avoid duplicates)
-            if not existing_df.empty:
-                df = pd.concat([existing_df, df], ignore_index=True)
-                df = df.drop_duplicates(subset=["email"], keep="last")
+    def import_contacts(
+        self,
+        csv_file: Path,
+        segment: Optional[str] = None,
+        validator: Optional[EmailValidator] = None,
+    ) -> ImportReport:
+        """Upsert contacts from a CSV, streaming it in chunks.
 
-            # Save updated contacts
-            df.to_csv(self.contacts_file, index=False)
+        New and changed contacts are appended to the contacts file; the last
+        row for an email wins and the contact keeps its first position, so an
+        import never rewrites stored rows. Rows identical to the stored
+        contact are skipped. Memory holds sorted email hashes, not rows. The
+        file is compacted once superseded rows outnumber contacts.
 
-            added_count = (
-                len(df) - len(existing_df) if not existing_df.empty else len(df)
+        Publishing the result re-scans the whole contacts file to rebuild
+        the snapshot, so every import costs time proportional to all stored
+        contacts; the SQLite backend avoids that for large bases.
+        """
+        report = ImportReport()
+        header = pd.read_csv(self.contacts_file, nrows=0).columns.tolist()
+        if header != list(CONTACT_COLUMNS):
+            self._rewrite_contacts()
+        snapshot = self.snapshot()
+        stored = snapshot.stored_email_hashes()
+        imported = np.empty(0, dtype=np.uint64)
+        for chunk in read_import_chunks(
+            csv_file,
+            report,
+            segment,
+            validator=validator or EmailValidator.from_settings(),
+            quarantine_file=self.quarantine_file,
+        ):
+            hashes = email_hashes(chunk["email"])
+            repeated = in_sorted(hashes, imported)
+            existing = in_sorted(hashes, stored) & ~repeated
+            unchanged = np.zeros(len(chunk), dtype=bool)
+            if existing.any():
+                unchanged[existing] = _same_contacts(
+                    snapshot.take(snapshot.rows_for_hashes(hashes[existing])),
+                    chunk[existing],
+                )
+            report.duplicates += int(repeated.sum())
+            report.unchanged += int(unchanged.sum())
+            report.updated += int((existing & ~unchanged).sum())
+            report.added += int((~(repeated | existing)).sum())
+            chunk[~unchanged].to_csv(
+                self.contacts_file, mode="a", header=False, index=False
             )
-            logger.info(f"Added {added_count} contacts to database")
-            return added_count
+            imported = _insert_sorted(imported, hashes)
+        snapshot = self.snapshots.rebuild()
+        if snapshot.superseded_rows > len(snapshot):
+            self._compact_contacts(snapshot)
+            self.snapshots.rebuild()
+        return report
+
+    def add_contacts_from_csv(
+        self, csv_file: Path, segment: Optional[str] = None
+    ) -> int:
+        """Add contacts from CSV file to database."""
+        try:
+            report = self.import_contacts(csv_file, segment)
+            logger.info(
+                f"Added {report.added} contacts to database "
+                f"({report.updated} updated, {report.unchanged} unchanged, "
+                f"{report.duplicates} duplicates, "
+                f"{report.skipped} without email, {report.rejected} rejected)"
+            )
+            return report.added
 
         except Exception as e:
             logger.error(f"Failed to add contacts from CSV: {e}")
@@ -133,17 +318,83 @@ class EmailDatabase:
 
     def get_contacts_by_segment(self, segment: str) -> List[EmailContact]:
         """Get contacts filtered by segment."""
-        contacts = self.load_contacts()
-        return [c for c in contacts if c.segment == segment]
+        try:
+            snapshot = self.snapshot()
+            return contacts_from_frame(snapshot.take(snapshot.segment_rows(segment)))
+        except Exception as e:
+            logger.error(f"Failed to load contacts for segment {segment}: {e}")
+            return []
+
+    def iter_contacts(
+        self,
+        segment: Optional[str] = None,
+        batch_size: int = 1000,
+        start_after: Optional[str] = None,
+        include_suppressed: bool = False,
+        shard: Optional[Shard] = None,
+    ) -> Iterator[List[EmailContact]]:
+        """Yield contacts in storage order, about `batch_size` at a time.
+
+        Suppressed addresses are dropped from each batch unless
+        `include_suppressed`. With `shard`, only contacts whose email hashes
+        to that shard are yielded, so N processes given shards 0..N-1 cover
+        the contacts exactly once. `start_after` resumes after the contact
+        with that email (nothing is yielded if it is not found).
+        """
+        for batch in self._contact_batches(segment, batch_size, start_after):
+            if shard is not None:
+                batch = shard.filter(batch)
+            if not include_suppressed:
+                # Per batch, so suppressions added during a long send apply
+                self.suppression.refresh()
+                batch = self.suppression.filter(batch)
+            if batch:
+                yield batch
+
+    def _contact_batches(
+        self, segment: Optional[str], batch_size: int, start_after: Optional[str]
+    ) -> Iterator[List[EmailContact]]:
+        """Served from the snapshot current when iteration starts: rows are
+        selected with one vectorized segment filter and only each batch is
+        decoded, so a concurrent import does not shift the iteration."""
+        snapshot = self.snapshot()
+        rows = snapshot.segment_rows(segment)
+        if start_after is not None:
+            after = snapshot.position(start_after)
+            if after is None:
+                return
+            rows = rows[np.searchsorted(rows, after, side="right") :]
+        for begin in range(0, len(rows), batch_size):
+            yield contacts_from_frame(snapshot.take(rows[begin : begin + batch_size]))
+
+    async def aiter_contacts(
+        self,
+        segment: Optional[str] = None,
+        batch_size: int = 1000,
+        start_after: Optional[str] = None,
+        include_suppressed: bool = False,
+        shard: Optional[Shard] = None,
+    ) -> AsyncIterator[List[EmailContact]]:
+        """`iter_contacts` with each batch read in a worker thread."""
+        batches = self.iter_contacts(
+            segment, batch_size, start_after, include_suppressed, shard
+        )
+        try:
+            while True:
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            batches.close()
 
     def get_contact_count_by_segment(self) -> Dict[str, int]:
         """Get contact count grouped by segment."""
-        contacts = self.load_contacts()
-        segment_counts = {}
-        for contact in contacts:
-            segment = contact.segment or "unknown"
-            segment_counts[segment] = segment_counts.get(segment, 0) + 1
-        return segment_counts
+        try:
+            return self.snapshot().count_by_segment()
+        except Exception as e:
+            logger.error(f"Failed to count contacts: {e}")
+            return {}
 
     def save_campaign(
         self,
@@ -157,42 +408,31 @@ class EmailDatabase:
     ) -> None:
         """Save campaign to database."""
         try:
-            import datetime
-
-            campaign_data = {
-                "campaign_id": campaign_id,
-                "name": name,
-                "subject": subject,
-                "body": body,
-                "segment": segment,
-                "created_at": datetime.datetime.now().isoformat(),
-                "sent_count": sent_count,
-                "success_count": success_count,
-            }
-
-            # Load existing campaigns
-            if self.campaigns_file.exists():
-                campaigns_df = pd.read_csv(self.campaigns_file)
-            else:
-                campaigns_df = pd.DataFrame()
-
-            # Add new campaign
-            new_campaign_df = pd.DataFrame([campaign_data])
-            campaigns_df = pd.concat([campaigns_df, new_campaign_df], ignore_index=True)
-
-            # Save updated campaigns
-            campaigns_df.to_csv(self.campaigns_file, index=False)
+            self.campaigns.create(
+                campaign_id, name, subject, body, segment, sent_count, success_count
+            )
             logger.info(f"Saved campaign: {name} (ID: {campaign_id})")
 
         except Exception as e:
             logger.error(f"Failed to save campaign: {e}")
 
+    def get_campaign(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        """One campaign's row, or None."""
+        return self.campaigns.get(campaign_id)
+
+    def increment_campaign_stats(
+        self, campaign_id: str, sent: int = 0, success: int = 0
+    ) -> None:
+        """Atomically add to a campaign's sent/success counters."""
+        try:
+            self.campaigns.increment(campaign_id, sent, success)
+        except Exception as e:
+            logger.error(f"Failed to update campaign stats: {e}")
+
     def get_campaigns(self) -> pd.DataFrame:
         """Get all campaigns from database."""
         try:
-            if self.campaigns_file.exists():
-                return pd.read_csv(self.campaigns_file)
-            return pd.DataFrame()
+            return self.campaigns.to_frame()
         except Exception as e:
             logger.error(f"Failed to load campaigns: {e}")
             return pd.DataFrame()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from marketing_bot.config import settings
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Pragmatic RFC 5322 subset, matched against lowercased addresses: dot-atom
+# local part, hostname labels and an alphabetic or punycode (xn--) TLD.
+EMAIL_PATTERN = re.compile(
+    r"[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r"@(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+"
+    r"(?:[a-z]{2,63}|xn--[a-z0-9](?:[a-z0-9-]{0,57}[a-z0-9])?)"
+)
+MAX_EMAIL_LENGTH = 254
+
+MISSING = "missing_email"
+INVALID_SYNTAX = "invalid_syntax"
+NO_MX = "no_mx"
+
+
+def normalize_emails(emails: pd.Series) -> pd.Series:
+    """Trim and lowercase whole addresses so case variants dedupe."""
+    return emails.str.strip().str.lower()
+
+
+def load_mx_cache(path: Path) -> Dict[str, bool]:
+    """Read an offline MX cache: a JSON object mapping domain to a truthy
+    value (e.g. its MX hosts) when it accepts mail, falsy when it does not."""
+    try:
+        data = json.loads(path.read_text())
+    except Exception as e:
+        logger.error(f"Failed to read MX cache {path}: {e}")
+        return {}
+    return {str(domain).lower(): bool(value) for domain, value in data.items()}
+
+
+class EmailValidator:
+    """Column-wise email normalization and validation for contact imports.
+
+    Works on whole pandas columns: one regex pass, and MX lookups once per
+    distinct domain in the chunk. Domains missing from the MX cache are
+    accepted.
+    """
+
+    def __init__(self, mx_cache: Optional[Dict[str, bool]] = None):
+        self.mx_cache = mx_cache or {}
+
+    @classmethod
+    def from_settings(cls) -> "EmailValidator":
+        path = settings.EMAIL_MX_CACHE_FILE
+        return cls(load_mx_cache(Path(path)) if path else None)
+
+    def split(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Normalize `df["email"]` and split into (accepted, rejected); the
+        rejected frame keeps the original address and has a `reason`."""
+        emails = normalize_emails(df["email"])
+        reasons = np.full(len(df), None, dtype=object)
+
+        missing = (emails.isna() | (emails == "")).to_numpy()
+        reasons[missing] = MISSING
+
+        present = emails[~missing]
+        syntax_ok = present.str.fullmatch(EMAIL_PATTERN) & (
+            present.str.len() <= MAX_EMAIL_LENGTH
+        )
+        bad_syntax = np.zeros(len(df), dtype=bool)
+        bad_syntax[~missing] = ~syntax_ok.to_numpy(dtype=bool)
+        reasons[bad_syntax] = INVALID_SYNTAX
+
+        no_mx = np.zeros(len(df), dtype=bool)
+        if self.mx_cache:
+            checked = ~(missing | bad_syntax)
+            codes, domains = pd.factorize(emails[checked].str.rpartition("@")[2])
+            accepts = np.array(
+                [self.mx_cache.get(domain, True) for domain in domains], dtype=bool
+            )
+            no_mx[checked] = ~accepts[codes]
+            reasons[no_mx] = NO_MX
+
+        rejected_mask = missing | bad_syntax | no_mx
+        accepted = df[~rejected_mask].assign(email=emails[~rejected_mask])
+        rejected = df[rejected_mask].assign(reason=reasons[rejected_mask])
+        return accepted, rejected
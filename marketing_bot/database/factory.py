@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+from marketing_bot.config import settings
+from marketing_bot.database.email_database import EmailDatabase, ImportReport
+from marketing_bot.database.sqlite_contact_store import SqliteEmailDatabase
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def create_email_database(
+    data_dir: Path = Path("data"), backend: Optional[str] = None
+) -> EmailDatabase:
+    """Email database for EMAIL_DB_BACKEND (csv or sqlite)."""
+    backend = (backend or settings.EMAIL_DB_BACKEND).lower()
+    if backend == "sqlite":
+        return SqliteEmailDatabase(data_dir)
+    if backend == "csv":
+        return EmailDatabase(data_dir)
+    raise ValueError(f"Unknown email database backend: {backend}")
+
+
+def migrate_contacts_to_sqlite(data_dir: Path = Path("data")) -> ImportReport:
+    """Upsert `email_contacts.csv` into email.db.
+
+    Safe to re-run: contacts are keyed by email. The CSV is left in place.
+    """
+    db = SqliteEmailDatabase(data_dir)
+    try:
+        report = db.import_contacts(db.contacts_file)
+    finally:
+        db.close()
+    logger.info(
+        f"Imported {report.added} new and {report.updated} updated contacts "
+        f"into {db.db_path}"
+    )
+    return report
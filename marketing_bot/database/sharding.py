@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Iterable, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from marketing_bot.database.email_validation import normalize_emails
+from marketing_bot.database.suppression import email_hashes
+
+_JUMP_MULTIPLIER = 2862933555777941757
+_MASK64 = (1 << 64) - 1
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """Jump consistent hash (Lamping & Veach) of a 64-bit key into
+    `buckets`; growing N to N+1 moves only 1/(N+1) of the keys."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * _JUMP_MULTIPLIER + 1) & _MASK64
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+
+def jump_hash_array(keys: np.ndarray, buckets: int) -> np.ndarray:
+    """`jump_hash` over a uint64 array; loops about ln(buckets) times."""
+    keys = np.array(keys, dtype=np.uint64)
+    result = np.zeros(len(keys), dtype=np.int64)
+    j = np.zeros(len(keys), dtype=np.int64)
+    active = np.ones(len(keys), dtype=bool)
+    multiplier = np.uint64(_JUMP_MULTIPLIER)
+    while active.any():
+        result[active] = j[active]
+        keys[active] = keys[active] * multiplier + np.uint64(1)
+        j[active] = (
+            (result[active] + 1)
+            * (float(1 << 31) / ((keys[active] >> np.uint64(33)) + 1).astype(float))
+        ).astype(np.int64)
+        active &= j < buckets
+    return result
+
+
+class Shard(NamedTuple):
+    """Shard `index` of `count` (0-based), e.g. `Shard.parse("2/8")`."""
+
+    index: int
+    count: int
+
+    @classmethod
+    def parse(cls, text: str) -> "Shard":
+        try:
+            index, count = (int(part) for part in text.split("/"))
+        except ValueError:
+            raise ValueError(f"Shard must look like k/N, got {text!r}") from None
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Shard index must be in 0..{count - 1}, got {index}")
+        return cls(index, count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def owns(self, emails: Iterable[str]) -> np.ndarray:
+        """Boolean mask of the addresses this shard is responsible for."""
+        series = normalize_emails(pd.Series(list(emails), dtype=object))
+        if series.empty:
+            return np.zeros(0, dtype=bool)
+        shards = jump_hash_array(email_hashes(series.fillna("")), self.count)
+        return shards == self.index
+
+    def filter(self, contacts: List) -> List:
+        """Keep the contacts (anything with `.email`) owned by this shard."""
+        if self.count == 1 or not contacts:
+            return contacts
+        mask = self.owns(contact.email for contact in contacts)
+        return [contact for contact, mine in zip(contacts, mask) if mine]
+
+
+def shard_of(email: str, count: int) -> int:
+    """Shard (0-based) that owns `email` out of `count`."""
+    hashes = email_hashes(normalize_emails(pd.Series([email], dtype=object)))
+    return jump_hash(int(hashes[0]), count)
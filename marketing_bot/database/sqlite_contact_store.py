@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from marketing_bot.database.email_database import (
+    CONTACT_COLUMNS,
+    EmailContact,
+    EmailDatabase,
+    ImportReport,
+    read_import_chunks,
+)
+from marketing_bot.database.email_validation import EmailValidator
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT,
+    segment TEXT,
+    customer_id TEXT,
+    recency_days INTEGER,
+    frequency INTEGER,
+    monetary_value REAL,
+    timezone TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_contacts_segment ON contacts (segment);
+CREATE INDEX IF NOT EXISTS idx_contacts_customer ON contacts (customer_id);
+"""
+
+# Stored rows identical to the imported one are left untouched
+UPSERT_SQL = (
+    f"INSERT INTO contacts ({', '.join(CONTACT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in CONTACT_COLUMNS)}) "
+    "ON CONFLICT(email) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in CONTACT_COLUMNS[1:])
+    + " WHERE "
+    + " OR ".join(
+        f"contacts.{column} IS NOT excluded.{column}" for column in CONTACT_COLUMNS[1:]
+    )
+)
+SAME_AS_STORED_SQL = " AND ".join(
+    f"c.{column} IS r.{column}" for column in CONTACT_COLUMNS[1:]
+)
+SELECT_SQL = f"SELECT {', '.join(CONTACT_COLUMNS)} FROM contacts"
+
+IMPORT_TEMP_SCHEMA = """
+CREATE TEMP TABLE IF NOT EXISTS imported (email TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TEMP TABLE IF NOT EXISTS chunk_rows (
+    email TEXT PRIMARY KEY,
+    name TEXT,
+    segment TEXT,
+    customer_id TEXT,
+    recency_days INTEGER,
+    frequency INTEGER,
+    monetary_value REAL,
+    timezone TEXT
+) WITHOUT ROWID;
+"""
+IMPORT_CHUNK_ROWS = 50_000
+
+
+def _contact(row: tuple) -> EmailContact:
+    return EmailContact(*row)
+
+
+def _contact_rows(df: pd.DataFrame) -> Iterator[tuple]:
+    """SQLite rows for a CONTACT_COLUMNS frame; NaN becomes NULL."""
+    df = df.astype(object).where(df.notna(), None)
+    return df.itertuples(index=False, name=None)
+
+
+class SqliteEmailDatabase(EmailDatabase):
+    """`EmailDatabase` with contacts in SQLite (`email.db`).
+
+    Contacts are unique by email and indexed by segment and customer_id, so
+    segment counts are one `GROUP BY` and `iter_contacts` streams a segment
+    from an index scan instead of parsing the whole contacts CSV. Imports
+    upsert against the email index.
+    """
+
+    def __init__(self, data_dir: Path = Path("data")):
+        super().__init__(data_dir)
+        self.db_path = self.data_dir / "email.db"
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.executescript(SCHEMA)
+        self._add_missing_columns()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, isolation_level=None
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _add_missing_columns(self) -> None:
+        """Add columns introduced after a database was created."""
+        with self._lock:
+            present = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(contacts)")
+            }
+            if "timezone" not in present:
+                self._conn.execute("ALTER TABLE contacts ADD COLUMN timezone TEXT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _upsert_chunk(self, chunk: pd.DataFrame, report: ImportReport) -> None:
+        """Classify one chunk of chunk-unique emails against this import
+        (temp table `imported`) and the stored contacts, then upsert it."""
+        rows = list(_contact_rows(chunk))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM temp.chunk_rows")
+                self._conn.executemany(
+                    f"INSERT INTO temp.chunk_rows ({', '.join(CONTACT_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in CONTACT_COLUMNS)})",
+                    rows,
+                )
+                repeated, existing, unchanged = self._conn.execute(
+                    "SELECT "
+                    "COUNT(*) FILTER (WHERE r.email IN temp.imported), "
+                    "COUNT(*) FILTER (WHERE r.email NOT IN temp.imported "
+                    "AND c.email IS NOT NULL), "
+                    "COUNT(*) FILTER (WHERE r.email NOT IN temp.imported "
+                    f"AND c.email IS NOT NULL AND {SAME_AS_STORED_SQL}) "
+                    "FROM temp.chunk_rows r LEFT JOIN contacts c ON c.email = r.email"
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO temp.imported SELECT email "
+                    "FROM temp.chunk_rows"
+                )
+                self._conn.executemany(UPSERT_SQL, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        report.duplicates += repeated
+        report.unchanged += unchanged
+        report.updated += existing - unchanged
+        report.added += len(rows) - repeated - existing
+
+    def import_contacts(
+        self,
+        csv_file: Path,
+        segment: Optional[str] = None,
+        validator: Optional[EmailValidator] = None,
+    ) -> ImportReport:
+        """Upsert contacts from a CSV, streaming it in chunks.
+
+        Emails seen so far are tracked in a temp table, so memory stays
+        bounded by the chunk size regardless of import or database size.
+        """
+        report = ImportReport()
+        with self._lock:
+            self._conn.executescript(IMPORT_TEMP_SCHEMA)
+        try:
+            for chunk in read_import_chunks(
+                csv_file,
+                report,
+                segment,
+                IMPORT_CHUNK_ROWS,
+                validator or EmailValidator.from_settings(),
+                self.quarantine_file,
+            ):
+                self._upsert_chunk(chunk, report)
+        finally:
+            with self._lock:
+                self._conn.executescript(
+                    "DROP TABLE temp.imported; DROP TABLE temp.chunk_rows;"
+                )
+        return report
+
+    def load_contacts(self) -> List[EmailContact]:
+        """Load all contacts from database."""
+        try:
+            with self._lock:
+                rows = self._conn.execute(f"{SELECT_SQL} ORDER BY id").fetchall()
+            contacts = [_contact(row) for row in rows]
+            logger.info(f"Loaded {len(contacts)} contacts from database")
+            return contacts
+        except Exception as e:
+            logger.error(f"Failed to load contacts: {e}")
+            return []
+
+    def _contact_batches(
+        self, segment: Optional[str], batch_size: int, start_after: Optional[str]
+    ) -> Iterator[List[EmailContact]]:
+        """Uses its own connection so the read snapshot stays open across
+        yields without holding the writer lock."""
+        clauses, params = [], []
+        if segment is not None:
+            clauses.append("segment = ?")
+            params.append(segment)
+        if start_after is not None:
+            clauses.append("id > (SELECT id FROM contacts WHERE email = ?)")
+            params.append(start_after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(f"{SELECT_SQL} {where} ORDER BY id", params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [_contact(row) for row in rows]
+        finally:
+            conn.close()
+
+    def get_contacts_by_segment(self, segment: str) -> List[EmailContact]:
+        """Get contacts filtered by segment."""
+        try:
+            return [
+                contact
+                for batch in self.iter_contacts(
+                    segment, batch_size=10_000, include_suppressed=True
+                )
+                for contact in batch
+            ]
+        except Exception as e:
+            logger.error(f"Failed to load contacts for segment {segment}: {e}")
+            return []
+
+    def get_contact_count_by_segment(self) -> Dict[str, int]:
+        """Get contact count grouped by segment."""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT COALESCE(segment, 'unknown'), COUNT(*) FROM contacts "
+                    "GROUP BY COALESCE(segment, 'unknown')"
+                ).fetchall()
+            return {segment: count for segment, count in rows}
+        except Exception as e:
+            logger.error(f"Failed to count contacts: {e}")
+            return {}
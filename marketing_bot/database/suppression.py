@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from marketing_bot.database.email_validation import normalize_emails
+from marketing_bot.metrics.instruments import EMAILS_SUPPRESSED
+from marketing_bot.utils.logger import get_logger
+
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+TAIL_COLUMNS = ["email", "reason", "suppressed_at"]
+
+
+def email_hashes(emails: pd.Series) -> np.ndarray:
+    """64-bit hashes of (normalized) emails, for set membership tests."""
+    return pd.util.hash_pandas_object(emails, index=False).to_numpy()
+
+
+def in_sorted(values: np.ndarray, sorted_values: np.ndarray) -> np.ndarray:
+    """Elementwise membership of `values` in a sorted unique array."""
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    positions = np.searchsorted(sorted_values, values)
+    positions[positions == len(sorted_values)] = 0
+    return sorted_values[positions] == values
+
+
+class SuppressionList:
+    """Addresses that must not be mailed (unsubscribes, bounces, complaints).
+
+    `index.npy` is a sorted array of 64-bit email hashes opened memory-mapped,
+    so millions of addresses cost no load time and a lookup is a binary
+    search over pages the OS caches. Single additions go to `tail.csv`
+    (also the audit trail of reasons) and are held in a set until `compact()`
+    merges them into the index. Other processes' changes are picked up by
+    `refresh()`.
+    """
+
+    def __init__(
+        self,
+        directory: Path = Path("data") / "suppression",
+        compact_after: int = 100_000,
+    ):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.directory / "index.npy"
+        self.tail_file = self.directory / "tail.csv"
+        self.lock_file = self.directory / "suppression.lock"
+        self.compact_after = compact_after
+        self._lock = threading.RLock()
+        self._index = np.empty(0, dtype=np.uint64)
+        self._index_version: Optional[tuple] = None
+        self._tail: Set[int] = set()
+        self._tail_inode: Optional[int] = None
+        self._tail_offset = 0
+        self.refresh()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            with open(self.lock_file, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._tail)
+
+    def refresh(self) -> None:
+        """Reopen the index if it was replaced and read new tail entries."""
+        with self._lock:
+            try:
+                stat = self.index_file.stat()
+                version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                version = None
+            if version != self._index_version:
+                self._index = (
+                    np.load(self.index_file, mmap_mode="r")
+                    if version is not None
+                    else np.empty(0, dtype=np.uint64)
+                )
+                self._index_version = version
+                # Entries compacted into the new index have left the tail
+                self._tail.clear()
+                self._tail_inode = None
+            self._read_tail()
+
+    def _read_tail(self) -> None:
+        try:
+            stat = self.tail_file.stat()
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._tail_inode:
+            self._tail_inode = stat.st_ino
+            self._tail_offset = 0
+        if stat.st_size == self._tail_offset:
+            return
+        with open(self.tail_file, "rb") as f:
+            f.seek(self._tail_offset)
+            data = f.read()
+        complete = data.rfind(b"\n") + 1  # ignore a torn last line
+        emails = [
+            line.split(b",", 1)[0].decode("utf-8")
+            for line in data[:complete].splitlines()
+            if line and not line.startswith(b"email,")
+        ]
+        if emails:
+            self._tail.update(email_hashes(pd.Series(emails)).tolist())
+        self._tail_offset += complete
+
+    def contains(self, emails: Iterable[str]) -> np.ndarray:
+        """Boolean mask of which addresses are suppressed."""
+        series = normalize_emails(pd.Series(list(emails), dtype=object))
+        if series.empty:
+            return np.zeros(0, dtype=bool)
+        hashes = email_hashes(series.fillna(""))
+        mask = in_sorted(hashes, self._index)
+        if self._tail:
+            mask |= np.fromiter(
+                (h in self._tail for h in hashes.tolist()), bool, len(hashes)
+            )
+        return mask
+
+    def is_suppressed(self, email: str) -> bool:
+        return bool(self.contains([email])[0])
+
+    def add(self, emails: Iterable[str], reason: str = "unsubscribe") -> int:
+        """Append addresses to the tail; returns how many were written.
+
+        Compacts into the index once the tail holds `compact_after` entries.
+        """
+        series = normalize_emails(pd.Series(list(emails), dtype=object)).dropna()
+        series = series[series != ""]
+        if series.empty:
+            return 0
+        rows = pd.DataFrame(
+            {"email": series, "reason": reason, "suppressed_at": time.time()}
+        )
+        with self._locked():
+            header = not self.tail_file.exists()
+            data = rows.to_csv(index=False, header=header, columns=TAIL_COLUMNS)
+            fd = os.open(self.tail_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data.encode("utf-8"))
+            finally:
+                os.close(fd)
+            self.refresh()
+            if len(self._tail) >= self.compact_after:
+                self._compact_locked()
+        return len(series)
+
+    def bulk_load(self, emails: Iterable[str]) -> int:
+        """Merge many addresses straight into the index (no tail entries);
+        returns how many new hashes were added."""
+        series = normalize_emails(pd.Series(list(emails), dtype=object)).dropna()
+        with self._locked():
+            self.refresh()
+            before = len(self._index)
+            self._write_index(
+                np.union1d(self._index, email_hashes(series[series != ""]))
+            )
+            return len(self._index) - before
+
+    def load_csv(self, csv_file: Path, chunk_rows: int = 1_000_000) -> int:
+        """Bulk-load the `email` column of a CSV (e.g. a provider export)."""
+        added = 0
+        with pd.read_csv(
+            csv_file, usecols=["email"], dtype={"email": str}, chunksize=chunk_rows
+        ) as reader:
+            for chunk in reader:
+                added += self.bulk_load(chunk["email"])
+        logger.info(f"Loaded {added} suppressed addresses from {csv_file}")
+        return added
+
+    def compact(self) -> int:
+        """Fold the tail into the index; returns the index size."""
+        with self._locked():
+            self.refresh()
+            self._compact_locked()
+            return len(self._index)
+
+    def _compact_locked(self) -> None:
+        if not self._tail:
+            return
+        tail = np.fromiter(self._tail, dtype=np.uint64, count=len(self._tail))
+        self._write_index(np.union1d(self._index, tail))
+        # The audit trail is kept; only the unmerged part is truncated
+        os.replace(
+            self.tail_file,
+            self.tail_file.with_name(f"tail-{time.time_ns()}.csv.merged"),
+        )
+        self._tail.clear()
+        self._tail_inode = None
+
+    def _write_index(self, hashes: np.ndarray) -> None:
+        tmp = self.directory / "index.tmp.npy"
+        np.save(tmp, np.ascontiguousarray(hashes, dtype=np.uint64))
+        os.replace(tmp, self.index_file)
+        self.refresh()
+
+    def filter(self, contacts: List) -> List:
+        """Drop contacts (anything with `.email`) whose address is suppressed."""
+        if not contacts:
+            return contacts
+        mask = self.contains(contact.email for contact in contacts)
+        if not mask.any():
+            return contacts
+        EMAILS_SUPPRESSED.labels(stage="stream").inc(int(mask.sum()))
+        return [contact for contact, hit in zip(contacts, mask) if not hit]
+
+
+_lists: Dict[Path, SuppressionList] = {}
+_lists_lock = threading.Lock()
+
+
+def get_suppression_list(
+    directory: Path = Path("data") / "suppression",
+) -> SuppressionList:
+    """Process-wide suppression list per directory, refreshed on access."""
+    key = directory.resolve()
+    with _lists_lock:
+        suppression = _lists.get(key)
+        if suppression is None:
+            suppression = _lists[key] = SuppressionList(directory)
+    suppression.refresh()
+    return suppression
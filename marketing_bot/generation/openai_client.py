@@ -9,6 +9,8 @@ from openai import OpenAI
 from openai.types.chat import ChatCompletion
 
 from marketing_bot.config import settings
+from marketing_bot.metrics.histogram import get_latency_recorder
+from marketing_bot.metrics.instruments import GENERATION_LATENCY, LLM_TOKENS
 from marketing_bot.utils.logger import get_logger
 
 load_dotenv()
@@ -69,8 +71,20 @@ class OpenAIClient:
                     temperature=0.7,
                 )
 
-                generation_time = int((time.time() - start_time) * 1000)
+                elapsed = time.time() - start_time
+                generation_time = int(elapsed * 1000)
                 logger.info(f"Generated text in {generation_time}ms")
+                GENERATION_LATENCY.labels(model=model_name).observe(elapsed)
+                get_latency_recorder().record(
+                    f"generation:{model_name}", elapsed * 1000
+                )
+                if response.usage is not None:
+                    LLM_TOKENS.labels(model=model_name, kind="prompt").inc(
+                        response.usage.prompt_tokens
+                    )
+                    LLM_TOKENS.labels(model=model_name, kind="completion").inc(
+                        response.usage.completion_tokens
+                    )
 
                 return response.choices[0].message.content.strip()
 
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 from typing import Optional
+from uuid import UUID
 
 import click
 import pandas as pd
@@ -13,6 +15,7 @@ from marketing_bot.generation.templates import (
     SOCIAL_POST_TEMPLATE,
     render_prompt,
 )
+from marketing_bot.scheduling.dispatcher import SendWindow
 from marketing_bot.segmentation.rfm import score_rfm
 from marketing_bot.senders.email_sender import EmailMessage, send_email
 from marketing_bot.senders.social_sender import SocialPost, send_social_post
@@ -111,6 +114,219 @@ def generate(
             send_social_post(SocialPost(platform=platform, content=social_content))
 
 
+@cli.command("send-campaign")
+@click.option("--campaign-id", type=str, required=True)
+@click.option("--max-emails", type=int, default=None, help="Per shard when sharded")
+@click.option(
+    "--shard",
+    type=str,
+    default=None,
+    help="Send only shard k of N (k/N, 0-based); run one process per shard",
+)
+@click.option(
+    "--live",
+    is_flag=True,
+    help="Pace sends per recipient domain; delivery still follows SENDER_DRY_RUN",
+)
+@click.option(
+    "--data-dir",
+    type=click.Path(path_type=Path),
+    default=Path("data"),
+    show_default=True,
+)
+def send_campaign(
+    campaign_id: str,
+    max_emails: Optional[int],
+    shard: Optional[str],
+    live: bool,
+    data_dir: Path,
+) -> None:
+    """Send an email campaign to its segment, optionally one shard of it."""
+    from marketing_bot.database.sharding import Shard
+    from marketing_bot.metrics.histogram import set_latency_data_dir
+    from marketing_bot.services.email_campaign_service import EmailCampaignService
+
+    try:
+        parsed = Shard.parse(shard) if shard else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--shard")
+    set_latency_data_dir(data_dir)
+    result = asyncio.run(
+        EmailCampaignService(data_dir).send_campaign(
+            campaign_id, max_emails=max_emails, dry_run=not live, shard=parsed
+        )
+    )
+    logger.info(f"Campaign {campaign_id} shard {shard or 'all'}: {result}")
+
+
+@cli.command("schedule-campaign")
+@click.option("--campaign-id", type=str, required=True)
+@click.option(
+    "--window", type=str, default="08:00-10:00", help="Recipient-local HH:MM-HH:MM"
+)
+@click.option(
+    "--timezone", type=str, default="UTC", help="Timezone for contacts without one"
+)
+@click.option("--max-emails", type=int, default=None)
+@click.option("--bucket-seconds", type=int, default=None)
+@click.option(
+    "--data-dir",
+    type=click.Path(path_type=Path),
+    default=Path("data"),
+    show_default=True,
+)
+def schedule_campaign(
+    campaign_id: str,
+    window: str,
+    timezone: str,
+    max_emails: Optional[int],
+    bucket_seconds: Optional[int],
+    data_dir: Path,
+) -> None:
+    """Spread an email campaign over a send window (run `dispatch` to send)."""
+    from marketing_bot.services.email_campaign_service import EmailCampaignService
+
+    service = EmailCampaignService(data_dir)
+    scheduled = service.schedule_campaign(
+        campaign_id,
+        SendWindow.parse(window, timezone),
+        max_emails=max_emails,
+        bucket_seconds=bucket_seconds,
+    )
+    logger.info(f"Scheduled {scheduled} sends")
+
+
+@cli.command()
+@click.option("--forever", is_flag=True, help="Keep running and poll for new schedules")
+@click.option(
+    "--data-dir",
+    type=click.Path(path_type=Path),
+    default=Path("data"),
+    show_default=True,
+)
+def dispatch(forever: bool, data_dir: Path) -> None:
+    """Release scheduled sends as they come due."""
+    from marketing_bot.metrics.histogram import set_latency_data_dir
+    from marketing_bot.services.email_campaign_service import EmailCampaignService
+
+    set_latency_data_dir(data_dir)
+    dispatcher = EmailCampaignService(data_dir).create_dispatcher()
+    logger.info(f"{dispatcher.pending()} scheduled sends pending")
+    sent = asyncio.run(dispatcher.run(forever=forever))
+    logger.info(f"Dispatched {sent} scheduled sends")
+
+
+@cli.command("metrics-retention")
+@click.option(
+    "--raw-days",
+    type=float,
+    default=None,
+    help="Raw event retention (default: METRICS_RAW_RETENTION_DAYS)",
+)
+@click.option(
+    "--data-dir",
+    type=click.Path(path_type=Path),
+    default=Path("data"),
+    show_default=True,
+)
+def metrics_retention(raw_days: Optional[float], data_dir: Path) -> None:
+    """Compact metrics rollups and delete expired raw event segments."""
+    from marketing_bot.metrics.tracker import MetricsTracker
+
+    result = MetricsTracker(data_dir).apply_retention(raw_days)
+    logger.info(
+        f"Removed {result['segments_removed']} raw segments and "
+        f"{result['rollup_buckets_removed']} rollup buckets"
+    )
+
+
+@cli.command("migrate-campaigns")
+@click.option(
+    "--data-dir",
+    type=click.Path(path_type=Path),
+    default=Path("data"),
+    show_default=True,
+)
+def migrate_campaigns(data_dir: Path) -> None:
+    """Import file-based campaigns and results into SQLite."""
+    from marketing_bot.repositories.factory import migrate_json_to_sqlite
+
+    imported = migrate_json_to_sqlite(data_dir)
+    logger.info(
+        f"Imported {imported['campaigns']} campaigns and {imported['results']} "
+        "results; set CAMPAIGN_REPOSITORY_BACKEND=sqlite to use them"
+    )
+
+
+@cli.command("migrate-contacts")
+@click.option(
+    "--data-dir",
+    type=click.Path(path_type=Path),
+    default=Path("data"),
+    show_default=True,
+)
+def migrate_contacts(data_dir: Path) -> None:
+    """Import email_contacts.csv into SQLite."""
+    from marketing_bot.database.factory import migrate_contacts_to_sqlite
+
+    report = migrate_contacts_to_sqlite(data_dir)
+    logger.info(
+        f"Imported {report.added} contacts ({report.updated} updated); "
+        "set EMAIL_DB_BACKEND=sqlite to use them"
+    )
+
+
+@cli.command()
+@click.argument("emails", nargs=-1)
+@click.option(
+    "--file",
+    "csv_file",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="CSV with an 'email' column to bulk-load",
+)
+@click.option("--reason", default="unsubscribe", show_default=True)
+@click.option(
+    "--data-dir",
+    type=click.Path(path_type=Path),
+    default=Path("data"),
+    show_default=True,
+)
+def suppress(
+    emails: tuple[str, ...], csv_file: Optional[Path], reason: str, data_dir: Path
+) -> None:
+    """Add addresses to the suppression list so they are never mailed."""
+    from marketing_bot.database.suppression import get_suppression_list
+
+    suppression = get_suppression_list(data_dir / "suppression")
+    if emails:
+        suppression.add(emails, reason=reason)
+    if csv_file:
+        suppression.load_csv(csv_file)
+    logger.info(f"{len(suppression)} suppressed addresses")
+
+
+@cli.command("compact-results")
+@click.option("--campaign-id", type=click.UUID, default=None, help="Only this campaign")
+@click.option(
+    "--data-dir",
+    type=click.Path(path_type=Path),
+    default=Path("data"),
+    show_default=True,
+)
+def compact_results(campaign_id: Optional[UUID], data_dir: Path) -> None:
+    """Rewrite result partitions without duplicates or corrupt lines."""
+    from marketing_bot.repositories.result_store import PartitionedResultStore
+
+    stats = PartitionedResultStore(data_dir / "campaign_results").compact(
+        str(campaign_id) if campaign_id else None
+    )
+    logger.info(
+        f"Compacted {stats['partitions']} partitions: {stats['results']} results "
+        f"kept, {stats['removed']} lines removed"
+    )
+
+
 def _split_email(content: str) -> tuple[str, str]:
     lines = [line.strip("\n") for line in content.splitlines() if line.strip()]
     subject_line = next(
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from marketing_bot.metrics.event_log import EventLog, LogPosition
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CampaignAggregate:
+    """Running totals for one campaign, updated per event."""
+
+    total_executions: int = 0
+    successful_executions: int = 0
+    failures_by_error: Dict[str, int] = field(default_factory=dict)
+    generation_count: int = 0
+    generation_failures: int = 0
+    generation_time_ms_sum: int = 0
+    first_event_at: Optional[str] = None
+    last_event_at: Optional[str] = None
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        timestamp = event.get("timestamp")
+        if timestamp:
+            if self.first_event_at is None or timestamp < self.first_event_at:
+                self.first_event_at = timestamp
+            if self.last_event_at is None or timestamp > self.last_event_at:
+                self.last_event_at = timestamp
+
+        if "generation_time_ms" in event:
+            self.generation_count += 1
+            self.generation_time_ms_sum += int(event.get("generation_time_ms") or 0)
+            if not event.get("success", False):
+                self.generation_failures += 1
+            return
+
+        self.total_executions += 1
+        if event.get("success", False):
+            self.successful_executions += 1
+        else:
+            error_class = event.get("error_class") or "unknown"
+            self.failures_by_error[error_class] = (
+                self.failures_by_error.get(error_class, 0) + 1
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        success_rate = (
+            (self.successful_executions / self.total_executions * 100)
+            if self.total_executions > 0
+            else 0
+        )
+        avg_generation_ms = (
+            self.generation_time_ms_sum / self.generation_count
+            if self.generation_count > 0
+            else 0
+        )
+        return {
+            "total_executions": self.total_executions,
+            "successful_executions": self.successful_executions,
+            "success_rate": round(success_rate, 2),
+            "failures_by_error": dict(self.failures_by_error),
+            "content_generation": {
+                "count": self.generation_count,
+                "failures": self.generation_failures,
+                "total_time_ms": self.generation_time_ms_sum,
+                "avg_time_ms": round(avg_generation_ms, 2),
+            },
+            "first_event_at": self.first_event_at,
+            "last_event_at": self.last_event_at,
+        }
+
+
+class CampaignAggregates:
+    """Per-campaign aggregates kept as a materialized view of the event log.
+
+    `refresh()` applies only events appended since the last call (from any
+    process), so summaries cost O(new events) instead of a full scan. The
+    view is snapshotted with the log position it reflects and restored from
+    that snapshot on startup, replaying only the log tail.
+    """
+
+    def __init__(
+        self, log: EventLog, snapshot_file: Path, snapshot_every: int = 10_000
+    ):
+        self.log = log
+        self.snapshot_file = snapshot_file
+        self.snapshot_every = snapshot_every
+        self._lock = threading.Lock()
+        self._campaigns: Dict[str, CampaignAggregate] = {}
+        self._position: Optional[LogPosition] = None
+        self._unsaved = 0
+        self._load_snapshot()
+
+    @property
+    def position(self) -> Optional[LogPosition]:
+        return self._position
+
+    def _load_snapshot(self) -> None:
+        if not self.snapshot_file.exists():
+            return
+        try:
+            data = json.loads(self.snapshot_file.read_text())
+            self._position = LogPosition(*data["position"])
+            self._campaigns = {
+                campaign_id: CampaignAggregate(**values)
+                for campaign_id, values in data["campaigns"].items()
+            }
+        except Exception as e:
+            logger.error(f"Failed to load metrics snapshot, rebuilding: {e}")
+            self._campaigns = {}
+            self._position = None
+
+    def refresh(self) -> None:
+        """Apply events appended to the log since the last refresh."""
+        with self._lock:
+            applied = 0
+            for event, position in self.log.read_from(self._position):
+                campaign_id = event.get("campaign_id")
+                if campaign_id is not None:
+                    aggregate = self._campaigns.get(campaign_id)
+                    if aggregate is None:
+                        aggregate = self._campaigns[campaign_id] = CampaignAggregate()
+                    aggregate.apply(event)
+                self._position = position
+                applied += 1
+            self._unsaved += applied
+            if self._unsaved >= self.snapshot_every:
+                self._save_snapshot()
+
+    def get(self, campaign_id: str) -> CampaignAggregate:
+        self.refresh()
+        with self._lock:
+            return self._campaigns.get(campaign_id) or CampaignAggregate()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save_snapshot()
+
+    def _save_snapshot(self) -> None:
+        if self._position is None:
+            return
+        payload = {
+            "position": list(self._position),
+            "campaigns": {
+                campaign_id: asdict(aggregate)
+                for campaign_id, aggregate in self._campaigns.items()
+            },
+        }
+        tmp = self.snapshot_file.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(payload, separators=(",", ":")))
+            os.replace(tmp, self.snapshot_file)
+            self._unsaved = 0
+        except Exception as e:
+            logger.error(f"Failed to save metrics snapshot: {e}")
+
+
+_views: Dict[Path, CampaignAggregates] = {}
+_views_lock = threading.Lock()
+
+
+def get_campaign_aggregates(log: EventLog, snapshot_file: Path) -> CampaignAggregates:
+    """Process-wide aggregate view per snapshot file, saved at interpreter exit."""
+    key = snapshot_file.resolve()
+    with _views_lock:
+        view = _views.get(key)
+        if view is None:
+            view = CampaignAggregates(log, snapshot_file)
+            _views[key] = view
+        return view
+
+
+@atexit.register
+def _save_views() -> None:
+    with _views_lock:
+        for view in _views.values():
+            view.save()
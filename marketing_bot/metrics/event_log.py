@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _encode(event: Dict[str, Any]) -> bytes:
+    return json.dumps(event, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+
+class LogPosition(NamedTuple):
+    """Point in the log: segment sequence number and byte offset within it."""
+
+    segment: int
+    offset: int
+
+
+class EventLog:
+    """Append-only, line-delimited JSON event log split into segments.
+
+    Events are buffered and written with a single O_APPEND `write` per flush,
+    so whole lines from concurrent writers (threads or processes) never
+    interleave. Segments are named `<prefix>-<seq>.jsonl`; the highest
+    sequence is the active one and a new segment is started once it exceeds
+    `max_segment_bytes`.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        prefix: str = "metrics",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        flush_every: int = 100,
+        flush_interval: float = 1.0,
+        fsync_interval: float = 5.0,
+    ):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.RLock()
+        self._buffer: List[bytes] = []
+        self._fd: Optional[int] = None
+        self._segment = 0
+        self._last_flush = time.monotonic()
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.directory / f"{self.prefix}-{seq:06d}.jsonl"
+
+    def segments(self) -> List[Tuple[int, Path]]:
+        """All segments as (sequence, path), oldest first."""
+        found = []
+        for path in self.directory.glob(f"{self.prefix}-*.jsonl"):
+            try:
+                found.append((int(path.stem.rsplit("-", 1)[1]), path))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    def _open_active(self) -> int:
+        if self._fd is None:
+            existing = self.segments()
+            self._segment = existing[-1][0] if existing else 1
+            self._fd = os.open(
+                self._segment_path(self._segment),
+                os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                0o644,
+            )
+        return self._fd
+
+    def _rotate(self) -> None:
+        self._close_fd()
+        existing = self.segments()
+        next_seq = max(self._segment, existing[-1][0] if existing else 0) + 1
+        self._segment = next_seq
+        self._fd = os.open(
+            self._segment_path(next_seq),
+            os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+            0o644,
+        )
+        logger.info(f"Rotated metrics log to segment {next_seq}")
+
+    def _close_fd(self) -> None:
+        if self._fd is not None:
+            if self._dirty:
+                os.fsync(self._fd)
+                self._dirty = False
+            os.close(self._fd)
+            self._fd = None
+
+    def append(self, event: Dict[str, Any]) -> None:
+        """Buffer one event; flushes by count or age."""
+        line = _encode(event)
+        with self._lock:
+            self._buffer.append(line)
+            if (
+                len(self._buffer) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self.flush()
+
+    def append_many(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._buffer.extend(_encode(event) for event in events)
+            self.flush()
+
+    def flush(self, fsync: bool = False) -> None:
+        """Write buffered events; fsync if asked or `fsync_interval` elapsed."""
+        with self._lock:
+            now = time.monotonic()
+            if self._buffer:
+                data = b"".join(self._buffer)
+                self._buffer.clear()
+                fd = self._open_active()
+                view = memoryview(data)
+                while view:
+                    written = os.write(fd, view)
+                    view = view[written:]
+                self._dirty = True
+            self._last_flush = now
+
+            if self._fd is not None and self._dirty:
+                if fsync or now - self._last_fsync >= self.fsync_interval:
+                    os.fsync(self._fd)
+                    self._dirty = False
+                    self._last_fsync = now
+                if os.fstat(self._fd).st_size >= self.max_segment_bytes:
+                    self._rotate()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush(fsync=True)
+            self._close_fd()
+
+    def position(self) -> LogPosition:
+        """End of the log as of now (after flushing this writer's buffer)."""
+        with self._lock:
+            self.flush()
+            existing = self.segments()
+            if not existing:
+                return LogPosition(0, 0)
+            seq, path = existing[-1]
+            return LogPosition(seq, path.stat().st_size)
+
+    def iter_events(
+        self, start: Optional[LogPosition] = None, end: Optional[LogPosition] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield events oldest first, from `start` up to `end` (default: the end)."""
+        for event, _ in self.read_from(start, end):
+            yield event
+
+    def read_from(
+        self, start: Optional[LogPosition] = None, end: Optional[LogPosition] = None
+    ) -> Iterator[Tuple[Dict[str, Any], LogPosition]]:
+        """Yield (event, position just after it), so readers can resume later."""
+        self.flush()
+        for seq, path in self.segments():
+            if start is not None and seq < start.segment:
+                continue
+            if end is not None and seq > end.segment:
+                break
+            offset = start.offset if start is not None and seq == start.segment else 0
+            limit = end.offset if end is not None and seq == end.segment else None
+            try:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    read = offset
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break  # torn or in-progress write
+                        read += len(line)
+                        if limit is not None and read > limit:
+                            break
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            logger.warning(f"Skipping corrupt metrics line in {path}")
+                            continue
+                        yield event, LogPosition(seq, read)
+            except FileNotFoundError:
+                continue  # removed by retention while we were reading
+
+    def delete_segments(self, before_segment: int, modified_before: float) -> int:
+        """Remove closed segments older than `before_segment` and last written
+        before `modified_before` (epoch seconds); returns how many were removed.
+
+        Readers that resume from a deleted segment continue at the next one.
+        """
+        removed = 0
+        with self._lock:
+            existing = self.segments()
+            active = existing[-1][0] if existing else 0
+            for seq, path in existing:
+                if seq >= min(before_segment, active):
+                    break
+                try:
+                    if path.stat().st_mtime >= modified_before:
+                        break
+                    path.unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    continue
+        if removed:
+            logger.info(f"Removed {removed} expired metrics segments")
+        return removed
+
+    def migrate_json_array(self, json_file: Path) -> int:
+        """One-time import of a legacy JSON-array metrics file.
+
+        The file is renamed before reading so only one process migrates it,
+        and kept as `<name>.migrated` afterwards. Its events become segment
+        0, ahead of every live segment; the segment is written to a temp file
+        and linked in only once complete, so a claim left behind by a crash
+        is migrated again on the next start without duplicating events.
+        """
+        claimed = json_file.with_name(json_file.name + ".migrating")
+        try:
+            os.replace(json_file, claimed)
+        except FileNotFoundError:
+            if not claimed.exists():
+                return 0
+            logger.warning(f"Resuming interrupted migration of {json_file}")
+        try:
+            events = json.loads(claimed.read_text() or "[]")
+        except Exception as e:
+            logger.error(f"Failed to read legacy metrics file {json_file}: {e}")
+            os.replace(claimed, json_file)
+            return 0
+        segment = self._segment_path(0)
+        tmp = segment.with_name(f"{segment.name}.{os.getpid()}.tmp")
+        migrated = len(events)
+        try:
+            with open(tmp, "wb") as f:
+                f.write(b"".join(_encode(event) for event in events))
+                f.flush()
+                os.fsync(f.fileno())
+            # Unlike a rename, a link never replaces a segment already in place
+            os.link(tmp, segment)
+        except FileExistsError:
+            migrated = 0  # linked in before a crash; only the rename was left
+        finally:
+            tmp.unlink(missing_ok=True)
+        try:
+            os.replace(claimed, json_file.with_name(json_file.name + ".migrated"))
+        except FileNotFoundError:
+            pass  # a concurrent resume finished first
+        logger.info(f"Migrated {migrated} metrics from {json_file} to {self.directory}")
+        return migrated
+
+
+_logs: Dict[Path, EventLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_event_log(directory: Path, **kwargs: Any) -> EventLog:
+    """Process-wide shared log per directory, flushed at interpreter exit."""
+    key = directory.resolve()
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None:
+            log = EventLog(directory, **kwargs)
+            _logs[key] = log
+        return log
+
+
+@atexit.register
+def _close_logs() -> None:
+    with _logs_lock:
+        for log in _logs.values():
+            try:
+                log.close()
+            except Exception as e:
+                logger.error(f"Failed to close metrics log {log.directory}: {e}")
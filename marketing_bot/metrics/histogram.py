@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from marketing_bot.utils.logger import get_logger
+
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+
+class LogLinearHistogram:
+    """HDR-style histogram over non-negative integers.
+
+    Values below `2**sub_bucket_bits` are counted exactly; above that each
+    power-of-two range is split into `2**(sub_bucket_bits - 1)` linear
+    sub-buckets, so every recorded value is kept within a relative error of
+    `2**-(sub_bucket_bits - 1)` (under 1% with the default of 8 bits). Counts
+    are stored sparsely, histograms merge by adding counts, and the whole
+    structure serializes to a small dict.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 8):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._sub_count = 1 << sub_bucket_bits
+        self._half = self._sub_count >> 1
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return (
+            self._sub_count + (shift - 1) * self._half + (value >> shift) - self._half
+        )
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < self._sub_count:
+            return index
+        shift, offset = divmod(index - self._sub_count, self._half)
+        shift += 1
+        return ((self._half + offset + 1) << shift) - 1
+
+    def record(self, value: int, count: int = 1) -> None:
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LogLinearHistogram") -> None:
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """Highest value equivalent to the given percentile (0-100)."""
+        if self.count == 0:
+            return 0
+        target = max(1, int(round(percentile / 100.0 * self.count + 0.5 - 1e-9)))
+        target = min(target, self.count)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sub_bucket_bits": self.sub_bucket_bits,
+            "counts": {str(k): v for k, v in self.counts.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogLinearHistogram":
+        histogram = cls(data.get("sub_bucket_bits", 8))
+        histogram.counts = {int(k): v for k, v in data.get("counts", {}).items()}
+        histogram.count = data.get("count", 0)
+        histogram.total = data.get("total", 0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        return histogram
+
+
+HistogramKey = Tuple[str, int]  # (operation, window start epoch seconds)
+
+
+class LatencyRecorder:
+    """Latency histograms per operation and time window (microsecond values).
+
+    Samples land in an in-memory delta; `save()` merges deltas into the
+    shared file under a lock, so several processes can record into the same
+    data dir. A daemon thread, started by the first sample, saves every
+    `save_interval` seconds so recording threads never do file I/O. Queries
+    merge the file with the unsaved local delta.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        window_seconds: int = 3600,
+        retention_windows: int = 24 * 7,
+        save_interval: float = 30.0,
+    ):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.window_seconds = window_seconds
+        self.retention_windows = retention_windows
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[HistogramKey, LogLinearHistogram] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _window(self, at: float) -> int:
+        return int(at // self.window_seconds) * self.window_seconds
+
+    def record(
+        self, operation: str, value_ms: float, at: Optional[float] = None
+    ) -> None:
+        """Record one latency sample in milliseconds."""
+        key = (operation, self._window(time.time() if at is None else at))
+        with self._lock:
+            histogram = self._pending.get(key)
+            if histogram is None:
+                histogram = self._pending[key] = LogLinearHistogram()
+            histogram.record(int(value_ms * 1000))
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(
+                    target=self._run, name="latency-saver", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.save_interval):
+            self.save()
+
+    def close(self) -> None:
+        """Stop the saver thread and save what is pending."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5.0)
+        self.save()
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(self.path.with_suffix(".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_file(self) -> Dict[HistogramKey, LogLinearHistogram]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text())
+        except Exception as e:
+            logger.error(f"Failed to read latency histograms: {e}")
+            return {}
+        return {
+            (entry["operation"], entry["window_start"]): LogLinearHistogram.from_dict(
+                entry["histogram"]
+            )
+            for entry in data
+        }
+
+    def save(self) -> None:
+        """Merge unsaved samples into the shared file and drop expired windows."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            with self._file_lock():
+                stored = self._read_file()
+                for key, histogram in pending.items():
+                    if key in stored:
+                        stored[key].merge(histogram)
+                    else:
+                        stored[key] = histogram
+                cutoff = self._window(time.time()) - (
+                    self.retention_windows * self.window_seconds
+                )
+                entries = [
+                    {
+                        "operation": operation,
+                        "window_start": window_start,
+                        "histogram": histogram.to_dict(),
+                    }
+                    for (operation, window_start), histogram in stored.items()
+                    if window_start >= cutoff
+                ]
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(entries, separators=(",", ":")))
+                os.replace(tmp, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save latency histograms: {e}")
+            with self._lock:
+                for key, histogram in pending.items():
+                    if key in self._pending:
+                        histogram.merge(self._pending[key])
+                    self._pending[key] = histogram
+
+    def _merged(self) -> Dict[HistogramKey, LogLinearHistogram]:
+        merged = self._read_file()
+        with self._lock:
+            for key, histogram in self._pending.items():
+                if key in merged:
+                    merged[key].merge(histogram)
+                else:
+                    copy = LogLinearHistogram(histogram.sub_bucket_bits)
+                    copy.merge(histogram)
+                    merged[key] = copy
+        return merged
+
+    def operations(self) -> List[str]:
+        return sorted({operation for operation, _ in self._merged()})
+
+    def percentiles(
+        self,
+        operation: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """p50/p90/p99/max (ms) for `operation` over windows in [since, until)."""
+        combined = LogLinearHistogram()
+        for (op, window_start), histogram in self._merged().items():
+            if op != operation:
+                continue
+            if since is not None and window_start + self.window_seconds <= since:
+                continue
+            if until is not None and window_start >= until:
+                continue
+            combined.merge(histogram)
+        return {
+            "operation": operation,
+            "count": combined.count,
+            "p50_ms": combined.value_at_percentile(50) / 1000,
+            "p90_ms": combined.value_at_percentile(90) / 1000,
+            "p99_ms": combined.value_at_percentile(99) / 1000,
+            "max_ms": (combined.max or 0) / 1000,
+            "mean_ms": round(combined.mean() / 1000, 3),
+        }
+
+
+_recorders: Dict[Path, LatencyRecorder] = {}
+_recorders_lock = threading.Lock()
+_default_data_dir = Path("data")
+
+
+def set_latency_data_dir(data_dir: Path) -> None:
+    """Make `data_dir` the default for `get_latency_recorder()`, so code with
+    no data dir of its own (LLM client, email sender) records next to the
+    configured metrics. Call it once at startup (CLI entry points do)."""
+    global _default_data_dir
+    _default_data_dir = data_dir
+
+
+def get_latency_recorder(data_dir: Optional[Path] = None) -> LatencyRecorder:
+    """Process-wide recorder per data dir (the configured default if None),
+    saved at interpreter exit."""
+    data_dir = _default_data_dir if data_dir is None else data_dir
+    path = (data_dir / "latency_histograms.json").resolve()
+    with _recorders_lock:
+        recorder = _recorders.get(path)
+        if recorder is None:
+            recorder = _recorders[path] = LatencyRecorder(path)
+        return recorder
+
+
+@atexit.register
+def _save_recorders() -> None:
+    with _recorders_lock:
+        recorders = list(_recorders.values())
+    for recorder in recorders:
+        recorder.close()
@@ -0,0 +1,296 @@
+"""In-process counters, gauges and histograms with OpenMetrics exposition.
+
+Counters and histograms are sharded per thread: each thread updates its own
+cell without locking and shards are summed at scrape time, so instruments
+are cheap enough for the hot send loop.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Sharded:
+    """Per-thread list cells of a fixed width, merged on read."""
+
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self._width
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def merged(self) -> List[float]:
+        with self._lock:
+            cells = list(self._cells)
+        total = [0.0] * self._width
+        for cell in cells:
+            for i, value in enumerate(cell):
+                total[i] += value
+        return total
+
+
+class _CounterChild:
+    def __init__(self) -> None:
+        self._shards = _Sharded(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.cell()[0] += amount
+
+    def value(self) -> float:
+        return self._shards.merged()[0]
+
+
+class _GaugeChild:
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def value(self) -> float:
+        return self._value
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._buckets = buckets
+        # One slot per bucket (+Inf last), then sum
+        self._shards = _Sharded(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        cell = self._shards.cell()
+        cell[bisect.bisect_left(self._buckets, value)] += 1
+        cell[-1] += value
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """(cumulative bucket counts incl. +Inf, count, sum)."""
+        merged = self._shards.merged()
+        cumulative, running = [], 0.0
+        for count in merged[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, merged[-1]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def labels(self, *values: str, **kwargs: str):
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _unlabelled(self):
+        return self.labels()
+
+    def _items(self) -> List[Tuple[List[Tuple[str, str]], object]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(list(zip(self.labelnames, values)), child) for values, child in items]
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+    def samples(self) -> Iterator[str]:
+        for labels, child in self._items():
+            yield f"{self.name}_total{_format_labels(labels)} {_format_value(child.value())}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+
+    def samples(self) -> Iterator[str]:
+        for labels, child in self._items():
+            yield f"{self.name}{_format_labels(labels)} {_format_value(child.value())}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        registry: Optional["Registry"] = None,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+
+    def samples(self) -> Iterator[str]:
+        for labels, child in self._items():
+            cumulative, count, total = child.snapshot()
+            for bound, value in zip(self.buckets + (math.inf,), cumulative):
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                bucket_labels = labels + [("le", le)]
+                yield f"{self.name}_bucket{_format_labels(bucket_labels)} {_format_value(value)}"
+            yield f"{self.name}_count{_format_labels(labels)} {_format_value(count)}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """OpenMetrics text exposition of every registered metric."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.extend(metric.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+GENERATION_LATENCY = Histogram(
+    "marketing_generation_latency_seconds",
+    "LLM content generation latency",
+    ["model"],
+)
+LLM_TOKENS = Counter("marketing_llm_tokens", "LLM tokens consumed", ["model", "kind"])
+CACHE_HITS = Counter("marketing_cache_hits", "Cache hits", ["cache"])
+CACHE_MISSES = Counter("marketing_cache_misses", "Cache misses", ["cache"])
+EMAILS_SENT = Counter("marketing_emails_sent", "Emails sent", ["provider"])
+EMAILS_FAILED = Counter(
+    "marketing_emails_failed", "Emails that failed to send", ["provider"]
+)
+EMAILS_SUPPRESSED = Counter(
+    "marketing_emails_suppressed",
+    "Recipients skipped because their address is suppressed",
+    ["stage"],
+)
+QUEUE_DEPTH = Gauge("marketing_queue_depth", "Items waiting in a queue", ["queue"])
+METRICS_DROPPED = Counter(
+    "marketing_metrics_events_dropped",
+    "Metrics events dropped by a full writer queue",
+    ["policy"],
+)
+RFM_SCORING_DURATION = Histogram(
+    "marketing_rfm_scoring_duration_seconds", "RFM scoring duration"
+)
+RFM_ROWS = Counter("marketing_rfm_rows", "Rows scored by RFM segmentation")
+RFM_ROWS_PER_SECOND = Gauge(
+    "marketing_rfm_rows_per_second", "Throughput of the most recent RFM scoring run"
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "marketing_http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+)
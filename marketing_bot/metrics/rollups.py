@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from marketing_bot.metrics.event_log import EventLog, LogPosition
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+
+SeriesKey = Tuple[str, str]  # (campaign_id, outcome)
+
+
+def event_epoch(event: Dict[str, Any]) -> Optional[float]:
+    """Epoch seconds of an event's ISO timestamp (naive values are UTC)."""
+    timestamp = event.get("timestamp")
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def event_outcome(event: Dict[str, Any]) -> str:
+    success = bool(event.get("success", False))
+    if "generation_time_ms" in event:
+        return "generated" if success else "generation_failed"
+    return "success" if success else "failure"
+
+
+class MetricRollups:
+    """Per-campaign outcome counts downsampled to minute/hour/day buckets.
+
+    Like `CampaignAggregates`, this is a materialized view of the event log:
+    `refresh()` applies only the log tail and the view is snapshotted with
+    the position it reflects. Minute and hour buckets are kept for a limited
+    time (`retention_days`); day buckets are kept forever, so long-range
+    queries never touch raw events.
+    """
+
+    def __init__(
+        self,
+        log: EventLog,
+        snapshot_file: Path,
+        retention_days: Optional[Dict[str, Optional[float]]] = None,
+        snapshot_every: int = 10_000,
+    ):
+        self.log = log
+        self.snapshot_file = snapshot_file
+        self.retention_days = {"minute": 2, "hour": 90, "day": None}
+        self.retention_days.update(retention_days or {})
+        self.snapshot_every = snapshot_every
+        self._lock = threading.Lock()
+        self._series: Dict[str, Dict[SeriesKey, Dict[int, int]]] = {
+            resolution: {} for resolution in RESOLUTIONS
+        }
+        self._position: Optional[LogPosition] = None
+        self._unsaved = 0
+        self._load_snapshot()
+
+    @property
+    def position(self) -> Optional[LogPosition]:
+        return self._position
+
+    def _load_snapshot(self) -> None:
+        if not self.snapshot_file.exists():
+            return
+        try:
+            data = json.loads(self.snapshot_file.read_text())
+            self._position = LogPosition(*data["position"])
+            for resolution, series in data["series"].items():
+                self._series[resolution] = {
+                    tuple(key.split("|", 1)): {
+                        int(bucket): count for bucket, count in buckets.items()
+                    }
+                    for key, buckets in series.items()
+                }
+        except Exception as e:
+            logger.error(f"Failed to load metrics rollups, rebuilding: {e}")
+            self._series = {resolution: {} for resolution in RESOLUTIONS}
+            self._position = None
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        campaign_id = event.get("campaign_id")
+        at = event_epoch(event)
+        if campaign_id is None or at is None:
+            return
+        key = (campaign_id, event_outcome(event))
+        for resolution, seconds in RESOLUTIONS.items():
+            buckets = self._series[resolution].setdefault(key, {})
+            bucket = int(at // seconds) * seconds
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+
+    def refresh(self) -> None:
+        """Apply events appended to the log since the last refresh."""
+        with self._lock:
+            applied = 0
+            for event, position in self.log.read_from(self._position):
+                self._apply(event)
+                self._position = position
+                applied += 1
+            self._unsaved += applied
+            if self._unsaved >= self.snapshot_every:
+                self._compact(time.time())
+                self._save_snapshot()
+
+    def _compact(self, now: float) -> int:
+        removed = 0
+        for resolution, days in self.retention_days.items():
+            if days is None:
+                continue
+            cutoff = now - days * 86400
+            series = self._series[resolution]
+            for key in list(series):
+                buckets = series[key]
+                for bucket in [b for b in buckets if b < cutoff]:
+                    del buckets[bucket]
+                    removed += 1
+                if not buckets:
+                    del series[key]
+        return removed
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Drop fine-grained buckets past their retention; returns buckets removed."""
+        with self._lock:
+            return self._compact(time.time() if now is None else now)
+
+    def pick_resolution(self, start: float, end: float, now: float) -> str:
+        """Finest resolution that covers `start` and yields a readable series."""
+        span = end - start
+        for resolution, max_span in (("minute", 6 * 3600), ("hour", 14 * 86400)):
+            days = self.retention_days[resolution]
+            retained = days is None or start >= now - days * 86400
+            if span <= max_span and retained:
+                return resolution
+        return "day"
+
+    def query(
+        self,
+        campaign_id: str,
+        start: float,
+        end: float,
+        resolution: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Outcome counts per bucket in [start, end) for one campaign."""
+        self.refresh()
+        resolution = resolution or self.pick_resolution(start, end, time.time())
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        seconds = RESOLUTIONS[resolution]
+        first = int(start // seconds) * seconds
+        points: Dict[int, Dict[str, int]] = {}
+        with self._lock:
+            for (cid, outcome), buckets in self._series[resolution].items():
+                if cid != campaign_id:
+                    continue
+                for bucket, count in buckets.items():
+                    if first <= bucket < end:
+                        points.setdefault(bucket, {})[outcome] = count
+        return {
+            "campaign_id": campaign_id,
+            "resolution": resolution,
+            "points": [
+                {
+                    "bucket_start": datetime.fromtimestamp(
+                        bucket, timezone.utc
+                    ).isoformat(),
+                    **points[bucket],
+                }
+                for bucket in sorted(points)
+            ],
+        }
+
+    def save(self) -> None:
+        with self._lock:
+            self._save_snapshot()
+
+    def _save_snapshot(self) -> None:
+        if self._position is None:
+            return
+        payload = {
+            "position": list(self._position),
+            "series": {
+                resolution: {
+                    f"{campaign_id}|{outcome}": buckets
+                    for (campaign_id, outcome), buckets in series.items()
+                }
+                for resolution, series in self._series.items()
+            },
+        }
+        tmp = self.snapshot_file.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(payload, separators=(",", ":")))
+            os.replace(tmp, self.snapshot_file)
+            self._unsaved = 0
+        except Exception as e:
+            logger.error(f"Failed to save metrics rollups: {e}")
+
+
+_views: Dict[Path, MetricRollups] = {}
+_views_lock = threading.Lock()
+
+
+def get_metric_rollups(
+    log: EventLog,
+    snapshot_file: Path,
+    retention_days: Optional[Dict[str, Optional[float]]] = None,
+) -> MetricRollups:
+    """Process-wide rollup view per snapshot file, saved at interpreter exit."""
+    key = snapshot_file.resolve()
+    with _views_lock:
+        view = _views.get(key)
+        if view is None:
+            view = MetricRollups(log, snapshot_file, retention_days)
+            _views[key] = view
+        return view
+
+
+@atexit.register
+def _save_views() -> None:
+    with _views_lock:
+        for view in _views.values():
+            view.save()
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 from uuid import UUID
 
+from marketing_bot.config import settings
+from marketing_bot.metrics.aggregates import get_campaign_aggregates
+from marketing_bot.metrics.event_log import get_event_log
+from marketing_bot.metrics.histogram import get_latency_recorder
+from marketing_bot.metrics.rollups import get_metric_rollups
+from marketing_bot.metrics.writer import get_metrics_writer
 from marketing_bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -17,10 +23,27 @@ class MetricsTracker:
     def __init__(self, data_dir: Path = Path("data")):
         self.data_dir = data_dir
         self.data_dir.mkdir(exist_ok=True)
+        # Legacy JSON-array file, migrated once into the append-only log
         self.metrics_file = self.data_dir / "metrics.json"
+        self.log = get_event_log(self.data_dir / "metrics_log")
+        # Tracking only enqueues; a background thread batches writes to the log
+        self.writer = get_metrics_writer(self.log)
 
-        if not self.metrics_file.exists():
-            self.metrics_file.write_text("[]")
+        if self.metrics_file.exists():
+            self.log.migrate_json_array(self.metrics_file)
+
+        self.aggregates = get_campaign_aggregates(
+            self.log, self.data_dir / "metrics_aggregates.json"
+        )
+        self.rollups = get_metric_rollups(
+            self.log,
+            self.data_dir / "metrics_rollups.json",
+            retention_days={
+                "minute": settings.METRICS_MINUTE_ROLLUP_RETENTION_DAYS,
+                "hour": settings.METRICS_HOUR_ROLLUP_RETENTION_DAYS,
+            },
+        )
+        self.latency = get_latency_recorder(self.data_dir)
 
     async def track_campaign_execution(
         self,
@@ -28,6 +51,7 @@ class MetricsTracker:
         customer_id: str,
         success: bool,
         error: Optional[str] = None,
+        error_class: Optional[str] = None,
     ) -> None:
         """Track campaign execution metrics."""
         metric = {
@@ -37,10 +61,10 @@ class MetricsTracker:
             "success": success,
             "error": error,
         }
+        if error_class:
+            metric["error_class"] = error_class
 
-        metrics = self._load_metrics()
-        metrics.append(metric)
-        self._save_metrics(metrics)
+        await self.writer.asubmit(metric)
 
         logger.info(
             f"Tracked execution: campaign={campaign_id}, customer={customer_id}, success={success}"
@@ -62,44 +86,107 @@ class MetricsTracker:
             "success": success,
         }
 
-        metrics = self._load_metrics()
-        metrics.append(metric)
-        self._save_metrics(metrics)
+        await self.writer.asubmit(metric)
+        self.latency.record(f"content:{content_type}", generation_time_ms)
+
+    async def get_campaign_metrics(
+        self, campaign_id: UUID, include_events: bool = False
+    ) -> dict:
+        """Get metrics for a specific campaign.
+
+        The summary comes from incremental aggregates; raw events are only
+        scanned from the log when `include_events` is set.
+        """
+        self.writer.flush()
+        campaign_key = str(campaign_id)
+        result = {
+            "campaign_id": campaign_key,
+            **self.aggregates.get(campaign_key).summary(),
+        }
+        if include_events:
+            result["metrics"] = [
+                m
+                for m in self.log.iter_events()
+                if m.get("campaign_id") == campaign_key
+            ]
+        return result
+
+    def get_timeseries(
+        self,
+        campaign_id: UUID,
+        start: datetime,
+        end: Optional[datetime] = None,
+        resolution: Optional[str] = None,
+    ) -> dict:
+        """Outcome counts over time from rollups, never from raw events.
+
+        `resolution` is minute, hour or day; by default the finest one that
+        suits the range and is still retained is used.
+        """
+        self.writer.flush()
+        end = end or datetime.utcnow()
+        return self.rollups.query(
+            str(campaign_id), _epoch(start), _epoch(end), resolution
+        )
 
-    async def get_campaign_metrics(self, campaign_id: UUID) -> dict:
-        """Get metrics for a specific campaign."""
-        metrics = self._load_metrics()
-        campaign_metrics = [m for m in metrics if m["campaign_id"] == str(campaign_id)]
+    def apply_retention(self, raw_retention_days: Optional[float] = None) -> dict:
+        """Compact old rollup buckets and delete expired raw log segments.
 
-        total_executions = len(campaign_metrics)
-        successful_executions = len(
-            [m for m in campaign_metrics if m.get("success", False)]
-        )
-        success_rate = (
-            (successful_executions / total_executions * 100)
-            if total_executions > 0
-            else 0
+        Only segments already folded into both the aggregates and the
+        rollups (and snapshotted) are removed.
+        """
+        days = (
+            settings.METRICS_RAW_RETENTION_DAYS
+            if raw_retention_days is None
+            else raw_retention_days
         )
-
+        self.writer.flush()
+        self.aggregates.refresh()
+        self.rollups.refresh()
+        buckets_removed = self.rollups.compact()
+        self.aggregates.save()
+        self.rollups.save()
+        positions = [p for p in (self.aggregates.position, self.rollups.position) if p]
+        segments_removed = 0
+        if len(positions) == 2:
+            segments_removed = self.log.delete_segments(
+                before_segment=min(p.segment for p in positions),
+                modified_before=time.time() - days * 86400,
+            )
         return {
-            "campaign_id": str(campaign_id),
-            "total_executions": total_executions,
-            "successful_executions": successful_executions,
-            "success_rate": round(success_rate, 2),
-            "metrics": campaign_metrics,
+            "segments_removed": segments_removed,
+            "rollup_buckets_removed": buckets_removed,
         }
 
+    def get_latency_percentiles(
+        self, operation: Optional[str] = None, hours: float = 1.0
+    ) -> dict:
+        """p50/p90/p99/max latency per operation over the last `hours`.
+
+        Operations are `generation:<model>`, `content:<type>` and
+        `send:<provider>`; pass one to restrict the result to it.
+        """
+        since = time.time() - hours * 3600
+        operations = [operation] if operation else self.latency.operations()
+        return {op: self.latency.percentiles(op, since=since) for op in operations}
+
+    def flush(self) -> None:
+        """Force queued and buffered events to disk (fsync included)."""
+        self.writer.flush(fsync=True)
+        self.latency.save()
+
     def _load_metrics(self) -> list:
-        """Load metrics from file."""
+        """Load all metrics from the event log."""
         try:
-            return json.loads(self.metrics_file.read_text())
+            self.writer.flush()
+            return list(self.log.iter_events())
         except Exception as e:
             logger.error(f"Failed to load metrics: {e}")
             return []
 
-    def _save_metrics(self, metrics: list) -> None:
-        """Save metrics to file."""
-        try:
-            self.metrics_file.write_text(json.dumps(metrics, indent=2, default=str))
-        except Exception as e:
-            logger.error(f"Failed to save metrics: {e}")
+
+def _epoch(value: datetime) -> float:
+    """Naive datetimes are UTC, matching event timestamps."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from marketing_bot.config import settings
+from marketing_bot.metrics.event_log import EventLog
+from marketing_bot.metrics.instruments import METRICS_DROPPED, QUEUE_DEPTH
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+QUEUE_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+
+class BackgroundMetricsWriter:
+    """Bounded in-memory queue drained into an `EventLog` by a daemon thread.
+
+    `submit()` never does file I/O. When the queue is full the policy
+    decides: `drop_oldest` (the default) evicts the oldest queued event,
+    `drop_newest` discards the incoming one and `block` waits up to
+    `block_timeout` for room (then drops the event). Async callers use
+    `asubmit()`, which does that waiting off the event-loop thread.
+    Batches are written once `batch_size` events are queued or
+    `flush_interval` has passed.
+    """
+
+    def __init__(
+        self,
+        log: EventLog,
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        policy: str = "drop_oldest",
+        block_timeout: float = 1.0,
+    ):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown metrics queue policy: {policy}")
+        self.log = log
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._cond = threading.Condition()
+        # Serializes batch writes so explicit flushes keep event order
+        self._write_lock = threading.Lock()
+        self._queue_depth = QUEUE_DEPTH.labels(queue="metrics_writer")
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _drop(self, count: int = 1) -> None:
+        self.dropped += count
+        METRICS_DROPPED.labels(policy=self.policy).inc(count)
+
+    def submit(self, event: Dict[str, Any]) -> bool:
+        """Queue one event; returns False if it was dropped."""
+        with self._cond:
+            stopped = self._stopped
+            if not stopped:
+                return self._enqueue(event)
+        # After shutdown, write through so late events are not lost
+        self.log.append(event)
+        return True
+
+    async def asubmit(self, event: Dict[str, Any]) -> bool:
+        """`submit()` for coroutines: never blocks the event loop."""
+        if self.policy == "block":
+            with self._cond:
+                if not self._stopped and len(self._queue) < self.max_queue:
+                    return self._enqueue(event)
+            return await asyncio.to_thread(self.submit, event)
+        return self.submit(event)
+
+    def _enqueue(self, event: Dict[str, Any]) -> bool:
+        """Apply the full-queue policy and append; caller holds `_cond`."""
+        if len(self._queue) >= self.max_queue:
+            if self.policy == "drop_newest":
+                self._drop()
+                return False
+            if self.policy == "drop_oldest":
+                self._queue.popleft()
+                self._drop()
+            else:
+                deadline = time.monotonic() + self.block_timeout
+                while len(self._queue) >= self.max_queue:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._drop()
+                        logger.warning("Metrics queue full, dropping event")
+                        return False
+                    self._cond.notify_all()
+                    self._cond.wait(remaining)
+        self._queue.append(event)
+        self._queue_depth.set(len(self._queue))
+        if len(self._queue) >= self.batch_size:
+            self._cond.notify_all()
+        return True
+
+    def _take(self, limit: Optional[int]) -> List[Dict[str, Any]]:
+        with self._cond:
+            count = len(self._queue) if limit is None else min(limit, len(self._queue))
+            batch = [self._queue.popleft() for _ in range(count)]
+            self._queue_depth.set(len(self._queue))
+            self._cond.notify_all()
+        return batch
+
+    def _write(self, limit: Optional[int]) -> int:
+        with self._write_lock:
+            batch = self._take(limit)
+            if batch:
+                try:
+                    self.log.append_many(batch)
+                except Exception as e:
+                    logger.error(f"Failed to write {len(batch)} metrics events: {e}")
+            return len(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._queue) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._stopped:
+                    return
+            self._write(self.batch_size)
+
+    def flush(self, fsync: bool = False) -> None:
+        """Write everything queued so far, from the calling thread."""
+        while self._write(None):
+            pass
+        self.log.flush(fsync=fsync)
+
+    def close(self) -> None:
+        """Stop the writer thread and persist remaining events."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5.0)
+        self.flush(fsync=True)
+
+
+_writers: Dict[Path, BackgroundMetricsWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_metrics_writer(log: EventLog) -> BackgroundMetricsWriter:
+    """Process-wide writer per event log, configured from settings."""
+    key = log.directory.resolve()
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = BackgroundMetricsWriter(
+                log,
+                max_queue=settings.METRICS_QUEUE_SIZE,
+                batch_size=settings.METRICS_BATCH_SIZE,
+                flush_interval=settings.METRICS_FLUSH_INTERVAL_SEC,
+                policy=settings.METRICS_QUEUE_POLICY,
+            )
+            _writers[key] = writer
+        return writer
+
+
+@atexit.register
+def shutdown_metrics_writers() -> None:
+    """Drain and stop every writer; safe to call more than once."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        try:
+            writer.close()
+        except Exception as e:
+            logger.error(f"Failed to flush metrics writer: {e}")
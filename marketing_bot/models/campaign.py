@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+import json
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class CampaignStatus(str, Enum):
     DRAFT = "draft"
@@ -48,3 +58,111 @@ class CampaignResult(BaseModel):
     sent_at: datetime = Field(default_factory=datetime.utcnow)
     status: str = "sent"  # sent, failed, bounced
     metrics: Optional[dict] = None  # opens, clicks, conversions
+
+
+RESULT_CONTENT_TYPES = frozenset({"email", "social"})
+RESULT_STATUSES = frozenset({"sent", "failed", "bounced"})
+
+
+@dataclass
+class CampaignResultBatch:
+    """Struct-of-arrays results for one campaign.
+
+    Rows are appended as plain column values; ids are derived from one
+    random prefix per batch and send times are epoch floats, so adding a row
+    allocates no model, UUID or datetime. `validate()` checks the whole
+    batch at once and `CampaignResult` models are only built by
+    `to_models()`.
+    """
+
+    campaign_id: UUID
+    customer_ids: List[str] = field(default_factory=list)
+    content_types: List[str] = field(default_factory=list)
+    contents: List[str] = field(default_factory=list)
+    sent_at: List[float] = field(default_factory=list)
+    statuses: List[str] = field(default_factory=list)
+    metrics: List[Optional[dict]] = field(default_factory=list)
+    _id_prefix: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.campaign_id = UUID(str(self.campaign_id))
+        prefix = uuid4().hex
+        self._id_prefix = (
+            f"{prefix[:8]}-{prefix[8:12]}-{prefix[12:16]}-"
+            f"{prefix[16:20]}-{prefix[20:24]}"
+        )
+
+    def __len__(self) -> int:
+        return len(self.customer_ids)
+
+    def add(
+        self,
+        customer_id: str,
+        content_type: str,
+        content: str,
+        status: str = "sent",
+        metrics: Optional[dict] = None,
+        sent_at: Optional[float] = None,
+    ) -> None:
+        self.customer_ids.append(str(customer_id))
+        self.content_types.append(content_type)
+        self.contents.append(content)
+        self.sent_at.append(time.time() if sent_at is None else sent_at)
+        self.statuses.append(status)
+        self.metrics.append(metrics)
+
+    def result_id(self, index: int) -> str:
+        return f"{self._id_prefix}{index:08x}"
+
+    def validate(self) -> None:
+        """Check column lengths and enumerated values for the whole batch."""
+        lengths = {
+            len(column)
+            for column in (
+                self.customer_ids,
+                self.content_types,
+                self.contents,
+                self.sent_at,
+                self.statuses,
+                self.metrics,
+            )
+        }
+        if len(lengths) > 1:
+            raise ValueError(f"Ragged result batch: column lengths {lengths}")
+        if len(self) >= 1 << 32:
+            raise ValueError("Result batch too large")
+        bad_types = set(self.content_types) - RESULT_CONTENT_TYPES
+        if bad_types:
+            raise ValueError(f"Invalid content types: {sorted(bad_types)}")
+        bad_statuses = set(self.statuses) - RESULT_STATUSES
+        if bad_statuses:
+            raise ValueError(f"Invalid statuses: {sorted(bad_statuses)}")
+
+    def to_records(self) -> Iterator[Dict[str, Any]]:
+        """Rows as JSON-ready dicts in the `CampaignResult` field layout."""
+        campaign_id = str(self.campaign_id)
+        utcfromtimestamp = datetime.utcfromtimestamp
+        for i in range(len(self)):
+            yield {
+                "id": self.result_id(i),
+                "campaign_id": campaign_id,
+                "customer_id": self.customer_ids[i],
+                "content_type": self.content_types[i],
+                "content": self.contents[i],
+                "sent_at": utcfromtimestamp(self.sent_at[i]).isoformat(),
+                "status": self.statuses[i],
+                "metrics": self.metrics[i],
+            }
+
+    def to_jsonl(self) -> bytes:
+        """All rows as JSON lines, encoded with orjson when it is installed."""
+        if ORJSON_AVAILABLE:
+            dumps = orjson.dumps
+            return b"".join(dumps(record) + b"\n" for record in self.to_records())
+        return "".join(
+            json.dumps(record, separators=(",", ":")) + "\n"
+            for record in self.to_records()
+        ).encode("utf-8")
+
+    def to_models(self) -> List[CampaignResult]:
+        return [CampaignResult(**record) for record in self.to_records()]
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from marketing_bot.metrics.instruments import CACHE_HITS, CACHE_MISSES
+from marketing_bot.models.campaign import Campaign
+
+
+class CampaignCache:
+    """Bounded LRU of campaigns by id, shared by repositories in a process.
+
+    Entries are only valid for one version of the backing store (file
+    mtime/size, SQLite version counter); `validate()` drops everything when
+    another process has changed it. Repositories write through on
+    create/update. `records` optionally holds the parsed store contents for
+    the same version.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.records: Optional[List[Dict[str, Any]]] = None
+        self._entries: OrderedDict[str, Campaign] = OrderedDict()
+        self._version: Hashable = None
+        self._lock = threading.Lock()
+        self._hits = CACHE_HITS.labels(cache="campaign")
+        self._misses = CACHE_MISSES.labels(cache="campaign")
+
+    def validate(self, version: Hashable) -> None:
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self.records = None
+                self._version = version
+
+    def adopt(self, version: Hashable, after: Hashable = None) -> None:
+        """Accept a version produced by this process's own write-through
+        without dropping entries. If `after` is given and the cache was not
+        at that version, someone else wrote in between and entries are
+        dropped."""
+        with self._lock:
+            if after is not None and self._version != after:
+                self._entries.clear()
+                self.records = None
+            self._version = version
+
+    def get(self, campaign_id: str) -> Optional[Campaign]:
+        with self._lock:
+            campaign = self._entries.get(campaign_id)
+            if campaign is None:
+                self.misses += 1
+                self._misses.inc()
+                return None
+            self._entries.move_to_end(campaign_id)
+            self.hits += 1
+        self._hits.inc()
+        # Callers may mutate the model before calling update()
+        return campaign.model_copy()
+
+    def put(self, campaign: Campaign) -> None:
+        with self._lock:
+            self._entries[str(campaign.id)] = campaign.model_copy()
+            self._entries.move_to_end(str(campaign.id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.records = None
+            self._version = None
+
+
+_caches: Dict[str, CampaignCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_campaign_cache(key: str, max_entries: int = 1024) -> CampaignCache:
+    """Process-wide cache per backing store (file or database path)."""
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = CampaignCache(max_entries)
+        return cache
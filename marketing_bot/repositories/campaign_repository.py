@@ -1,11 +1,27 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from uuid import UUID
 
-from marketing_bot.models.campaign import Campaign, CampaignResult, CampaignStatus
+from marketing_bot.config import settings
+from marketing_bot.models.campaign import (
+    Campaign,
+    CampaignResult,
+    CampaignResultBatch,
+    CampaignStatus,
+)
+from marketing_bot.repositories.campaign_cache import get_campaign_cache
+from marketing_bot.repositories.pagination import (
+    DEFAULT_PAGE_SIZE,
+    clamp_limit,
+    decode_cursor,
+    encode_cursor,
+)
+from marketing_bot.repositories.result_store import PartitionedResultStore
 from marketing_bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,43 +30,89 @@ logger = get_logger(__name__)
 class CampaignRepository:
     """Simple file-based repository for campaigns and results."""
 
+    # Value types of the cursors returned by `list_page` and `results_page`
+    CAMPAIGNS_CURSOR = (str, str)  # created_at, id
+    RESULTS_CURSOR = (int,)  # partition byte offset
+
     def __init__(self, data_dir: Path = Path("data")):
         self.data_dir = data_dir
         self.data_dir.mkdir(exist_ok=True)
         self.campaigns_file = self.data_dir / "campaigns.json"
+        # Legacy single-array results file, migrated once into partitions
         self.results_file = self.data_dir / "campaign_results.json"
+        self.results = PartitionedResultStore(self.data_dir / "campaign_results")
 
         # Initialize files if they don't exist
         if not self.campaigns_file.exists():
             self.campaigns_file.write_text("[]")
-        if not self.results_file.exists():
-            self.results_file.write_text("[]")
+        if self.results_file.exists():
+            self.results.import_legacy(self.results_file)
+
+        self._cache = get_campaign_cache(
+            str(self.campaigns_file.resolve()), settings.CAMPAIGN_CACHE_SIZE
+        )
 
     async def create(self, campaign: Campaign) -> Campaign:
         """Create a new campaign."""
         campaigns = self._load_campaigns()
         campaigns.append(campaign.model_dump())
         self._save_campaigns(campaigns)
+        self._cache.put(campaign)
         logger.info(f"Created campaign: {campaign.name} ({campaign.id})")
         return campaign
 
     async def get_by_id(self, campaign_id: UUID) -> Optional[Campaign]:
-        """Get campaign by ID."""
-        campaigns = self._load_campaigns()
-        for campaign_data in campaigns:
+        """Get campaign by ID, from the process-wide cache when possible."""
+        self._cache.validate(self._file_version())
+        cached = self._cache.get(str(campaign_id))
+        if cached is not None:
+            return cached
+        for campaign_data in self._load_campaigns():
             if campaign_data["id"] == str(campaign_id):
-                return Campaign(**campaign_data)
+                campaign = Campaign(**campaign_data)
+                self._cache.put(campaign)
+                return campaign
         return None
 
     async def list(self, status: Optional[CampaignStatus] = None) -> List[Campaign]:
         """List campaigns, optionally filtered by status."""
         campaigns = self._load_campaigns()
-        result = [Campaign(**data) for data in campaigns]
-
         if status:
-            result = [c for c in result if c.status == status]
-
-        return result
+            wanted = CampaignStatus(status).value
+            campaigns = [data for data in campaigns if data.get("status") == wanted]
+        return [Campaign(**data) for data in campaigns]
+
+    async def list_page(
+        self,
+        status: Optional[CampaignStatus] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Campaign], Optional[str]]:
+        """One page of campaigns ordered by (created_at, id), plus the cursor
+        for the next page (None on the last page).
+
+        Filtering and ordering run on the raw records; models are built only
+        for the returned page.
+        """
+        limit = clamp_limit(limit)
+        campaigns = self._load_campaigns()
+        if status:
+            wanted = CampaignStatus(status).value
+            campaigns = [data for data in campaigns if data.get("status") == wanted]
+        campaigns.sort(key=lambda data: (str(data["created_at"]), str(data["id"])))
+        if cursor:
+            after = tuple(decode_cursor(cursor, *self.CAMPAIGNS_CURSOR))
+            campaigns = [
+                data
+                for data in campaigns
+                if (str(data["created_at"]), str(data["id"])) > after
+            ]
+        page = campaigns[:limit]
+        next_cursor = None
+        if len(campaigns) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(str(last["created_at"]), str(last["id"]))
+        return [Campaign(**data) for data in page], next_cursor
 
     async def update(self, campaign: Campaign) -> Campaign:
         """Update an existing campaign."""
@@ -60,53 +122,93 @@ class CampaignRepository:
                 campaigns[i] = campaign.model_dump()
                 break
         self._save_campaigns(campaigns)
+        self._cache.put(campaign)
         logger.info(f"Updated campaign: {campaign.name} ({campaign.id})")
         return campaign
 
     async def save_results(self, results: List[CampaignResult]) -> None:
-        """Save campaign results."""
-        existing_results = self._load_results()
-        new_results = [result.model_dump() for result in results]
-        existing_results.extend(new_results)
-        self._save_results(existing_results)
+        """Append campaign results to their campaign partitions."""
+        self.results.append(result.model_dump() for result in results)
         logger.info(f"Saved {len(results)} campaign results")
 
+    async def save_result_batch(self, batch: CampaignResultBatch) -> None:
+        """Validate a columnar batch once and append it in one write."""
+        batch.validate()
+        self.results.append_encoded(
+            str(batch.campaign_id), batch.to_jsonl(), len(batch)
+        )
+        logger.info(f"Saved {len(batch)} campaign results")
+
     async def get_results(self, campaign_id: UUID) -> List[CampaignResult]:
-        """Get results for a specific campaign."""
-        results = self._load_results()
-        campaign_results = [
+        """Get results for a specific campaign (reads only its partition)."""
+        return [
             CampaignResult(**data)
-            for data in results
-            if data["campaign_id"] == str(campaign_id)
+            for data in self.results.iter_results(str(campaign_id))
         ]
-        return campaign_results
 
-    def _load_campaigns(self) -> List[dict]:
-        """Load campaigns from file."""
+    async def results_page(
+        self,
+        campaign_id: UUID,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """One page of a campaign's raw result records in append order."""
+        offset = decode_cursor(cursor, *self.RESULTS_CURSOR)[0] if cursor else 0
+        records, next_offset = self.results.read_page(
+            str(campaign_id), offset, clamp_limit(limit)
+        )
+        return records, encode_cursor(next_offset) if next_offset is not None else None
+
+    def _file_version(self) -> Optional[Tuple[int, int, int]]:
+        """(inode, mtime_ns, size) of the campaigns file. Every save swaps in
+        a new file, whose inode differs from the one it replaces, so a
+        same-size rewrite within one mtime tick is still a new version."""
         try:
-            return json.loads(self.campaigns_file.read_text())
-        except Exception as e:
-            logger.error(f"Failed to load campaigns: {e}")
-            return []
+            return _version(self.campaigns_file.stat())
+        except FileNotFoundError:
+            return None
+
+    def iter_records(self) -> Iterator[dict]:
+        """Yield every stored campaign as its raw JSON record."""
+        yield from self._load_campaigns()
+
+    def _load_campaigns(self) -> List[dict]:
+        """Load campaigns, re-parsing the file only when it has changed."""
+        self._cache.validate(self._file_version())
+        records = self._cache.records
+        if records is None:
+            try:
+                records = json.loads(self.campaigns_file.read_text())
+            except Exception as e:
+                logger.error(f"Failed to load campaigns: {e}")
+                return []
+            self._cache.records = records
+        return list(records)
 
     def _save_campaigns(self, campaigns: List[dict]) -> None:
-        """Save campaigns to file."""
+        """Save campaigns to file: write a temp file and swap it in."""
+        tmp = self.campaigns_file.with_name(
+            f"{self.campaigns_file.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
         try:
-            self.campaigns_file.write_text(json.dumps(campaigns, indent=2, default=str))
+            text = json.dumps(campaigns, indent=2, default=str)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                # The version our file will have once swapped in
+                version = _version(os.fstat(f.fileno()))
+            previous = self._file_version()
+            os.replace(tmp, self.campaigns_file)
         except Exception as e:
             logger.error(f"Failed to save campaigns: {e}")
+            tmp.unlink(missing_ok=True)
+            self._cache.clear()
+            return
+        # Our own write must not invalidate the entries we're writing through,
+        # unless another process wrote since this cache's version
+        self._cache.adopt(version, after=previous)
+        self._cache.records = json.loads(text)
 
-    def _load_results(self) -> List[dict]:
-        """Load results from file."""
-        try:
-            return json.loads(self.results_file.read_text())
-        except Exception as e:
-            logger.error(f"Failed to load results: {e}")
-            return []
 
-    def _save_results(self, results: List[dict]) -> None:
-        """Save results to file."""
-        try:
-            self.results_file.write_text(json.dumps(results, indent=2, default=str))
-        except Exception as e:
-            logger.error(f"Failed to save results: {e}")
+def _version(stat: os.stat_result) -> Tuple[int, int, int]:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
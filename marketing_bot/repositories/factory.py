@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from marketing_bot.config import settings
+from marketing_bot.repositories.campaign_repository import CampaignRepository
+from marketing_bot.repositories.sqlite_campaign_repository import (
+    SqliteCampaignRepository,
+)
+
+AnyCampaignRepository = Union[CampaignRepository, SqliteCampaignRepository]
+
+
+def create_campaign_repository(
+    data_dir: Path = Path("data"), backend: Optional[str] = None
+) -> AnyCampaignRepository:
+    """Campaign repository for CAMPAIGN_REPOSITORY_BACKEND (json or sqlite)."""
+    backend = (backend or settings.CAMPAIGN_REPOSITORY_BACKEND).lower()
+    if backend == "sqlite":
+        return SqliteCampaignRepository(data_dir / "campaigns.db")
+    if backend == "json":
+        return CampaignRepository(data_dir)
+    raise ValueError(f"Unknown campaign repository backend: {backend}")
+
+
+_repository: Optional[AnyCampaignRepository] = None
+
+
+def get_campaign_repository() -> AnyCampaignRepository:
+    """Process-wide repository for the configured backend."""
+    global _repository
+    if _repository is None:
+        _repository = create_campaign_repository()
+    return _repository
+
+
+def migrate_json_to_sqlite(data_dir: Path = Path("data")) -> Dict[str, int]:
+    """Copy the file-based campaigns and results into campaigns.db.
+
+    Safe to re-run: rows already in the database are skipped. The source
+    files are left in place.
+    """
+    json_repo = CampaignRepository(data_dir)
+    repo = SqliteCampaignRepository(data_dir / "campaigns.db")
+    try:
+        return repo.import_records(
+            json_repo.iter_records(), json_repo.results.iter_all()
+        )
+    finally:
+        repo.close()
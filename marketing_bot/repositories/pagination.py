@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, List
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(*key: Any) -> str:
+    """Opaque, URL-safe cursor for a keyset position."""
+    raw = json.dumps(list(key), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """Keyset values of a cursor from `encode_cursor`; ValueError if malformed
+    or, when `types` are given, if its values do not have exactly those
+    types."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(key, list):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if types and (
+        len(key) != len(types)
+        or not all(
+            isinstance(value, kind) and not isinstance(value, bool)
+            for value, kind in zip(key, types)
+        )
+    ):
+        raise ValueError(f"Cursor does not belong to this listing: {cursor!r}")
+    return key
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
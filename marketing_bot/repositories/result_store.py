@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from uuid import UUID
+
+from marketing_bot.utils.logger import get_logger
+
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# The manifest delta log is folded into manifest.json once it grows past this
+MANIFEST_LOG_FOLD_BYTES = 4 * 1024 * 1024
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    return (
+        json.dumps(record, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+    )
+
+
+class PartitionedResultStore:
+    """Append-only campaign results, one JSONL partition per campaign.
+
+    Saving appends only the new results to their campaign's partition
+    (`<campaign_id>.jsonl`) with a single O_APPEND write, and reading a
+    campaign touches only its partition. Per-partition result counts and
+    sizes are kept for listing without opening partitions: each save
+    appends a delta line to `manifest.log`, which `compact()` (or a log
+    past MANIFEST_LOG_FOLD_BYTES) folds into `manifest.json`.
+    """
+
+    def __init__(self, directory: Path = Path("data") / "campaign_results"):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest_file = self.directory / "manifest.json"
+        self.manifest_log = self.directory / "manifest.log"
+        self.lock_file = self.directory / "manifest.lock"
+        self._lock = threading.Lock()
+
+    def partition_path(self, campaign_id: Union[str, UUID]) -> Path:
+        """Partition file of a campaign; raises ValueError unless the id is a
+        UUID, so ids from callers can never escape the directory."""
+        return self.directory / f"{UUID(str(campaign_id))}.jsonl"
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            with open(self.lock_file, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_manifest(self) -> Tuple[Dict[str, Dict[str, Any]], List[int]]:
+        """Folded partitions plus the (inode, size) of the log they include."""
+        if not self.manifest_file.exists():
+            return {}, [0, 0]
+        try:
+            data = json.loads(self.manifest_file.read_text())
+        except Exception as e:
+            logger.error(f"Failed to read results manifest: {e}")
+            return {}, [0, 0]
+        if "partitions" not in data:
+            return data, [0, 0]  # written before the delta log existed
+        return data["partitions"], data["log"]
+
+    def manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Per-campaign {"results", "bytes", "updated_at"}."""
+        manifest, (folded_inode, folded_size) = self._read_manifest()
+        try:
+            f = open(self.manifest_log, "rb")
+        except FileNotFoundError:
+            return manifest
+        with f:
+            if os.fstat(f.fileno()).st_ino == folded_inode:
+                f.seek(folded_size)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # in-progress append
+                try:
+                    campaign_id, count, size, updated_at = json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping corrupt results manifest line")
+                    continue
+                entry = manifest.setdefault(campaign_id, {"results": 0, "bytes": 0})
+                entry["results"] += count
+                entry["bytes"] += size
+                entry["updated_at"] = updated_at
+        return manifest
+
+    def _write_manifest(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        """Persist a folded manifest and start a new delta log; caller holds
+        the lock. Until the log is replaced, readers skip the folded part."""
+        try:
+            stat = os.stat(self.manifest_log)
+            folded = [stat.st_ino, stat.st_size]
+        except FileNotFoundError:
+            folded = [0, 0]
+        tmp = self.manifest_file.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"partitions": manifest, "log": folded}, separators=(",", ":"))
+        )
+        os.replace(tmp, self.manifest_file)
+        log_tmp = self.manifest_log.with_suffix(".log.tmp")
+        log_tmp.write_bytes(b"")
+        os.replace(log_tmp, self.manifest_log)
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Append result dicts to their campaign partitions; returns the count."""
+        by_campaign: Dict[str, List[bytes]] = {}
+        for record in records:
+            by_campaign.setdefault(str(record["campaign_id"]), []).append(
+                _encode(record)
+            )
+        return self._write_partitions(
+            {
+                campaign_id: (b"".join(lines), len(lines))
+                for campaign_id, lines in by_campaign.items()
+            }
+        )
+
+    def append_encoded(self, campaign_id: str, data: bytes, count: int) -> int:
+        """Append `count` already-encoded JSON lines to one partition."""
+        return self._write_partitions({campaign_id: (data, count)})
+
+    @staticmethod
+    def _append_bytes(path: Path, data: bytes) -> int:
+        """One O_APPEND write of `data`; returns the file size afterwards."""
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+    def _write_partitions(self, chunks: Dict[str, Tuple[bytes, int]]) -> int:
+        if not chunks:
+            return 0
+        paths = {cid: self.partition_path(cid) for cid in chunks}
+        with self._locked():
+            now = datetime.utcnow().isoformat()
+            deltas = []
+            for campaign_id, (data, count) in chunks.items():
+                self._append_bytes(paths[campaign_id], data)
+                deltas.append(
+                    json.dumps([paths[campaign_id].stem, count, len(data), now])
+                )
+            log_size = self._append_bytes(
+                self.manifest_log, ("\n".join(deltas) + "\n").encode("utf-8")
+            )
+            if log_size > MANIFEST_LOG_FOLD_BYTES:
+                self._write_manifest(self.manifest())
+        return sum(count for _, count in chunks.values())
+
+    def iter_results(self, campaign_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield one campaign's results in append order."""
+        path = self.partition_path(campaign_id)
+        if not path.exists():
+            return
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn or in-progress write
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping corrupt result line in {path}")
+
+    def read_page(
+        self, campaign_id: str, offset: int = 0, limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Up to `limit` results starting at byte `offset` of the partition,
+        plus the offset to continue from (None at the end)."""
+        path = self.partition_path(campaign_id)
+        records: List[Dict[str, Any]] = []
+        if not path.exists():
+            return records, None
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping corrupt result line in {path}")
+                    continue
+                if len(records) >= limit:
+                    more = f.read(1) != b""
+                    return records, offset if more else None
+        return records, None
+
+    def read(self, campaign_id: str) -> List[Dict[str, Any]]:
+        return list(self.iter_results(campaign_id))
+
+    def campaign_ids(self) -> List[str]:
+        return [path.stem for path in sorted(self.directory.glob("*.jsonl"))]
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """Yield every stored result, partition by partition."""
+        for campaign_id in self.campaign_ids():
+            yield from self.iter_results(campaign_id)
+
+    def compact(self, campaign_id: Optional[str] = None) -> Dict[str, int]:
+        """Rewrite partitions without corrupt lines or duplicate result ids
+        (the last write wins) and rebuild their manifest entries.
+
+        Returns {"partitions", "results", "removed"}.
+        """
+        stats = {"partitions": 0, "results": 0, "removed": 0}
+        campaign_ids = [campaign_id] if campaign_id else self.campaign_ids()
+        paths = [self.partition_path(cid) for cid in campaign_ids]
+        with self._locked():
+            manifest = self.manifest()
+            for path in paths:
+                cid = path.stem
+                if not path.exists():
+                    continue
+                line_count = 0
+                latest: Dict[str, Dict[str, Any]] = {}
+                with open(path, "rb") as f:
+                    for line_count, line in enumerate(f, start=1):
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        key = str(record.get("id", f"line-{line_count}"))
+                        latest.pop(key, None)
+                        latest[key] = record
+                data = b"".join(_encode(record) for record in latest.values())
+                tmp = path.with_suffix(".jsonl.tmp")
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+                manifest[cid] = {
+                    "results": len(latest),
+                    "bytes": len(data),
+                    "updated_at": datetime.utcnow().isoformat(),
+                }
+                stats["partitions"] += 1
+                stats["results"] += len(latest)
+                stats["removed"] += line_count - len(latest)
+            self._write_manifest(manifest)
+        logger.info(
+            f"Compacted {stats['partitions']} result partitions, "
+            f"removed {stats['removed']} lines"
+        )
+        return stats
+
+    def import_legacy(self, json_file: Path) -> int:
+        """One-time import of the legacy `campaign_results.json` array.
+
+        The file is renamed before reading so only one process imports it,
+        and kept as `<name>.migrated` afterwards.
+        """
+        claimed = json_file.with_name(json_file.name + ".migrating")
+        try:
+            os.replace(json_file, claimed)
+        except FileNotFoundError:
+            return 0
+        try:
+            records = json.loads(claimed.read_text() or "[]")
+        except Exception as e:
+            logger.error(f"Failed to read legacy results file {json_file}: {e}")
+            os.replace(claimed, json_file)
+            return 0
+        count = self.append(records)
+        os.replace(claimed, json_file.with_name(json_file.name + ".migrated"))
+        logger.info(f"Migrated {count} campaign results to {self.directory}")
+        return count
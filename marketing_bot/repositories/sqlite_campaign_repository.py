@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from marketing_bot.config import settings
+from marketing_bot.models.campaign import (
+    Campaign,
+    CampaignResult,
+    CampaignResultBatch,
+    CampaignStatus,
+)
+from marketing_bot.repositories.campaign_cache import get_campaign_cache
+from marketing_bot.repositories.pagination import (
+    DEFAULT_PAGE_SIZE,
+    clamp_limit,
+    decode_cursor,
+    encode_cursor,
+)
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    campaign_type TEXT NOT NULL,
+    segment_name TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    goal TEXT NOT NULL,
+    offer TEXT NOT NULL,
+    tone TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns (status);
+CREATE INDEX IF NOT EXISTS idx_campaigns_created ON campaigns (created_at, id);
+
+CREATE TABLE IF NOT EXISTS campaign_results (
+    id TEXT PRIMARY KEY,
+    campaign_id TEXT NOT NULL,
+    customer_id TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    content TEXT NOT NULL,
+    sent_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    metrics TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_campaign_sent
+    ON campaign_results (campaign_id, sent_at);
+
+-- Bumped on every campaign write so caches in any process can validate
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('campaigns_version', 0);
+CREATE TRIGGER IF NOT EXISTS campaigns_version_insert AFTER INSERT ON campaigns
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'campaigns_version';
+END;
+CREATE TRIGGER IF NOT EXISTS campaigns_version_update AFTER UPDATE ON campaigns
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'campaigns_version';
+END;
+CREATE TRIGGER IF NOT EXISTS campaigns_version_delete AFTER DELETE ON campaigns
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'campaigns_version';
+END;
+"""
+VERSION_SQL = "SELECT value FROM meta WHERE key = 'campaigns_version'"
+
+CAMPAIGN_COLUMNS = (
+    "id",
+    "name",
+    "campaign_type",
+    "segment_name",
+    "product_name",
+    "goal",
+    "offer",
+    "tone",
+    "platform",
+    "status",
+    "created_at",
+    "updated_at",
+)
+RESULT_COLUMNS = (
+    "id",
+    "campaign_id",
+    "customer_id",
+    "content_type",
+    "content",
+    "sent_at",
+    "status",
+    "metrics",
+)
+
+
+def _text(value: Any) -> Any:
+    """SQLite value for a model field (UUIDs, enums and datetimes as text)."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _campaign_row(data: Dict[str, Any]) -> tuple:
+    return tuple(_text(data[column]) for column in CAMPAIGN_COLUMNS)
+
+
+def _result_row(data: Dict[str, Any]) -> tuple:
+    row = [_text(data[column]) for column in RESULT_COLUMNS[:-1]]
+    metrics = data.get("metrics")
+    row.append(json.dumps(metrics, default=str) if metrics is not None else None)
+    return tuple(row)
+
+
+def _result_record(row: sqlite3.Row) -> Dict[str, Any]:
+    data = dict(row)
+    if data["metrics"] is not None:
+        data["metrics"] = json.loads(data["metrics"])
+    return data
+
+
+class SqliteCampaignRepository:
+    """SQLite-backed repository with the same async interface as
+    `CampaignRepository`.
+
+    Runs in WAL mode so readers don't block the writer; campaigns are
+    indexed by id and status, results by (campaign_id, sent_at).
+    """
+
+    # Value types of the cursors returned by `list_page` and `results_page`
+    CAMPAIGNS_CURSOR = (str, str)  # created_at, id
+    RESULTS_CURSOR = (str, str)  # sent_at, id
+
+    def __init__(self, db_path: Path = Path("data") / "campaigns.db"):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(db_path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._cache = get_campaign_cache(
+            str(self.db_path.resolve()), settings.CAMPAIGN_CACHE_SIZE
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _execute_many(self, sql: str, rows: Iterable[tuple]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _write_campaign(self, sql: str, row: tuple, campaign: Campaign) -> None:
+        """Write one campaign and write it through to the shared cache."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(sql, row)
+                version = self._conn.execute(VERSION_SQL).fetchone()[0]
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._cache.adopt(version, after=version - 1)
+        self._cache.put(campaign)
+
+    async def create(self, campaign: Campaign) -> Campaign:
+        """Create a new campaign."""
+        placeholders = ", ".join("?" for _ in CAMPAIGN_COLUMNS)
+        self._write_campaign(
+            f"INSERT INTO campaigns ({', '.join(CAMPAIGN_COLUMNS)}) "
+            f"VALUES ({placeholders})",
+            _campaign_row(campaign.model_dump()),
+            campaign,
+        )
+        logger.info(f"Created campaign: {campaign.name} ({campaign.id})")
+        return campaign
+
+    async def get_by_id(self, campaign_id: UUID) -> Optional[Campaign]:
+        """Get campaign by ID, from the process-wide cache when possible."""
+        self._cache.validate(self._query(VERSION_SQL)[0][0])
+        cached = self._cache.get(str(campaign_id))
+        if cached is not None:
+            return cached
+        rows = self._query("SELECT * FROM campaigns WHERE id = ?", (str(campaign_id),))
+        if not rows:
+            return None
+        campaign = Campaign(**dict(rows[0]))
+        self._cache.put(campaign)
+        return campaign
+
+    async def list(self, status: Optional[CampaignStatus] = None) -> List[Campaign]:
+        """List campaigns, optionally filtered by status."""
+        if status:
+            rows = self._query(
+                "SELECT * FROM campaigns WHERE status = ? ORDER BY created_at",
+                (_text(status),),
+            )
+        else:
+            rows = self._query("SELECT * FROM campaigns ORDER BY created_at")
+        return [Campaign(**dict(row)) for row in rows]
+
+    async def list_page(
+        self,
+        status: Optional[CampaignStatus] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Campaign], Optional[str]]:
+        """One page of campaigns ordered by (created_at, id), plus the cursor
+        for the next page (None on the last page)."""
+        limit = clamp_limit(limit)
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(_text(CampaignStatus(status)))
+        if cursor:
+            clauses.append("(created_at, id) > (?, ?)")
+            params.extend(decode_cursor(cursor, *self.CAMPAIGNS_CURSOR))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(
+            f"SELECT * FROM campaigns {where} ORDER BY created_at, id LIMIT ?",
+            (*params, limit + 1),
+        )
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(page[-1]["created_at"], page[-1]["id"])
+        return [Campaign(**dict(row)) for row in page], next_cursor
+
+    async def update(self, campaign: Campaign) -> Campaign:
+        """Update an existing campaign."""
+        row = _campaign_row(campaign.model_dump())
+        assignments = ", ".join(f"{column} = ?" for column in CAMPAIGN_COLUMNS[1:])
+        self._write_campaign(
+            f"UPDATE campaigns SET {assignments} WHERE id = ?",
+            row[1:] + row[:1],
+            campaign,
+        )
+        logger.info(f"Updated campaign: {campaign.name} ({campaign.id})")
+        return campaign
+
+    async def save_results(self, results: List[CampaignResult]) -> None:
+        """Save campaign results in one transaction."""
+        placeholders = ", ".join("?" for _ in RESULT_COLUMNS)
+        self._execute_many(
+            f"INSERT INTO campaign_results ({', '.join(RESULT_COLUMNS)}) "
+            f"VALUES ({placeholders})",
+            (_result_row(result.model_dump()) for result in results),
+        )
+        logger.info(f"Saved {len(results)} campaign results")
+
+    async def save_result_batch(self, batch: CampaignResultBatch) -> None:
+        """Validate a columnar batch once and insert it in one transaction."""
+        batch.validate()
+        placeholders = ", ".join("?" for _ in RESULT_COLUMNS)
+        self._execute_many(
+            f"INSERT INTO campaign_results ({', '.join(RESULT_COLUMNS)}) "
+            f"VALUES ({placeholders})",
+            (_result_row(record) for record in batch.to_records()),
+        )
+        logger.info(f"Saved {len(batch)} campaign results")
+
+    async def get_results(self, campaign_id: UUID) -> List[CampaignResult]:
+        """Get results for a specific campaign, oldest first."""
+        rows = self._query(
+            "SELECT * FROM campaign_results WHERE campaign_id = ? "
+            "ORDER BY sent_at, id",
+            (str(campaign_id),),
+        )
+        return [CampaignResult(**_result_record(row)) for row in rows]
+
+    async def results_page(
+        self,
+        campaign_id: UUID,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """One page of a campaign's raw result records by (sent_at, id)."""
+        limit = clamp_limit(limit)
+        after = decode_cursor(cursor, *self.RESULTS_CURSOR) if cursor else ["", ""]
+        rows = self._query(
+            "SELECT * FROM campaign_results WHERE campaign_id = ? "
+            "AND (sent_at, id) > (?, ?) ORDER BY sent_at, id LIMIT ?",
+            (str(campaign_id), *after, limit + 1),
+        )
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(page[-1]["sent_at"], page[-1]["id"])
+        return [_result_record(row) for row in page], next_cursor
+
+    def _import_records(
+        self, records: Iterable[Dict[str, Any]], table: str, columns: tuple, to_row
+    ) -> int:
+        before = self._query(f"SELECT COUNT(*) FROM {table}")[0][0]
+        self._execute_many(
+            f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})",
+            (to_row(record) for record in records),
+        )
+        return self._query(f"SELECT COUNT(*) FROM {table}")[0][0] - before
+
+    def import_records(
+        self,
+        campaigns: Iterable[Dict[str, Any]],
+        results: Iterable[Dict[str, Any]],
+    ) -> Dict[str, int]:
+        """Import campaign and result dicts; rows already present are skipped."""
+        imported = {
+            "campaigns": self._import_records(
+                campaigns, "campaigns", CAMPAIGN_COLUMNS, _campaign_row
+            ),
+            "results": self._import_records(
+                results, "campaign_results", RESULT_COLUMNS, _result_row
+            ),
+        }
+        logger.info(
+            f"Imported {imported['campaigns']} campaigns and "
+            f"{imported['results']} results into {self.db_path}"
+        )
+        return imported
@@ -0,0 +1 @@
+"""Scheduled sending: time-bucketed send windows and rate-controlled dispatch."""
@@ -0,0 +1,404 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from datetime import time as dtime
+from datetime import timedelta
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+)
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from marketing_bot.metrics.instruments import QUEUE_DEPTH
+from marketing_bot.senders.throttle import TokenBucket
+from marketing_bot.utils.logger import get_logger
+
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+
+class Clock(Protocol):
+    """Time source for the dispatcher (epoch seconds)."""
+
+    def now(self) -> float:
+        ...
+
+    async def sleep(self, seconds: float) -> None:
+        ...
+
+
+class SystemClock:
+    def now(self) -> float:
+        return time.time()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class ManualClock:
+    """Deterministic clock for tests: `sleep` advances time instantly."""
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+
+    def now(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float) -> None:
+        self._now += seconds
+
+    async def sleep(self, seconds: float) -> None:
+        self._now += max(seconds, 0.0)
+        await asyncio.sleep(0)
+
+
+@dataclass(frozen=True)
+class SendWindow:
+    """Daily window in recipient-local time, e.g. 08:00-10:00."""
+
+    start: dtime
+    end: dtime
+    timezone: str = "UTC"
+
+    @classmethod
+    def parse(cls, spec: str, timezone: str = "UTC") -> "SendWindow":
+        """Parse 'HH:MM-HH:MM'."""
+        start, _, end = spec.partition("-")
+        if not end:
+            raise ValueError(f"Invalid send window: {spec!r} (expected HH:MM-HH:MM)")
+        return cls(
+            dtime.fromisoformat(start.strip()),
+            dtime.fromisoformat(end.strip()),
+            timezone,
+        )
+
+    def next_occurrence(
+        self, after: float, timezone: Optional[str] = None
+    ) -> Tuple[float, float]:
+        """Epoch (start, end) of the first window in `timezone` not already over."""
+        tz = ZoneInfo(timezone or self.timezone)
+        local = datetime.fromtimestamp(after, tz)
+        for day_offset in range(2):
+            day = local.date() + timedelta(days=day_offset)
+            start = datetime.combine(day, self.start, tz)
+            end = datetime.combine(day, self.end, tz)
+            if end <= start:
+                end += timedelta(days=1)
+            if end.timestamp() > after:
+                return max(start.timestamp(), after), end.timestamp()
+        raise ValueError("Send window has no future occurrence")
+
+
+@dataclass
+class ScheduledSend:
+    """One send released by the dispatcher at `due_at` (epoch seconds)."""
+
+    campaign_id: str
+    kind: str  # email, social
+    recipient: str
+    due_at: float
+    payload: Dict[str, Any] = field(default_factory=dict)
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+def plan_send_window(
+    campaign_id: str,
+    recipients: Iterable[Tuple[str, Optional[str]]],
+    window: SendWindow,
+    bucket_seconds: int = 300,
+    kind: str = "email",
+    after: Optional[float] = None,
+    payload: Optional[Dict[str, Any]] = None,
+) -> List[ScheduledSend]:
+    """Spread `(recipient, timezone)` pairs over time buckets of the window.
+
+    Recipients are assigned round-robin to the window's buckets in their own
+    timezone (falling back to the window's when missing or unknown), so each
+    bucket carries an even share of the campaign.
+    """
+    after = time.time() if after is None else after
+    occurrences: Dict[str, Tuple[float, int]] = {}
+    counters: Dict[str, itertools.count] = {}
+    jobs = []
+    for recipient, tz in recipients:
+        tz = tz or window.timezone
+        if tz not in occurrences:
+            try:
+                start, end = window.next_occurrence(after, tz)
+            except (ZoneInfoNotFoundError, ValueError):
+                logger.warning(f"Unknown timezone {tz!r}; using {window.timezone}")
+                start, end = window.next_occurrence(after)
+            buckets = max(1, int((end - start) // bucket_seconds))
+            occurrences[tz] = (start, buckets)
+            counters[tz] = itertools.count()
+        start, buckets = occurrences[tz]
+        bucket = next(counters[tz]) % buckets
+        jobs.append(
+            ScheduledSend(
+                campaign_id=campaign_id,
+                kind=kind,
+                recipient=recipient,
+                due_at=start + bucket * bucket_seconds,
+                payload=dict(payload or {}),
+            )
+        )
+    return jobs
+
+
+class ScheduleStore:
+    """Append-only JSONL journal of scheduled and completed sends.
+
+    Pending jobs are rebuilt by replaying the journal, so schedules survive
+    restarts; `compact()` rewrites it with only the pending jobs.
+    """
+
+    def __init__(self, data_dir: Path = Path("data")):
+        self.data_dir = data_dir
+        self.data_dir.mkdir(exist_ok=True)
+        self.journal_file = self.data_dir / "schedules.jsonl"
+        self.lock_file = self.data_dir / "schedules.lock"
+        self._offset = 0
+        self._inode: Optional[int] = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(self.lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _append(self, records: Iterable[Dict[str, Any]]) -> None:
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        if not data:
+            return
+        with self._locked(), open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def add(self, jobs: Iterable[ScheduledSend]) -> None:
+        self._append({"op": "add", **asdict(job)} for job in jobs)
+
+    def mark_done(self, job_id: str, status: str = "sent") -> None:
+        self._append([{"op": "done", "job_id": job_id, "status": status}])
+
+    def _replay(
+        self,
+        lines: Iterable[bytes],
+        pending: Dict[str, ScheduledSend],
+        done: Optional[List[str]] = None,
+    ) -> None:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                op = record.pop("op", None)
+                if op == "add":
+                    job = ScheduledSend(**record)
+                    pending[job.job_id] = job
+                elif op == "done":
+                    pending.pop(record["job_id"], None)
+                    if done is not None:
+                        done.append(record["job_id"])
+            except (ValueError, TypeError, KeyError, AttributeError):
+                logger.warning("Skipping corrupt schedule journal line")
+
+    def load(self) -> List[ScheduledSend]:
+        """All pending jobs; remembers the journal position for `poll()`."""
+        pending: Dict[str, ScheduledSend] = {}
+        if self.journal_file.exists():
+            with self._locked(), open(self.journal_file, "rb") as f:
+                self._replay(f, pending)
+                self._offset = f.tell()
+                self._inode = os.fstat(f.fileno()).st_ino
+        return list(pending.values())
+
+    def poll(self) -> Tuple[List[ScheduledSend], List[str]]:
+        """Jobs added and job ids completed by other writers since the last read."""
+        if not self.journal_file.exists():
+            return [], []
+        added: Dict[str, ScheduledSend] = {}
+        done: List[str] = []
+        with open(self.journal_file, "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._inode or f.seek(0, os.SEEK_END) < self._offset:
+                self._offset = 0  # journal was compacted (replaced)
+                self._inode = inode
+            f.seek(self._offset)
+            lines = []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial write; read it next time
+                self._offset += len(line)
+                lines.append(line)
+            self._replay(lines, added, done)
+        return list(added.values()), done
+
+    def compact(self) -> int:
+        """Rewrite the journal with only pending jobs; returns their count."""
+        with self._locked():
+            pending: Dict[str, ScheduledSend] = {}
+            if self.journal_file.exists():
+                with open(self.journal_file, "rb") as f:
+                    self._replay(f, pending)
+            tmp = self.journal_file.with_suffix(".jsonl.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for job in pending.values():
+                    f.write(json.dumps({"op": "add", **asdict(job)}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.journal_file)
+            stat = self.journal_file.stat()
+            self._offset, self._inode = stat.st_size, stat.st_ino
+        return len(pending)
+
+
+SendHandler = Callable[[ScheduledSend], Awaitable[None]]
+
+
+class DispatchScheduler:
+    """Heap-based dispatcher that releases due sends at a controlled rate.
+
+    Handlers are registered per job kind (email, social). Every dispatched
+    job is marked done in the store, whether the handler succeeded or not.
+    """
+
+    def __init__(
+        self,
+        store: ScheduleStore,
+        rate_per_second: float = 10.0,
+        clock: Optional[Clock] = None,
+        poll_interval: float = 5.0,
+    ):
+        self.store = store
+        self.clock = clock or SystemClock()
+        self.poll_interval = poll_interval
+        self._bucket = TokenBucket(
+            rate_per_second, capacity=max(1.0, rate_per_second), clock=self.clock.now
+        )
+        self._handlers: Dict[str, SendHandler] = {}
+        self._heap: List[Tuple[float, int, ScheduledSend]] = []
+        self._seq = itertools.count()
+        self._queued: set[str] = set()
+        self._queue_depth = QUEUE_DEPTH.labels(queue="scheduled_sends")
+        self.dispatched = 0
+        self.failed = 0
+        for job in store.load():
+            self._push(job)
+
+    def register(self, kind: str, handler: SendHandler) -> None:
+        self._handlers[kind] = handler
+
+    def _push(self, job: ScheduledSend) -> None:
+        if job.job_id in self._queued:
+            return
+        self._queued.add(job.job_id)
+        heapq.heappush(self._heap, (job.due_at, next(self._seq), job))
+        self._queue_depth.set(len(self._queued))
+
+    def schedule(self, jobs: Iterable[ScheduledSend]) -> int:
+        """Persist and enqueue jobs; returns how many were scheduled."""
+        jobs = list(jobs)
+        self.store.add(jobs)
+        for job in jobs:
+            self._push(job)
+        return len(jobs)
+
+    def pending(self) -> int:
+        return len(self._queued)
+
+    def next_due(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    def _sync_store(self) -> None:
+        """Pick up jobs scheduled (or completed) by other processes."""
+        added, done = self.store.poll()
+        for job in added:
+            self._push(job)
+        # Jobs completed elsewhere are skipped when they reach the heap top
+        self._queued.difference_update(done)
+
+    async def _dispatch(self, job: ScheduledSend) -> None:
+        handler = self._handlers.get(job.kind)
+        status = "sent"
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for kind={job.kind}")
+            await handler(job)
+            self.dispatched += 1
+        except Exception as e:
+            status = "failed"
+            self.failed += 1
+            logger.error(f"Scheduled {job.kind} to {job.recipient} failed: {e}")
+        self.store.mark_done(job.job_id, status)
+
+    async def run(self, until: Optional[float] = None, forever: bool = False) -> int:
+        """Dispatch jobs as they come due.
+
+        Stops when nothing is pending (or the next job is after `until`);
+        with `forever=True` it keeps polling the store for new schedules.
+        Returns the number of jobs dispatched in this call.
+        """
+        dispatched_before = self.dispatched + self.failed
+        while True:
+            if not self._heap:
+                if not forever:
+                    break
+                await self.clock.sleep(self.poll_interval)
+                self._sync_store()
+                continue
+
+            due_at, _, job = self._heap[0]
+            if until is not None and due_at > until:
+                break
+            now = self.clock.now()
+            if due_at > now:
+                wait = due_at - now
+                await self.clock.sleep(
+                    min(wait, self.poll_interval) if forever else wait
+                )
+                if forever:
+                    self._sync_store()
+                continue
+
+            heapq.heappop(self._heap)
+            if job.job_id not in self._queued:
+                continue
+            self._queued.discard(job.job_id)
+            self._queue_depth.set(len(self._queued))
+
+            wait = self._bucket.time_until_available()
+            if wait > 0:
+                await self.clock.sleep(wait)
+            self._bucket.try_acquire()
+            await self._dispatch(job)
+
+        return self.dispatched + self.failed - dispatched_before
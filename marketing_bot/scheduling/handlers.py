@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from marketing_bot.scheduling.dispatcher import ScheduledSend
+from marketing_bot.senders.social_sender import SocialPost, publish_social_posts
+
+
+async def social_post_handler(job: ScheduledSend) -> None:
+    """Publish a scheduled social post; `job.recipient` is the platform."""
+    post = SocialPost(
+        platform=job.recipient,
+        content=job.payload["content"],
+        account=job.payload.get("account"),
+        media_url=job.payload.get("media_url"),
+    )
+    result = (await publish_social_posts([post]))[0]
+    if not result.success:
+        raise RuntimeError(result.error or f"Failed to post to {post.platform}")
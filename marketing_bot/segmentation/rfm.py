@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import Literal
 
 import pandas as pd
 
+from marketing_bot.metrics.instruments import (
+    RFM_ROWS,
+    RFM_ROWS_PER_SECOND,
+    RFM_SCORING_DURATION,
+)
 from marketing_bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -42,6 +48,7 @@ def score_rfm(df: pd.DataFrame, cfg: RfmConfig = RfmConfig()) -> pd.DataFrame:
         raise ValueError(f"Missing columns: {missing}")
 
     logger.debug("Scoring RFM...")
+    started = time.perf_counter()
     out = df.copy()
     # Lower recency is better → invert rank by using qcut on negative recency
     out["R"] = (
@@ -60,6 +67,12 @@ def score_rfm(df: pd.DataFrame, cfg: RfmConfig = RfmConfig()) -> pd.DataFrame:
     )
     out["RFM_Score"] = out[["R", "F", "M"]].sum(axis=1)
     out["segment"] = out.apply(_label_segment, axis=1)
+
+    elapsed = time.perf_counter() - started
+    RFM_SCORING_DURATION.observe(elapsed)
+    RFM_ROWS.inc(len(out))
+    if elapsed > 0:
+        RFM_ROWS_PER_SECOND.set(len(out) / elapsed)
     return out
 
 
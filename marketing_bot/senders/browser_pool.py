@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, TypeVar
+
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+R = TypeVar("R")
+
+
+def default_driver_factory() -> Any:
+    """Headless Chrome driver for Selenium-driven posting flows."""
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(options=options)
+
+
+class BrowserPool:
+    """Bounded pool of browser workers.
+
+    Each worker thread lazily starts one webdriver and reuses it for every flow
+    it runs, so N concurrent posts share at most `size` browsers instead of
+    starting one per post.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        driver_factory: Callable[[], Any] = default_driver_factory,
+    ):
+        self.size = max(size, 1)
+        self._driver_factory = driver_factory
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._drivers: List[Any] = []
+        self._lock = threading.Lock()
+
+    def _driver(self) -> Any:
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            driver = self._driver_factory()
+            self._local.driver = driver
+            with self._lock:
+                self._drivers.append(driver)
+            logger.info(f"Started browser worker ({len(self._drivers)}/{self.size})")
+        return driver
+
+    def _call(self, flow: Callable[..., R], args: tuple) -> R:
+        return flow(self._driver(), *args)
+
+    async def run(self, flow: Callable[..., R], *args: Any) -> R:
+        """Run `flow(driver, *args)` on a pooled browser without blocking the loop."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.size, thread_name_prefix="browser"
+                )
+            executor = self._executor
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._call, flow, args)
+
+    def close(self) -> None:
+        """Stop worker threads and quit every started browser."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            drivers, self._drivers = self._drivers, []
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"Failed to quit browser: {e}")
+        self._local = threading.local()
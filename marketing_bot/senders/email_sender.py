@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import itertools
 import os
+import re
 import smtplib
-from dataclasses import dataclass
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from email import policy
 from email.message import EmailMessage as SmtpEmailMessage
+from typing import Iterator, Optional
 
 from dotenv import load_dotenv
 
 from marketing_bot.config import settings
+from marketing_bot.database.suppression import SuppressionList, get_suppression_list
+from marketing_bot.metrics.histogram import get_latency_recorder
+from marketing_bot.metrics.instruments import (
+    EMAILS_FAILED,
+    EMAILS_SENT,
+    EMAILS_SUPPRESSED,
+)
 from marketing_bot.utils.logger import get_logger
 
 load_dotenv()
@@ -22,6 +35,10 @@ except ImportError:
     SENDGRID_AVAILABLE = False
 
 
+# CR/LF would start a new header; no control character belongs in an address
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]")
+
+
 @dataclass
 class EmailMessage:
     subject: str
@@ -31,11 +48,181 @@ class EmailMessage:
     from_email: str | None = None
 
 
-def send_email(msg: EmailMessage) -> None:
-    """Send email via SendGrid (preferred) or SMTP fallback. If SENDER_DRY_RUN, log."""
-    dry_run = (
+@dataclass
+class PreparedEmail:
+    """Campaign message rendered once and stamped per recipient.
+
+    `payload` holds the serialized MIME message (From/Subject/MIME headers and
+    the text + HTML parts) without To or Message-ID; `render_for` prepends
+    those two headers, so only the recipient-specific bytes are allocated.
+    """
+
+    subject: str
+    body: str
+    html: str
+    from_name: str
+    from_email: str
+    payload: bytes
+    msgid_domain: str = "localhost"
+    _msgid_prefix: str = field(
+        init=False, repr=False, default_factory=lambda: os.urandom(6).hex()
+    )
+    _counter: itertools.count = field(
+        init=False, repr=False, default_factory=itertools.count
+    )
+
+    def message_id(self) -> str:
+        """Unique Message-ID without the per-call cost of `make_msgid`."""
+        return f"<{self._msgid_prefix}.{next(self._counter)}@{self.msgid_domain}>"
+
+    def render_for(self, to_email: str) -> bytes:
+        """Full RFC 5322 message bytes for one recipient.
+
+        Raises ValueError for addresses with control characters, which could
+        otherwise inject headers.
+        """
+        if _CONTROL_CHARS.search(to_email):
+            raise ValueError(f"Invalid recipient address: {to_email!r}")
+        try:
+            to_header = to_email.encode("ascii")
+        except UnicodeEncodeError:
+            # Non-ASCII addresses need header encoding; take the slow path
+            message = _build_mime_message(
+                self.from_email, self.from_name, self.subject, self.body, self.html
+            )
+            message["To"] = to_email
+            message["Message-ID"] = self.message_id()
+            return message.as_bytes(policy=policy.SMTP)
+        return b"".join(
+            (
+                b"To: ",
+                to_header,
+                b"\r\nMessage-ID: ",
+                self.message_id().encode("ascii"),
+                b"\r\n",
+                self.payload,
+            )
+        )
+
+
+def prepare_email(
+    subject: str,
+    body: str,
+    from_name: str | None = None,
+    from_email: str | None = None,
+) -> PreparedEmail:
+    """Render a campaign's shared MIME payload once for many recipients."""
+    from_name = from_name or settings.EMAIL_SENDER_NAME
+    from_email = from_email or settings.EMAIL_SENDER_ADDR
+    html = _body_to_html(body)
+    message = _build_mime_message(from_email, from_name, subject, body, html)
+    return PreparedEmail(
+        subject=subject,
+        body=body,
+        html=html,
+        from_name=from_name,
+        from_email=from_email,
+        payload=message.as_bytes(policy=policy.SMTP),
+        msgid_domain=from_email.rpartition("@")[2] or "localhost",
+    )
+
+
+def send_prepared_email(
+    prepared: PreparedEmail,
+    to_email: str,
+    suppression: Optional[SuppressionList] = None,
+) -> bool:
+    """Send a pre-rendered campaign message to one recipient.
+
+    Returns False without sending if the recipient is suppressed; the list
+    is refreshed first so suppressions recorded by other processes during a
+    long send are honoured.
+    """
+    suppression = suppression or get_suppression_list()
+    suppression.refresh()
+    if suppression.is_suppressed(to_email):
+        logger.info(f"Skipping suppressed recipient {to_email}")
+        EMAILS_SUPPRESSED.labels(stage="send").inc()
+        return False
+
+    if _is_dry_run():
+        logger.info(
+            f"[dry-run] Email to={to_email} from={prepared.from_name} "
+            f"<{prepared.from_email}> Subject: {prepared.subject}"
+        )
+        EMAILS_SENT.labels(provider="dry_run").inc()
+        return True
+
+    if (
+        SENDGRID_AVAILABLE
+        and settings.SENDGRID_API_KEY
+        and settings.SENDGRID_FROM_EMAIL
+    ):
+        with _counted("sendgrid"):
+            _sendgrid_send_html(
+                to_email, prepared.subject, prepared.body, prepared.html
+            )
+        return True
+
+    if settings.SMTP_HOST and settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
+        with _counted("smtp"):
+            _smtp_send_raw(prepared.from_email, to_email, prepared.render_for(to_email))
+        return True
+
+    logger.warning(
+        "No email provider configured. Set SENDER_DRY_RUN=true or provide SENDGRID_API_KEY or SMTP_ env vars."
+    )
+    return True
+
+
+@contextmanager
+def _counted(provider: str) -> Iterator[None]:
+    """Count a send attempt as sent or failed for `provider` and time it."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EMAILS_FAILED.labels(provider=provider).inc()
+        raise
+    finally:
+        get_latency_recorder().record(
+            f"send:{provider}", (time.perf_counter() - start) * 1000
+        )
+    EMAILS_SENT.labels(provider=provider).inc()
+
+
+def _is_dry_run() -> bool:
+    return (
         settings.SENDER_DRY_RUN or os.getenv("SENDER_DRY_RUN", "true").lower() == "true"
     )
+
+
+def _body_to_html(body: str) -> str:
+    return body.replace("\n", "<br>")
+
+
+def _build_mime_message(
+    from_email: str, from_name: str, subject: str, body: str, html: str
+) -> SmtpEmailMessage:
+    message = SmtpEmailMessage()
+    message["From"] = f"{from_name} <{from_email}>"
+    message["Subject"] = subject
+    message.set_content(body)
+    message.add_alternative(html, subtype="html")
+    return message
+
+
+def send_email(msg: EmailMessage) -> None:
+    """Send email via SendGrid (preferred) or SMTP fallback. If SENDER_DRY_RUN, log.
+
+    Suppressed recipients are skipped; bulk sends filter them earlier, while
+    streaming contacts.
+    """
+    if get_suppression_list().is_suppressed(msg.to):
+        logger.info(f"Skipping suppressed recipient {msg.to}")
+        EMAILS_SUPPRESSED.labels(stage="send").inc()
+        return
+    dry_run = _is_dry_run()
     from_name = msg.from_name or settings.EMAIL_SENDER_NAME
     from_email = msg.from_email or settings.EMAIL_SENDER_ADDR
 
@@ -43,6 +230,7 @@ def send_email(msg: EmailMessage) -> None:
         logger.info(
             f"[dry-run] Email to={msg.to} from={from_name} <{from_email}>\nSubject: {msg.subject}\n\n{msg.body}"
         )
+        EMAILS_SENT.labels(provider="dry_run").inc()
         return
 
     # Try SendGrid first
@@ -51,12 +239,14 @@ def send_email(msg: EmailMessage) -> None:
         and settings.SENDGRID_API_KEY
         and settings.SENDGRID_FROM_EMAIL
     ):
-        _sendgrid_send(from_email, from_name, msg.to, msg.subject, msg.body)
+        with _counted("sendgrid"):
+            _sendgrid_send(from_email, from_name, msg.to, msg.subject, msg.body)
         return
 
     # Fallback to SMTP
     if settings.SMTP_HOST and settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-        _smtp_send(from_email, from_name, msg.to, msg.subject, msg.body)
+        with _counted("smtp"):
+            _smtp_send(from_email, from_name, msg.to, msg.subject, msg.body)
         return
 
     logger.warning(
@@ -67,12 +257,17 @@ def send_email(msg: EmailMessage) -> None:
 def _sendgrid_send(
     from_email: str, from_name: str, to_email: str, subject: str, body: str
 ) -> None:
+    _sendgrid_send_html(to_email, subject, body, _body_to_html(body))
+
+
+def _sendgrid_send_html(to_email: str, subject: str, body: str, html: str) -> None:
     client = SendGridAPIClient(api_key=settings.SENDGRID_API_KEY)
     message = Mail(
         from_email=settings.SENDGRID_FROM_EMAIL,
         to_emails=to_email,
         subject=subject,
-        html_content=body.replace("\n", "<br>"),
+        plain_text_content=body,
+        html_content=html,
     )
     response = client.send(message)
     logger.info(f"SendGrid response: {response.status_code}")
@@ -87,19 +282,30 @@ def _smtp_send(
     message["Subject"] = subject
     message.set_content(body)
 
+    with _smtp_connection() as server:
+        server.send_message(message)
+    logger.info("Email sent")
+
+
+def _smtp_send_raw(from_email: str, to_email: str, data: bytes) -> None:
+    with _smtp_connection() as server:
+        server.sendmail(from_email, [to_email], data)
+    logger.info("Email sent")
+
+
+def _smtp_connection() -> smtplib.SMTP:
     host = settings.SMTP_HOST
     port = settings.SMTP_PORT
     username = settings.SMTP_USERNAME
     password = settings.SMTP_PASSWORD
     use_tls = settings.SMTP_USE_TLS
     logger.info(f"Sending via SMTP host={host}:{port} tls={use_tls}")
-    if use_tls:
-        with smtplib.SMTP(host, port) as server:
+    server = smtplib.SMTP(host, port)
+    try:
+        if use_tls:
             server.starttls()
-            server.login(username, password)
-            server.send_message(message)
-    else:
-        with smtplib.SMTP(host, port) as server:
-            server.login(username, password)
-            server.send_message(message)
-    logger.info("Email sent")
+        server.login(username, password)
+    except Exception:
+        server.close()
+        raise
+    return server
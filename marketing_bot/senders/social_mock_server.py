@@ -0,0 +1,130 @@
+"""Local mock of the social platform publishing APIs, for tests and demos.
+
+Run standalone with `python -m marketing_bot.senders.social_mock_server` and
+point SOCIAL_API_BASE_URL at it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_MockHTTPServer"
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            payload = json.loads(raw or b"{}")
+        except ValueError:
+            payload = {}
+
+        status = self.server.mock.next_status()
+        if status >= 400:
+            self._reply(status, {"error": "mock failure"})
+            return
+
+        post_id = self.server.mock.record(self.path, payload)
+        self._reply(200, {"id": post_id, "data": {"id": post_id}})
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockSocialServer"
+
+
+class MockSocialServer:
+    """Accepts POSTs on any path and answers like the real platform APIs.
+
+    `fail_first` makes the first N requests return `fail_status` (429 by
+    default) so retry and rate-limit handling can be exercised.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fail_first: int = 0,
+        fail_status: int = 429,
+    ):
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.requests: List[Dict[str, Any]] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = _MockHTTPServer((host, port), _Handler)
+        self._server.mock = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_status(self) -> int:
+        with self._lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                return self.fail_status
+        return 200
+
+    def record(self, path: str, payload: Dict[str, Any]) -> str:
+        with self._lock:
+            post_id = str(next(self._ids))
+            self.requests.append({"path": path, "payload": payload, "id": post_id})
+        return post_id
+
+    def start(self) -> "MockSocialServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockSocialServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-first", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockSocialServer(args.host, args.port, fail_first=args.fail_first)
+    print(f"Mock social API listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from marketing_bot.config import settings
+from marketing_bot.senders.browser_pool import BrowserPool
+from marketing_bot.senders.social_sender import SocialPost
+from marketing_bot.senders.throttle import TokenBucket
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SocialPublishError(Exception):
+    """Publishing failed; `retryable` marks throttling and transient errors."""
+
+    def __init__(
+        self, message: str, retryable: bool = False, status_code: int | None = None
+    ):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status_code = status_code
+
+
+@dataclass
+class PublishResult:
+    platform: str
+    account: str | None
+    success: bool
+    post_id: str | None = None
+    error: str | None = None
+    attempts: int = 0
+
+
+class SocialAdapter(ABC):
+    """Publishes posts to one platform account."""
+
+    platform: str = ""
+
+    @abstractmethod
+    async def publish(self, post: SocialPost, client: httpx.AsyncClient) -> str:
+        """Publish `post` and return the platform's post id."""
+
+
+class HttpSocialAdapter(SocialAdapter):
+    """Adapter for platforms with a JSON HTTP publishing API."""
+
+    default_base_url = ""
+
+    def __init__(self, token: str, base_url: str | None = None):
+        self.token = token
+        self.base_url = (base_url or self.default_base_url).rstrip("/")
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def _post(
+        self, client: httpx.AsyncClient, path: str, payload: Dict[str, Any]
+    ) -> httpx.Response:
+        try:
+            response = await client.post(
+                f"{self.base_url}{path}", json=payload, headers=self.headers()
+            )
+        except httpx.TransportError as e:
+            raise SocialPublishError(f"{self.platform}: {e}", retryable=True)
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise SocialPublishError(
+                f"{self.platform}: HTTP {response.status_code}",
+                retryable=True,
+                status_code=response.status_code,
+            )
+        if response.status_code >= 400:
+            raise SocialPublishError(
+                f"{self.platform}: HTTP {response.status_code} {response.text[:200]}",
+                status_code=response.status_code,
+            )
+        return response
+
+
+class TwitterAdapter(HttpSocialAdapter):
+    platform = "twitter"
+    default_base_url = "https://api.twitter.com"
+
+    async def publish(self, post: SocialPost, client: httpx.AsyncClient) -> str:
+        response = await self._post(client, "/2/tweets", {"text": post.content})
+        return str(response.json()["data"]["id"])
+
+
+class FacebookAdapter(HttpSocialAdapter):
+    platform = "facebook"
+    default_base_url = "https://graph.facebook.com/v19.0"
+
+    def __init__(self, page_id: str, token: str, base_url: str | None = None):
+        super().__init__(token, base_url)
+        self.page_id = page_id
+
+    async def publish(self, post: SocialPost, client: httpx.AsyncClient) -> str:
+        response = await self._post(
+            client, f"/{self.page_id}/feed", {"message": post.content}
+        )
+        return str(response.json()["id"])
+
+
+class InstagramAdapter(HttpSocialAdapter):
+    platform = "instagram"
+    default_base_url = "https://graph.facebook.com/v19.0"
+
+    def __init__(self, user_id: str, token: str, base_url: str | None = None):
+        super().__init__(token, base_url)
+        self.user_id = user_id
+
+    async def publish(self, post: SocialPost, client: httpx.AsyncClient) -> str:
+        if not post.media_url:
+            raise SocialPublishError("instagram: posts require a media_url")
+        container = await self._post(
+            client,
+            f"/{self.user_id}/media",
+            {"image_url": post.media_url, "caption": post.content},
+        )
+        response = await self._post(
+            client,
+            f"/{self.user_id}/media_publish",
+            {"creation_id": container.json()["id"]},
+        )
+        return str(response.json()["id"])
+
+
+class LinkedInAdapter(HttpSocialAdapter):
+    platform = "linkedin"
+    default_base_url = "https://api.linkedin.com"
+
+    def __init__(self, author_urn: str, token: str, base_url: str | None = None):
+        super().__init__(token, base_url)
+        self.author_urn = author_urn
+
+    def headers(self) -> Dict[str, str]:
+        return {**super().headers(), "X-Restli-Protocol-Version": "2.0.0"}
+
+    async def publish(self, post: SocialPost, client: httpx.AsyncClient) -> str:
+        payload = {
+            "author": self.author_urn,
+            "lifecycleState": "PUBLISHED",
+            "specificContent": {
+                "com.linkedin.ugc.ShareContent": {
+                    "shareCommentary": {"text": post.content},
+                    "shareMediaCategory": "NONE",
+                }
+            },
+            "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
+        }
+        response = await self._post(client, "/v2/ugcPosts", payload)
+        return response.headers.get("x-restli-id") or str(response.json()["id"])
+
+
+class SeleniumSocialAdapter(SocialAdapter):
+    """Runs a browser-driven posting flow on a shared `BrowserPool`.
+
+    `flow(driver, post)` performs the UI steps and returns the post id/URL.
+    """
+
+    def __init__(
+        self,
+        platform: str,
+        flow: Callable[[Any, SocialPost], str],
+        pool: BrowserPool,
+    ):
+        self.platform = platform
+        self.flow = flow
+        self.pool = pool
+
+    async def publish(self, post: SocialPost, client: httpx.AsyncClient) -> str:
+        try:
+            return await self.pool.run(self.flow, post)
+        except SocialPublishError:
+            raise
+        except Exception as e:
+            raise SocialPublishError(f"{self.platform}: {e}", retryable=True)
+
+
+class SocialPublisher:
+    """Publishes posts concurrently across platforms and accounts.
+
+    Each platform gets its own token bucket (posts/sec) and concurrency cap;
+    retryable failures are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        rate_limits: Optional[Dict[str, float]] = None,
+        default_rate_per_sec: float = 1.0,
+        max_concurrency_per_platform: int = 4,
+        max_attempts: int = 3,
+        retry_delay: float = 1.0,
+        timeout: float = 30.0,
+        browser_pool: Optional[BrowserPool] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.rate_limits = rate_limits or {}
+        self.default_rate_per_sec = default_rate_per_sec
+        self.max_concurrency_per_platform = max_concurrency_per_platform
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.browser_pool = browser_pool or BrowserPool()
+        self._sleep = sleep
+        self._adapters: Dict[Tuple[str, str | None], SocialAdapter] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def register(self, adapter: SocialAdapter, account: str | None = None) -> None:
+        """Register an adapter for its platform (and optionally one account)."""
+        self._adapters[(adapter.platform, account)] = adapter
+
+    def register_browser_flow(
+        self,
+        platform: str,
+        flow: Callable[[Any, SocialPost], str],
+        account: str | None = None,
+    ) -> None:
+        """Register a Selenium flow that runs on the publisher's browser pool."""
+        self.register(SeleniumSocialAdapter(platform, flow, self.browser_pool), account)
+
+    def platforms(self) -> List[str]:
+        return sorted({platform for platform, _ in self._adapters})
+
+    def _adapter(self, post: SocialPost) -> SocialAdapter:
+        adapter = self._adapters.get((post.platform, post.account)) or (
+            self._adapters.get((post.platform, None))
+        )
+        if adapter is None:
+            raise SocialPublishError(
+                f"No adapter registered for platform={post.platform} "
+                f"account={post.account or 'default'}"
+            )
+        return adapter
+
+    def _bucket(self, platform: str) -> TokenBucket:
+        bucket = self._buckets.get(platform)
+        if bucket is None:
+            rate = self.rate_limits.get(platform, self.default_rate_per_sec)
+            bucket = TokenBucket(rate, capacity=1)
+            self._buckets[platform] = bucket
+        return bucket
+
+    async def _publish_one(
+        self,
+        post: SocialPost,
+        client: httpx.AsyncClient,
+        semaphores: Dict[str, asyncio.Semaphore],
+    ) -> PublishResult:
+        result = PublishResult(
+            platform=post.platform, account=post.account, success=False
+        )
+        try:
+            adapter = self._adapter(post)
+        except SocialPublishError as e:
+            result.error = str(e)
+            return result
+
+        semaphore = semaphores.setdefault(
+            post.platform, asyncio.Semaphore(self.max_concurrency_per_platform)
+        )
+        for attempt in range(self.max_attempts):
+            result.attempts = attempt + 1
+            try:
+                async with semaphore:
+                    await self._bucket(post.platform).acquire()
+                    result.post_id = await adapter.publish(post, client)
+                result.success = True
+                result.error = None
+                logger.info(
+                    f"Posted to {post.platform} account={post.account or 'default'} "
+                    f"id={result.post_id}"
+                )
+                return result
+            except SocialPublishError as e:
+                result.error = str(e)
+                if not e.retryable or attempt == self.max_attempts - 1:
+                    break
+                logger.warning(f"Attempt {attempt + 1} failed: {e}")
+                await self._sleep(self.retry_delay * (2**attempt))
+            except Exception as e:
+                result.error = str(e)
+                break
+
+        logger.error(f"Failed to post to {post.platform}: {result.error}")
+        return result
+
+    async def publish(self, post: SocialPost) -> PublishResult:
+        return (await self.publish_many([post]))[0]
+
+    async def publish_many(self, posts: List[SocialPost]) -> List[PublishResult]:
+        """Publish all posts concurrently; results are in input order."""
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            return list(
+                await asyncio.gather(
+                    *(self._publish_one(post, client, semaphores) for post in posts)
+                )
+            )
+
+
+def create_social_publisher() -> SocialPublisher:
+    """Build a publisher with an adapter for every platform configured in settings."""
+    publisher = SocialPublisher(
+        default_rate_per_sec=settings.SOCIAL_RATE_LIMIT_PER_SEC,
+        max_concurrency_per_platform=settings.SOCIAL_MAX_CONCURRENCY,
+        browser_pool=BrowserPool(size=settings.SELENIUM_MAX_BROWSERS),
+    )
+    base_url = settings.SOCIAL_API_BASE_URL
+    if settings.TWITTER_BEARER_TOKEN:
+        publisher.register(TwitterAdapter(settings.TWITTER_BEARER_TOKEN, base_url))
+    if settings.FACEBOOK_PAGE_ID and settings.FACEBOOK_PAGE_TOKEN:
+        publisher.register(
+            FacebookAdapter(
+                settings.FACEBOOK_PAGE_ID, settings.FACEBOOK_PAGE_TOKEN, base_url
+            )
+        )
+    if settings.INSTAGRAM_USER_ID and settings.INSTAGRAM_ACCESS_TOKEN:
+        publisher.register(
+            InstagramAdapter(
+                settings.INSTAGRAM_USER_ID, settings.INSTAGRAM_ACCESS_TOKEN, base_url
+            )
+        )
+    if settings.LINKEDIN_AUTHOR_URN and settings.LINKEDIN_ACCESS_TOKEN:
+        publisher.register(
+            LinkedInAdapter(
+                settings.LINKEDIN_AUTHOR_URN, settings.LINKEDIN_ACCESS_TOKEN, base_url
+            )
+        )
+    return publisher
+
+
+# Global instance
+_publisher: SocialPublisher | None = None
+
+
+def get_social_publisher() -> SocialPublisher:
+    """Get singleton social publisher built from settings."""
+    global _publisher
+    if _publisher is None:
+        _publisher = create_social_publisher()
+    return _publisher
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import os
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, List
 
 from dotenv import load_dotenv
 
 from marketing_bot.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from marketing_bot.senders.social_publisher import PublishResult
+
 load_dotenv()
 logger = get_logger(__name__)
 
@@ -16,16 +21,47 @@ class SocialPost:
     platform: str
     content: str
     account: str | None = None
+    media_url: str | None = None
+
+
+def _is_dry_run() -> bool:
+    return os.getenv("SENDER_DRY_RUN", "true").lower() == "true"
+
+
+def _log_dry_run(post: SocialPost) -> None:
+    logger.info(
+        f"[dry-run] Social post to platform={post.platform} account={post.account or 'default'}\n{post.content}"
+    )
+
+
+async def publish_social_posts(posts: List[SocialPost]) -> List[PublishResult]:
+    """Publish posts concurrently across platforms/accounts (dry-run logs only)."""
+    from marketing_bot.senders.social_publisher import (
+        PublishResult,
+        get_social_publisher,
+    )
+
+    if _is_dry_run():
+        for post in posts:
+            _log_dry_run(post)
+        return [
+            PublishResult(platform=p.platform, account=p.account, success=True)
+            for p in posts
+        ]
+    return await get_social_publisher().publish_many(posts)
 
 
 def send_social_post(post: SocialPost) -> None:
-    """Stub social post sender (dry-run). Replace with platform-specific Selenium flows."""
-    dry_run = os.getenv("SENDER_DRY_RUN", "true").lower() == "true"
-    if dry_run:
-        logger.info(
-            f"[dry-run] Social post to platform={post.platform} account={post.account or 'default'}\n{post.content}"
-        )
+    """Publish a single post via the platform adapters. If SENDER_DRY_RUN, log.
+
+    Blocking wrapper; async code should await `publish_social_posts` instead.
+    """
+    if _is_dry_run():
+        _log_dry_run(post)
         return
-    logger.warning(
-        "Real social posting not implemented. Set SENDER_DRY_RUN=true to suppress this warning."
-    )
+    result = asyncio.run(publish_social_posts([post]))[0]
+    if not result.success:
+        logger.warning(
+            f"Social post to {post.platform} failed: {result.error}. "
+            "Configure platform credentials or set SENDER_DRY_RUN=true."
+        )
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import smtplib
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeVar,
+)
+
+from marketing_bot.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Float slack so a clock advanced by exactly the computed wait counts as "ready"
+_EPSILON = 1e-9
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `capacity` banked."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take `tokens` if available without waiting."""
+        self._refill()
+        if self._tokens + _EPSILON >= tokens:
+            self._tokens = max(0.0, self._tokens - tokens)
+            return True
+        return False
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Return tokens taken for work that was not done."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def time_until_available(self, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` can be taken (0 if already available)."""
+        self._refill()
+        missing = tokens - self._tokens
+        return max(0.0, missing / self.rate) if missing > _EPSILON else 0.0
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until `tokens` are available, then take them."""
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.time_until_available(tokens))
+
+
+@dataclass
+class DomainStats:
+    """Per-domain counters exposed by `DomainThrottle.stats`."""
+
+    sent: int = 0
+    deferred: int = 0
+    failed: int = 0
+    consecutive_deferrals: int = 0
+    first_sent_at: Optional[float] = None
+    last_sent_at: Optional[float] = None
+
+    def throughput(self) -> float:
+        """Messages per second over the domain's active sending period."""
+        if self.sent < 2 or self.first_sent_at is None or self.last_sent_at is None:
+            return 0.0
+        span = self.last_sent_at - self.first_sent_at
+        return (self.sent - 1) / span if span > 0 else 0.0
+
+
+class _DomainState(Generic[T]):
+    def __init__(self, bucket: Optional[TokenBucket], base_rate: Optional[float]):
+        self.bucket = bucket
+        self.base_rate = base_rate
+        self.queue: Deque[tuple[T, int]] = deque()
+        self.blocked_until = 0.0
+        self.scheduled = False
+        self.stats = DomainStats()
+
+
+def recipient_domain(address: str) -> str:
+    """Lower-cased domain part of an email address ('' if there is none)."""
+    _, _, domain = address.rpartition("@")
+    return domain.strip().strip(">").lower()
+
+
+def is_deferral(exc: BaseException) -> bool:
+    """True for transient 4xx rejections the receiving side expects us to retry."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in exc.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    # HTTP providers (SendGrid) signal throttling with 429
+    status = getattr(exc, "status_code", None)
+    return status == 429
+
+
+class DomainThrottle:
+    """Per-recipient-domain token buckets with adaptive backoff.
+
+    `schedule()` interleaves items across domains so a slow domain never holds
+    up the others: the next item always comes from the domain whose bucket
+    refills first. A 4xx deferral reported via `record_deferral()` pauses the
+    domain with exponential backoff, halves its rate and re-queues the item;
+    successful sends restore the rate additively.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: Optional[float] = 5.0,
+        burst: int = 10,
+        backoff_seconds: float = 60.0,
+        max_backoff_seconds: float = 900.0,
+        max_deferrals: int = 3,
+        lookahead: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.max_deferrals = max_deferrals
+        self.lookahead = max(lookahead, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._domains: Dict[str, _DomainState] = {}
+        self._ready: list[tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._buffered = 0
+        self._in_flight: Dict[int, tuple[str, int]] = {}
+
+    def _state(self, domain: str) -> _DomainState:
+        state = self._domains.get(domain)
+        if state is None:
+            bucket = (
+                TokenBucket(self.rate_per_second, self.burst, clock=self._clock)
+                if self.rate_per_second
+                else None
+            )
+            state = _DomainState(bucket, self.rate_per_second)
+            self._domains[domain] = state
+        return state
+
+    def _push(self, domain: str, ready_at: float) -> None:
+        heapq.heappush(self._ready, (ready_at, next(self._seq), domain))
+
+    def _enqueue(self, domain: str, item: T, attempt: int, front: bool = False) -> None:
+        state = self._state(domain)
+        if front:
+            state.queue.appendleft((item, attempt))
+        else:
+            state.queue.append((item, attempt))
+        self._buffered += 1
+        if not state.scheduled:
+            state.scheduled = True
+            self._push(domain, max(state.blocked_until, self._clock()))
+
+    def _fill(self, source: Iterator[T], key: Callable[[T], str]) -> bool:
+        """Pull from `source` until the lookahead window is full."""
+        while self._buffered < self.lookahead:
+            try:
+                item = next(source)
+            except StopIteration:
+                return False
+            self._enqueue(recipient_domain(key(item)), item, 0)
+        return True
+
+    async def schedule(
+        self, items: Iterable[T], key: Callable[[T], str] = lambda item: item.email
+    ) -> AsyncIterator[T]:
+        """Yield `items` in a domain-interleaved order, pacing each domain.
+
+        `items` is consumed lazily (at most `lookahead` buffered), so it may be
+        a generator over a large contact base. Callers must report the outcome
+        of every yielded item with `record_sent`, `record_deferral`,
+        `record_failure` or `record_skipped`.
+        """
+        source = iter(items)
+        more = self._fill(source, key)
+        while self._ready or more:
+            if not self._ready:
+                more = self._fill(source, key)
+                continue
+
+            ready_at, _, domain = heapq.heappop(self._ready)
+            delay = ready_at - self._clock()
+            if delay > _EPSILON:
+                await self._sleep(delay)
+
+            state = self._domains[domain]
+            if not state.queue:
+                state.scheduled = False
+                continue
+
+            now = self._clock()
+            if state.blocked_until > now + _EPSILON:
+                self._push(domain, state.blocked_until)
+                continue
+            if state.bucket is not None and not state.bucket.try_acquire():
+                self._push(domain, now + state.bucket.time_until_available())
+                continue
+
+            item, attempt = state.queue.popleft()
+            self._buffered -= 1
+            self._in_flight[id(item)] = (domain, attempt)
+            if state.queue:
+                self._push(domain, now)
+            else:
+                state.scheduled = False
+
+            yield item
+
+            if more:
+                more = self._fill(source, key)
+
+    def record_sent(self, item: T) -> None:
+        """Report a successful send; slowly restores a backed-off domain."""
+        domain, _ = self._in_flight.pop(id(item), (None, 0))
+        if domain is None:
+            return
+        state = self._domains[domain]
+        now = self._clock()
+        state.stats.sent += 1
+        state.stats.consecutive_deferrals = 0
+        state.stats.first_sent_at = state.stats.first_sent_at or now
+        state.stats.last_sent_at = now
+        bucket = state.bucket
+        if bucket is not None and bucket.rate < state.base_rate:
+            bucket.rate = min(state.base_rate, bucket.rate + state.base_rate * 0.1)
+
+    def record_failure(self, item: T) -> None:
+        """Report a permanent failure (the item is dropped)."""
+        domain, _ = self._in_flight.pop(id(item), (None, 0))
+        if domain is not None:
+            self._domains[domain].stats.failed += 1
+
+    def record_skipped(self, item: T) -> None:
+        """Report an item that was not sent (e.g. suppressed); its token is
+        returned to the domain and nothing is counted."""
+        domain, _ = self._in_flight.pop(id(item), (None, 0))
+        if domain is not None and self._domains[domain].bucket is not None:
+            self._domains[domain].bucket.refund()
+
+    def record_deferral(self, item: T) -> bool:
+        """Report a 4xx deferral: back off the domain and re-queue the item.
+
+        Returns False once the item has been deferred `max_deferrals` times;
+        the caller should then treat it as failed.
+        """
+        domain, attempt = self._in_flight.pop(id(item), (None, 0))
+        if domain is None:
+            return False
+        state = self._domains[domain]
+        state.stats.deferred += 1
+        state.stats.consecutive_deferrals += 1
+
+        backoff = min(
+            self.max_backoff_seconds,
+            self.backoff_seconds * 2 ** (state.stats.consecutive_deferrals - 1),
+        )
+        state.blocked_until = max(state.blocked_until, self._clock() + backoff)
+        if state.bucket is not None:
+            state.bucket.rate = max(state.bucket.rate / 2, state.base_rate / 32)
+        logger.warning(
+            f"Deferral from {domain}; backing off {backoff:.0f}s "
+            f"(rate now {state.bucket.rate if state.bucket else 'unlimited'}/s)"
+        )
+
+        if attempt + 1 >= self.max_deferrals:
+            state.stats.failed += 1
+            return False
+        self._enqueue(domain, item, attempt + 1, front=True)
+        return True
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-domain throughput and deferral counters."""
+        return {
+            domain: {
+                "sent": state.stats.sent,
+                "deferred": state.stats.deferred,
+                "failed": state.stats.failed,
+                "throughput_per_sec": round(state.stats.throughput(), 3),
+                "rate_limit_per_sec": (
+                    round(state.bucket.rate, 3) if state.bucket else None
+                ),
+                "backoff_remaining_sec": round(
+                    max(0.0, state.blocked_until - self._clock()), 3
+                ),
+            }
+            for domain, state in self._domains.items()
+        }
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 from uuid import UUID
 
+from marketing_bot.config import settings
 from marketing_bot.generation.openai_client import generate_marketing_text
 from marketing_bot.generation.templates import (
     EMAIL_TEMPLATE,
@@ -12,14 +16,19 @@ from marketing_bot.generation.templates import (
 from marketing_bot.metrics.tracker import MetricsTracker
 from marketing_bot.models.campaign import (
     Campaign,
-    CampaignResult,
+    CampaignResultBatch,
     CampaignStatus,
     CampaignType,
 )
-from marketing_bot.repositories.campaign_repository import CampaignRepository
+from marketing_bot.repositories.factory import AnyCampaignRepository
+from marketing_bot.repositories.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+)
 from marketing_bot.segmentation.rfm import score_rfm
 from marketing_bot.senders.email_sender import EmailMessage, send_email
-from marketing_bot.senders.social_sender import SocialPost, send_social_post
+from marketing_bot.senders.social_sender import SocialPost, publish_social_posts
 from marketing_bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -27,10 +36,13 @@ logger = get_logger(__name__)
 
 class CampaignService:
     def __init__(
-        self, campaign_repo: CampaignRepository, metrics_tracker: MetricsTracker
+        self, campaign_repo: AnyCampaignRepository, metrics_tracker: MetricsTracker
     ):
         self.campaign_repo = campaign_repo
         self.metrics_tracker = metrics_tracker
+        self.generation_workers = settings.CAMPAIGN_GENERATION_WORKERS
+        self.send_workers = settings.CAMPAIGN_SEND_WORKERS
+        self.queue_size = settings.CAMPAIGN_QUEUE_SIZE
 
     async def create_campaign(self, campaign: Campaign) -> Campaign:
         """Create a new campaign."""
@@ -47,10 +59,66 @@ class CampaignService:
         """List campaigns, optionally filtered by status."""
         return await self.campaign_repo.list(status=status)
 
+    def check_campaigns_cursor(self, cursor: str) -> None:
+        """Raise ValueError unless `cursor` is a campaigns cursor of this
+        backend, so streamed listings fail before the response starts."""
+        decode_cursor(cursor, *self.campaign_repo.CAMPAIGNS_CURSOR)
+
+    def check_results_cursor(self, cursor: str) -> None:
+        """Raise ValueError unless `cursor` is a results cursor of this backend."""
+        decode_cursor(cursor, *self.campaign_repo.RESULTS_CURSOR)
+
+    async def list_campaigns_page(
+        self,
+        status: Optional[CampaignStatus] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Campaign], Optional[str]]:
+        """One page of campaigns and the cursor for the next page."""
+        return await self.campaign_repo.list_page(status, limit, cursor)
+
+    async def get_results_page(
+        self,
+        campaign_id: UUID,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """One page of raw result records and the cursor for the next page."""
+        return await self.campaign_repo.results_page(campaign_id, limit, cursor)
+
+    async def iter_campaigns(
+        self, status: Optional[CampaignStatus] = None, cursor: Optional[str] = None
+    ) -> AsyncIterator[Campaign]:
+        """All campaigns from `cursor` on, fetched page by page."""
+        while True:
+            page, cursor = await self.list_campaigns_page(status, MAX_PAGE_SIZE, cursor)
+            for campaign in page:
+                yield campaign
+            if cursor is None:
+                return
+
+    async def iter_results(
+        self, campaign_id: UUID, cursor: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """All raw result records from `cursor` on, fetched page by page."""
+        while True:
+            page, cursor = await self.get_results_page(
+                campaign_id, MAX_PAGE_SIZE, cursor
+            )
+            for record in page:
+                yield record
+            if cursor is None:
+                return
+
     async def execute_campaign(
         self, campaign_id: UUID, customer_data: List[dict]
-    ) -> List[CampaignResult]:
-        """Execute campaign for given customer data."""
+    ) -> CampaignResultBatch:
+        """Execute campaign for given customer data.
+
+        Results are collected column-wise and saved as one batch; call
+        `to_models()` on the returned batch if `CampaignResult` models are
+        needed.
+        """
         campaign = await self.get_campaign(campaign_id)
         if not campaign:
             raise ValueError(f"Campaign {campaign_id} not found")
@@ -68,43 +136,114 @@ class CampaignService:
         df = pd.DataFrame(customer_data)
         scored_customers = score_rfm(df)
 
-        results = []
+        results = CampaignResultBatch(campaign_id=campaign.id)
+        await self._run_pipeline(campaign, scored_customers.to_dict("records"), results)
 
-        # Generate and send content for each customer
-        for _, customer in scored_customers.iterrows():
-            try:
-                customer_results = await self._process_customer(campaign, customer)
-                results.extend(customer_results)
+        # Save results
+        await self.campaign_repo.save_result_batch(results)
+        return results
 
-                # Track metrics
-                await self.metrics_tracker.track_campaign_execution(
-                    campaign_id=campaign_id,
-                    customer_id=customer["customer_id"],
-                    success=True,
-                )
+    async def _run_pipeline(
+        self,
+        campaign: Campaign,
+        customers: List[Dict[str, Any]],
+        results: CampaignResultBatch,
+    ) -> None:
+        """Generate and deliver content for `customers` in two stages.
+
+        Generation workers hand each customer's content to send workers
+        through a bounded queue, so generation runs at most `queue_size`
+        customers ahead and a campaign takes about as long as its slower
+        stage. Blocking LLM and sender calls run on a thread pool sized for
+        both stages. A failure only fails that customer; rows are added to
+        `results` in completion order.
+        """
+        loop = asyncio.get_running_loop()
+        # Each stage needs a worker, or the other stage waits on it forever
+        generation_workers = max(1, self.generation_workers)
+        send_workers = max(1, self.send_workers)
+        to_generate: asyncio.Queue = asyncio.Queue(self.queue_size)
+        to_send: asyncio.Queue = asyncio.Queue(self.queue_size)
+        generating = generation_workers
+
+        async def feed() -> None:
+            for customer in customers:
+                await to_generate.put(customer)
+            for _ in range(generation_workers):
+                await to_generate.put(None)
+
+        async def generate() -> None:
+            nonlocal generating
+            while (customer := await to_generate.get()) is not None:
+                try:
+                    content = await self._generate_content(campaign, customer, run)
+                except Exception as e:
+                    await self._track(campaign.id, customer, e)
+                    continue
+                await to_send.put((customer, content))
+            generating -= 1
+            if not generating:
+                for _ in range(send_workers):
+                    await to_send.put(None)
 
-            except Exception as e:
-                logger.error(
-                    f"Failed to process customer {customer['customer_id']}: {e}"
+        async def send() -> None:
+            while (item := await to_send.get()) is not None:
+                customer, content = item
+                try:
+                    await self._deliver(campaign, customer, content, results, run)
+                except Exception as e:
+                    await self._track(campaign.id, customer, e)
+                    continue
+                await self._track(campaign.id, customer)
+
+        # Leaving the pool waits for in-flight calls after the task group has
+        # cancelled every stage on an unexpected error
+        with ThreadPoolExecutor(
+            max_workers=generation_workers + send_workers,
+            thread_name_prefix="campaign",
+        ) as executor:
+
+            def run(fn: Callable, *args, **kwargs) -> asyncio.Future:
+                return loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+
+            async with asyncio.TaskGroup() as group:
+                group.create_task(feed())
+                for _ in range(generation_workers):
+                    group.create_task(generate())
+                for _ in range(send_workers):
+                    group.create_task(send())
+
+    async def _track(
+        self,
+        campaign_id: UUID,
+        customer: Dict[str, Any],
+        error: Optional[Exception] = None,
+    ) -> None:
+        """Record one customer's outcome; a tracker failure is only logged so
+        it cannot stop a pipeline worker."""
+        customer_id = customer["customer_id"]
+        if error is not None:
+            logger.error(f"Failed to process customer {customer_id}: {error}")
+        try:
+            if error is None:
+                await self.metrics_tracker.track_campaign_execution(
+                    campaign_id=campaign_id, customer_id=customer_id, success=True
                 )
+            else:
                 await self.metrics_tracker.track_campaign_execution(
                     campaign_id=campaign_id,
-                    customer_id=customer["customer_id"],
+                    customer_id=customer_id,
                     success=False,
-                    error=str(e),
+                    error=str(error),
+                    error_class=type(error).__name__,
                 )
+        except Exception as e:
+            logger.error(f"Failed to track customer {customer_id}: {e}")
 
-        # Save results
-        await self.campaign_repo.save_results(results)
-        return results
-
-    async def _process_customer(
-        self, campaign: Campaign, customer: dict
-    ) -> List[CampaignResult]:
-        """Process a single customer for the campaign."""
-        results = []
-
-        # Prepare context
+    async def _generate_content(
+        self, campaign: Campaign, customer: Dict[str, Any], run: Callable
+    ) -> List[Tuple[str, str]]:
+        """(content type, text) pairs to deliver to one customer."""
         ctx = {
             "segment_name": customer["segment"],
             "product_name": campaign.product_name,
@@ -113,49 +252,47 @@ class CampaignService:
             "tone": campaign.tone,
             "platform": campaign.platform,
         }
-
-        # Generate email content
+        content = []
         if campaign.campaign_type in [CampaignType.EMAIL, CampaignType.BOTH]:
             email_prompt = render_prompt(EMAIL_TEMPLATE, ctx)
-            email_content = generate_marketing_text(email_prompt, tone=campaign.tone)
-
-            # Send email
-            subject, body = self._split_email(email_content)
-            msg = EmailMessage(
-                subject=subject,
-                body=body,
-                to=customer.get("email", f"{customer['customer_id']}@example.com"),
-            )
-            send_email(msg)
-
-            results.append(
-                CampaignResult(
-                    campaign_id=campaign.id,
-                    customer_id=customer["customer_id"],
-                    content_type="email",
-                    content=email_content,
-                )
+            email_content = await run(
+                generate_marketing_text, email_prompt, tone=campaign.tone
             )
-
-        # Generate social content
+            content.append(("email", email_content))
         if campaign.campaign_type in [CampaignType.SOCIAL, CampaignType.BOTH]:
             social_prompt = render_prompt(SOCIAL_POST_TEMPLATE, ctx)
-            social_content = generate_marketing_text(social_prompt, tone=campaign.tone)
-
-            # Send social post
-            post = SocialPost(platform=campaign.platform, content=social_content)
-            send_social_post(post)
-
-            results.append(
-                CampaignResult(
-                    campaign_id=campaign.id,
-                    customer_id=customer["customer_id"],
-                    content_type="social",
-                    content=social_content,
-                )
+            social_content = await run(
+                generate_marketing_text, social_prompt, tone=campaign.tone
             )
+            content.append(("social", social_content))
+        return content
 
-        return results
+    async def _deliver(
+        self,
+        campaign: Campaign,
+        customer: Dict[str, Any],
+        content: List[Tuple[str, str]],
+        results: CampaignResultBatch,
+        run: Callable,
+    ) -> None:
+        """Send one customer's generated content, adding to `results`."""
+        for content_type, text in content:
+            if content_type == "email":
+                subject, body = self._split_email(text)
+                msg = EmailMessage(
+                    subject=subject,
+                    body=body,
+                    to=customer.get("email", f"{customer['customer_id']}@example.com"),
+                )
+                await run(send_email, msg)
+            else:
+                post = SocialPost(platform=campaign.platform, content=text)
+                result = (await publish_social_posts([post]))[0]
+                if not result.success:
+                    raise RuntimeError(
+                        result.error or f"Failed to post to {post.platform}"
+                    )
+            results.add(customer["customer_id"], content_type, text)
 
     def _split_email(self, content: str) -> tuple[str, str]:
         """Split email content into subject and body."""
@@ -1,24 +1,46 @@
 from __future__ import annotations
 
-import asyncio
 import uuid
+from itertools import chain, islice
 from pathlib import Path
 from typing import Dict, Optional
 
-from marketing_bot.database.email_database import EmailDatabase
+from marketing_bot.config import settings
+from marketing_bot.database.factory import create_email_database
+from marketing_bot.database.sharding import Shard
+from marketing_bot.metrics.instruments import CACHE_HITS, CACHE_MISSES
 from marketing_bot.metrics.tracker import MetricsTracker
-from marketing_bot.senders.email_sender import EmailMessage, send_email
+from marketing_bot.scheduling.dispatcher import (
+    Clock,
+    DispatchScheduler,
+    ScheduledSend,
+    ScheduleStore,
+    SendWindow,
+    plan_send_window,
+)
+from marketing_bot.scheduling.handlers import social_post_handler
+from marketing_bot.senders.email_sender import (
+    PreparedEmail,
+    prepare_email,
+    send_prepared_email,
+)
+from marketing_bot.senders.throttle import DomainThrottle, is_deferral
 from marketing_bot.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Successful sends between campaign counter updates during a send
+STATS_FLUSH_EVERY = 100
+
 
 class EmailCampaignService:
     """Service for managing email campaigns and bulk sending."""
 
     def __init__(self, data_dir: Path = Path("data")):
-        self.db = EmailDatabase(data_dir)
+        self.db = create_email_database(data_dir)
         self.metrics = MetricsTracker(data_dir)
+        self.last_domain_stats: Dict[str, Dict[str, float]] = {}
+        self._prepared: Dict[str, PreparedEmail] = {}
 
     async def create_campaign(
         self,
@@ -44,56 +66,72 @@ class EmailCampaignService:
         return campaign_id
 
     async def send_campaign(
-        self, campaign_id: str, max_emails: Optional[int] = None, dry_run: bool = True
+        self,
+        campaign_id: str,
+        max_emails: Optional[int] = None,
+        dry_run: bool = True,
+        shard: Optional[Shard] = None,
     ) -> Dict[str, int]:
-        """Send campaign to all contacts in the segment."""
+        """Send campaign to all contacts in the segment.
+
+        With `shard`, only that shard's contacts are sent to (and
+        `max_emails` applies per shard), so independent workers each given
+        one of shards 0..N-1 cover the segment exactly once.
+        """
         try:
             # Get campaign details
-            campaigns_df = self.db.get_campaigns()
-            campaign = campaigns_df[campaigns_df["campaign_id"] == campaign_id]
-
-            if campaign.empty:
+            campaign_data = self.db.get_campaign(campaign_id)
+            if campaign_data is None:
                 raise ValueError(f"Campaign {campaign_id} not found")
 
-            campaign_data = campaign.iloc[0]
             segment = campaign_data["segment"]
             subject = campaign_data["subject"]
             body = campaign_data["body"]
 
-            # Get contacts for this segment
-            contacts = self.db.get_contacts_by_segment(segment)
+            # Stream contacts for this segment; reading stops after max_emails
+            batches = self.db.iter_contacts(segment, shard=shard)
+            contacts = chain.from_iterable(batches)
+            if max_emails:
+                contacts = islice(contacts, max_emails)
 
-            if not contacts:
+            first = next(contacts, None)
+            if first is None:
                 logger.warning(f"No contacts found for segment: {segment}")
                 return {"sent": 0, "success": 0, "failed": 0}
-
-            # Limit contacts if max_emails specified
-            if max_emails:
-                contacts = contacts[:max_emails]
+            contacts = chain([first], contacts)
 
             logger.info(
-                f"Sending campaign to {len(contacts)} contacts in segment '{segment}'"
+                f"Sending campaign to segment '{segment}'"
+                + (f" shard {shard}" if shard else "")
+                + (f" (at most {max_emails} contacts)" if max_emails else "")
             )
 
+            # Every recipient gets the same message: render the MIME payload once
+            prepared = prepare_email(subject=subject, body=body)
+            throttle = self._create_throttle(dry_run)
             sent_count = 0
             success_count = 0
             failed_count = 0
+            deferred_count = 0
+            suppressed_count = 0
 
-            # Send emails
-            for contact in contacts:
+            # Send emails, interleaved and paced per recipient domain
+            async for contact in throttle.schedule(contacts):
                 try:
-                    # Create email message
-                    msg = EmailMessage(
-                        subject=subject,
-                        body=body,
-                        to=contact.email,
-                        from_name=contact.name or "Marketing Bot",
-                    )
-
-                    # Send email
-                    send_email(msg)
+                    if not send_prepared_email(
+                        prepared, contact.email, self.db.suppression
+                    ):
+                        suppressed_count += 1
+                        throttle.record_skipped(contact)
+                        continue
+                    throttle.record_sent(contact)
                     sent_count += 1
                     success_count += 1
+                    # Counters move together here; flush them as the send runs
+                    if success_count % STATS_FLUSH_EVERY == 0:
+                        self.db.increment_campaign_stats(
+                            campaign_id, STATS_FLUSH_EVERY, STATS_FLUSH_EVERY
+                        )
 
                     # Track metrics
                     await self.metrics.track_campaign_execution(
@@ -104,11 +142,14 @@ class EmailCampaignService:
 
                     logger.info(f"Sent email to {contact.email}")
 
-                    # Small delay to avoid overwhelming the server
-                    if not dry_run:
-                        await asyncio.sleep(0.1)
-
                 except Exception as e:
+                    if is_deferral(e):
+                        deferred_count += 1
+                        if throttle.record_deferral(contact):
+                            continue
+                    else:
+                        throttle.record_failure(contact)
+
                     failed_count += 1
                     logger.error(f"Failed to send email to {contact.email}: {e}")
 
@@ -118,15 +159,25 @@ class EmailCampaignService:
                         customer_id=contact.customer_id or contact.email,
                         success=False,
                         error=str(e),
+                        error_class=type(e).__name__,
                     )
 
-            # Update campaign statistics
-            self._update_campaign_stats(campaign_id, sent_count, success_count)
+            batches.close()
+            self.last_domain_stats = throttle.stats()
+
+            # Add what has not been flushed yet to the campaign statistics
+            self.db.increment_campaign_stats(
+                campaign_id,
+                sent_count % STATS_FLUSH_EVERY,
+                success_count % STATS_FLUSH_EVERY,
+            )
 
             result = {
                 "sent": sent_count,
                 "success": success_count,
                 "failed": failed_count,
+                "deferred": deferred_count,
+                "suppressed": suppressed_count,
             }
 
             logger.info(f"Campaign completed: {result}")
@@ -136,33 +187,103 @@ class EmailCampaignService:
             logger.error(f"Failed to send campaign: {e}")
             return {"sent": 0, "success": 0, "failed": 0}
 
-    def _update_campaign_stats(
-        self, campaign_id: str, sent_count: int, success_count: int
-    ) -> None:
-        """Update campaign statistics in database."""
+    def schedule_campaign(
+        self,
+        campaign_id: str,
+        window: SendWindow,
+        max_emails: Optional[int] = None,
+        bucket_seconds: Optional[int] = None,
+        dispatcher: Optional[DispatchScheduler] = None,
+    ) -> int:
+        """Spread a campaign's sends over a recipient-local send window."""
+        campaign = self.db.get_campaign(campaign_id)
+        if campaign is None:
+            raise ValueError(f"Campaign {campaign_id} not found")
+
+        contacts = chain.from_iterable(self.db.iter_contacts(campaign["segment"]))
+        if max_emails:
+            contacts = islice(contacts, max_emails)
+
+        jobs = plan_send_window(
+            campaign_id,
+            ((c.email, c.timezone) for c in contacts),
+            window,
+            bucket_seconds=bucket_seconds or settings.SCHEDULER_BUCKET_SECONDS,
+        )
+        dispatcher = dispatcher or self.create_dispatcher()
+        scheduled = dispatcher.schedule(jobs)
+        logger.info(
+            f"Scheduled {scheduled} emails for campaign {campaign_id} "
+            f"in window {window.start:%H:%M}-{window.end:%H:%M}"
+        )
+        return scheduled
+
+    def create_dispatcher(self, clock: Optional[Clock] = None) -> DispatchScheduler:
+        """Dispatcher over this data dir's persisted schedules."""
+        dispatcher = DispatchScheduler(
+            ScheduleStore(self.db.data_dir),
+            rate_per_second=settings.SCHEDULER_RATE_PER_SEC,
+            clock=clock,
+        )
+        dispatcher.register("email", self._send_scheduled_email)
+        dispatcher.register("social", social_post_handler)
+        return dispatcher
+
+    async def _send_scheduled_email(self, job: ScheduledSend) -> None:
+        prepared = self._prepared.get(job.campaign_id)
+        if prepared is not None:
+            CACHE_HITS.labels(cache="prepared_email").inc()
+        else:
+            CACHE_MISSES.labels(cache="prepared_email").inc()
+            row = self.db.get_campaign(job.campaign_id)
+            if row is None:
+                raise ValueError(f"Campaign {job.campaign_id} not found")
+            prepared = prepare_email(subject=row["subject"], body=row["body"])
+            self._prepared[job.campaign_id] = prepared
+
         try:
-            campaigns_df = self.db.get_campaigns()
-            if not campaigns_df.empty:
-                mask = campaigns_df["campaign_id"] == campaign_id
-                campaigns_df.loc[mask, "sent_count"] = sent_count
-                campaigns_df.loc[mask, "success_count"] = success_count
-                campaigns_df.to_csv(self.db.campaigns_file, index=False)
+            sent = send_prepared_email(prepared, job.recipient, self.db.suppression)
         except Exception as e:
-            logger.error(f"Failed to update campaign stats: {e}")
+            await self.metrics.track_campaign_execution(
+                campaign_id=job.campaign_id,
+                customer_id=job.recipient,
+                success=False,
+                error=str(e),
+                error_class=type(e).__name__,
+            )
+            raise
+        if not sent:
+            return
+        await self.metrics.track_campaign_execution(
+            campaign_id=job.campaign_id, customer_id=job.recipient, success=True
+        )
+        self.db.increment_campaign_stats(job.campaign_id, sent=1, success=1)
+
+    def _create_throttle(self, dry_run: bool) -> DomainThrottle:
+        """Per-domain throttle for one send; dry runs are not paced."""
+        return DomainThrottle(
+            rate_per_second=None if dry_run else settings.EMAIL_DOMAIN_RATE_PER_SEC,
+            burst=settings.EMAIL_DOMAIN_BURST,
+            backoff_seconds=settings.EMAIL_DEFERRAL_BACKOFF_SEC,
+            max_deferrals=settings.EMAIL_MAX_DEFERRALS,
+        )
+
+    def get_domain_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-domain throughput and deferral counters of the last send."""
+        return self.last_domain_stats
 
     def get_campaign_stats(self) -> Dict[str, any]:
         """Get overall campaign statistics."""
         try:
-            campaigns_df = self.db.get_campaigns()
-            if campaigns_df.empty:
+            totals = self.db.campaigns.totals()
+            if not totals["campaigns"]:
                 return {"total_campaigns": 0, "total_sent": 0, "total_success": 0}
 
-            total_campaigns = len(campaigns_df)
-            total_sent = campaigns_df["sent_count"].sum()
-            total_success = campaigns_df["success_count"].sum()
+            total_sent = totals["sent"]
+            total_success = totals["success"]
 
             return {
-                "total_campaigns": total_campaigns,
+                "total_campaigns": totals["campaigns"],
                 "total_sent": total_sent,
                 "total_success": total_success,
                 "success_rate": (
@@ -12,8 +12,8 @@ from marketing_bot.segmentation.rfm import score_rfm
 from marketing_bot.generation.openai_client import generate_marketing_text
 from marketing_bot.generation.templates import EMAIL_TEMPLATE, SOCIAL_POST_TEMPLATE, render_prompt
 from marketing_bot.senders.email_sender import EmailMessage, send_email
-from marketing_bot.senders.social_sender import SocialPost, send_social_post
-from marketing_bot.database.email_database import EmailDatabase
+from marketing_bot.senders.social_sender import SocialPost, publish_social_posts
+from marketing_bot.database.factory import create_email_database
 from marketing_bot.services.email_campaign_service import EmailCampaignService
 
 # Page config
@@ -77,7 +77,7 @@ st.markdown("""
 # Initialize services
 @st.cache_resource
 def get_services():
-    return EmailDatabase(), EmailCampaignService()
+    return create_email_database(), EmailCampaignService()
 
 db, campaign_service = get_services()
 
@@ -485,18 +485,18 @@ with tab4:
             
             if st.button("📢 Post to Social Media", type="primary"):
                 if platforms and content:
-                    for platform in platforms:
-                        post = SocialPost(platform=platform, content=content)
-                        
-                        with st.spinner(f"Posting to {platform}..."):
-                            f = io.StringIO()
-                            with redirect_stdout(f):
-                                send_social_post(post)
-                            log_output = f.getvalue()
-                        
-                        st.success(f"✅ Posted to {platform}!")
-                        with st.expander(f"📋 {platform.title()} Log"):
-                            st.code(log_output, language="text")
+                    posts = [SocialPost(platform=platform, content=content) for platform in platforms]
+                    
+                    with st.spinner(f"Posting to {', '.join(platforms)}..."):
+                        results = asyncio.run(publish_social_posts(posts))
+                    
+                    for result in results:
+                        if result.success:
+                            st.success(f"✅ Posted to {result.platform}!")
+                        else:
+                            st.error(f"❌ {result.platform}: {result.error}")
+                        with st.expander(f"📋 {result.platform.title()} Log"):
+                            st.json(vars(result))
                 else:
                     st.error("Please select platforms and enter content.")
 
@@ -1,10 +1,11 @@
+import asyncio
 from unittest.mock import AsyncMock
 from uuid import uuid4
 
 import pytest
 
 from marketing_bot.metrics.tracker import MetricsTracker
-from marketing_bot.models.campaign import Campaign, CampaignType
+from marketing_bot.models.campaign import Campaign, CampaignStatus, CampaignType
 from marketing_bot.repositories.campaign_repository import CampaignRepository
 from marketing_bot.services.campaign_service import CampaignService
 
@@ -68,6 +69,118 @@ async def test_list_campaigns(campaign_service, mock_repo, sample_campaign):
     mock_repo.list.assert_called_once_with(status=None)
 
 
+@pytest.mark.asyncio
+async def test_execute_campaign_isolates_failures(
+    campaign_service, mock_repo, mock_metrics, sample_campaign, monkeypatch
+):
+    from marketing_bot.services import campaign_service as module
+
+    sample_campaign.status = CampaignStatus.ACTIVE
+    mock_repo.get_by_id.return_value = sample_campaign
+    sent = []
+
+    def send(msg):
+        if msg.to == "c3@example.com":
+            raise RuntimeError("mailbox full")
+        sent.append(msg.to)
+
+    monkeypatch.setattr(
+        module, "generate_marketing_text", lambda p, tone: "Subject: Hi"
+    )
+    monkeypatch.setattr(module, "send_email", send)
+    campaign_service.generation_workers = 3
+    campaign_service.send_workers = 2
+    campaign_service.queue_size = 2
+    customers = [
+        {
+            "customer_id": f"C{i}",
+            "email": f"c{i}@example.com",
+            "recency_days": i,
+            "frequency": i + 1,
+            "monetary_value": 10 * i,
+        }
+        for i in range(10)
+    ]
+
+    results = await campaign_service.execute_campaign(sample_campaign.id, customers)
+
+    assert sorted(results.customer_ids) == sorted(f"C{i}" for i in range(10) if i != 3)
+    assert len(sent) == 9
+    failures = [
+        call.kwargs
+        for call in mock_metrics.track_campaign_execution.call_args_list
+        if not call.kwargs["success"]
+    ]
+    assert [(f["customer_id"], f["error_class"]) for f in failures] == [
+        ("C3", "RuntimeError")
+    ]
+    assert mock_metrics.track_campaign_execution.call_count == 10
+    mock_repo.save_result_batch.assert_called_once_with(results)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [0, 2])
+async def test_execute_campaign_survives_tracker_errors(
+    campaign_service, mock_repo, mock_metrics, sample_campaign, monkeypatch, workers
+):
+    from marketing_bot.services import campaign_service as module
+
+    sample_campaign.status = CampaignStatus.ACTIVE
+    mock_repo.get_by_id.return_value = sample_campaign
+    mock_metrics.track_campaign_execution.side_effect = RuntimeError("disk full")
+    monkeypatch.setattr(module, "generate_marketing_text", lambda p, tone: "Body")
+    monkeypatch.setattr(module, "send_email", lambda msg: None)
+    campaign_service.generation_workers = campaign_service.send_workers = workers
+    campaign_service.queue_size = 1
+    customers = [
+        {"customer_id": f"C{i}", "recency_days": i, "frequency": 1, "monetary_value": 1}
+        for i in range(20)
+    ]
+
+    results = await asyncio.wait_for(
+        campaign_service.execute_campaign(sample_campaign.id, customers), 5
+    )
+
+    assert len(results) == 20
+
+
+@pytest.mark.asyncio
+async def test_execute_campaign_records_failed_social_posts(
+    campaign_service, mock_repo, mock_metrics, monkeypatch
+):
+    from marketing_bot.senders.social_publisher import PublishResult
+    from marketing_bot.services import campaign_service as module
+
+    campaign = Campaign(
+        name="Social",
+        campaign_type=CampaignType.SOCIAL,
+        segment_name="champions",
+        product_name="Test Product",
+        goal="Test Goal",
+        offer="Test Offer",
+        status=CampaignStatus.ACTIVE,
+    )
+    mock_repo.get_by_id.return_value = campaign
+
+    async def publish(posts):
+        return [
+            PublishResult(p.platform, None, success=False, error="401 Unauthorized")
+            for p in posts
+        ]
+
+    monkeypatch.setattr(module, "generate_marketing_text", lambda p, tone: "Post")
+    monkeypatch.setattr(module, "publish_social_posts", publish)
+
+    results = await campaign_service.execute_campaign(
+        campaign.id,
+        [{"customer_id": "C1", "recency_days": 1, "frequency": 1, "monetary_value": 1}],
+    )
+
+    assert len(results) == 0
+    call = mock_metrics.track_campaign_execution.call_args
+    assert (call.kwargs["success"], call.kwargs["error"]) == (False, "401 Unauthorized")
+
+
 def test_split_email():
     service = CampaignService(None, None)
 
@@ -0,0 +1,486 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from marketing_bot.database.campaign_store import EmailCampaignStore
+from marketing_bot.database.contact_snapshot import ContactSnapshot, write_snapshot
+from marketing_bot.database.email_database import CONTACT_COLUMNS, EmailDatabase
+from marketing_bot.database.email_validation import EmailValidator
+from marketing_bot.database.factory import (
+    create_email_database,
+    migrate_contacts_to_sqlite,
+)
+from marketing_bot.database.sharding import Shard, jump_hash, jump_hash_array, shard_of
+from marketing_bot.database.sqlite_contact_store import SqliteEmailDatabase
+from marketing_bot.database.suppression import SuppressionList
+
+
+def _write_contacts(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+def test_sqlite_contacts_upsert_count_and_stream(tmp_path):
+    source = _write_contacts(
+        tmp_path / "import.csv",
+        [
+            {"email": "a@example.com", "name": "A", "segment": "vip", "frequency": 3},
+            {"email": "b@example.com", "name": "B", "segment": "new"},
+            {"email": "c@example.com", "name": "C"},
+            {"email": "a@example.com", "name": "A2", "segment": "vip"},
+        ],
+    )
+    sqlite_db = SqliteEmailDatabase(tmp_path / "sqlite")
+
+    assert sqlite_db.add_contacts_from_csv(source) == 3
+    assert sqlite_db.get_contact_count_by_segment() == {
+        "vip": 1,
+        "new": 1,
+        "unknown": 1,
+    }
+
+    vip = sqlite_db.get_contacts_by_segment("vip")
+    assert [(c.email, c.name, c.frequency) for c in vip] == [
+        ("a@example.com", "A2", None)
+    ]
+    assert sqlite_db.add_contacts_from_csv(source, segment="all") == 0
+    batches = list(sqlite_db.iter_contacts("all", batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 1]
+    # The last row for a repeated email wins and takes its position
+    assert [c.email for batch in batches for c in batch] == [
+        "b@example.com",
+        "c@example.com",
+        "a@example.com",
+    ]
+
+
+def test_migrate_contacts_from_csv(tmp_path):
+    csv_db = create_email_database(tmp_path, backend="csv")
+    _write_contacts(
+        csv_db.contacts_file,
+        [
+            {"email": f"u{i}@example.com", "segment": "s", "customer_id": i}
+            for i in range(5)
+        ],
+    )
+
+    assert migrate_contacts_to_sqlite(tmp_path).added == 5
+    assert migrate_contacts_to_sqlite(tmp_path).unchanged == 5
+
+    db = create_email_database(tmp_path, backend="sqlite")
+    contacts = db.get_contacts_by_segment("s")
+    assert len(contacts) == 5
+    assert contacts[0].customer_id == "0"
+
+
+def test_csv_loader_types_and_segment_filter(tmp_path):
+    db = EmailDatabase(tmp_path)
+    db.contacts_file.write_text(
+        "email,segment,customer_id,recency_days,frequency,extra\n"
+        "a@example.com,vip,007,3.0,,x\n"
+        "b@example.com,,8,,2,y\n"
+        "c@example.com,vip,9,10,1,z\n"
+    )
+
+    vip = db.get_contacts_by_segment("vip")
+    assert [c.email for c in vip] == ["a@example.com", "c@example.com"]
+    first = vip[0]
+    assert (first.customer_id, first.recency_days, first.frequency) == ("007", 3, None)
+    assert first.name is None and first.monetary_value is None
+    assert db.get_contact_count_by_segment() == {"vip": 2, "unknown": 1}
+    assert len(db.load_contacts()) == 3
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+@pytest.mark.asyncio
+async def test_iter_contacts_batches_and_resumes(tmp_path, backend):
+    source = _write_contacts(
+        tmp_path / "import.csv",
+        [
+            {"email": f"u{i}@example.com", "segment": "even" if i % 2 else "odd"}
+            for i in range(10)
+        ],
+    )
+    db = create_email_database(tmp_path / backend, backend=backend)
+    db.add_contacts_from_csv(source)
+
+    batches = list(db.iter_contacts("odd", batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[0][0].email == "u0@example.com"
+
+    resumed = [
+        c.email
+        for b in db.iter_contacts(batch_size=4, start_after="u6@example.com")
+        for c in b
+    ]
+    assert resumed == ["u7@example.com", "u8@example.com", "u9@example.com"]
+    assert list(db.iter_contacts(start_after="missing@example.com")) == []
+
+    streamed = [c async for b in db.aiter_contacts("even", batch_size=3) for c in b]
+    assert [c.email for c in streamed] == [f"u{i}@example.com" for i in (1, 3, 5, 7, 9)]
+
+
+@pytest.mark.asyncio
+async def test_send_campaign_stops_after_max_emails(tmp_path, monkeypatch):
+    from marketing_bot.services import email_campaign_service as module
+
+    service = module.EmailCampaignService(tmp_path)
+    _write_contacts(
+        service.db.contacts_file,
+        [{"email": f"u{i}@example.com", "segment": "vip"} for i in range(50)],
+    )
+    sent = []
+    monkeypatch.setattr(
+        module,
+        "send_prepared_email",
+        lambda prepared, email, suppression: sent.append(email) or True,
+    )
+    campaign_id = await service.create_campaign("Spring", "Hi", "Body", "vip")
+
+    result = await service.send_campaign(campaign_id, max_emails=5)
+
+    assert result["sent"] == 5
+    assert sorted(sent) == sorted(f"u{i}@example.com" for i in range(5))
+    assert service.db.get_campaign(campaign_id)["sent_count"] == 5
+    await service.send_campaign(campaign_id, max_emails=3)
+    assert service.get_campaign_stats()["total_success"] == 8
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+def test_import_reports_added_updated_duplicates(tmp_path, backend, monkeypatch):
+    monkeypatch.setattr("marketing_bot.database.email_database.READ_CHUNK_ROWS", 2)
+    db = create_email_database(tmp_path / backend, backend=backend)
+    first = _write_contacts(
+        tmp_path / "first.csv",
+        [{"email": "a@example.com", "name": "A"}, {"email": "b@example.com"}],
+    )
+    second = _write_contacts(
+        tmp_path / "second.csv",
+        [
+            {"email": " A@Example.com ", "name": "A2"},
+            {"email": "c@example.com", "name": "C"},
+            {"email": None, "name": "nobody"},
+            {"email": "c@example.com", "name": "C2"},
+            {"email": "a@example.com", "name": "A3"},
+            {"email": "d@example.com", "name": "D"},
+        ],
+    )
+
+    assert db.import_contacts(first).added == 2
+    report = db.import_contacts(second, segment="vip")
+
+    assert (report.rows, report.added, report.updated) == (6, 2, 1)
+    assert (report.duplicates, report.skipped) == (2, 1)
+    contacts = {c.email: c for c in db.load_contacts()}
+    assert sorted(contacts) == [f"{x}@example.com" for x in "abcd"]
+    assert contacts["a@example.com"].name == "A3"
+    assert contacts["c@example.com"].name == "C2"
+    assert contacts["b@example.com"].segment is None
+    assert db.get_contact_count_by_segment() == {"vip": 3, "unknown": 1}
+
+
+def test_csv_import_appends_changes_and_compacts(tmp_path, monkeypatch):
+    monkeypatch.setattr("marketing_bot.database.email_database.READ_CHUNK_ROWS", 2)
+    db = EmailDatabase(tmp_path / "db")
+    rows = [{"email": f"u{i}@example.com", "name": f"U{i}"} for i in range(4)]
+    source = _write_contacts(tmp_path / "contacts.csv", rows)
+    db.import_contacts(source)
+    size = db.contacts_file.stat().st_size
+
+    report = db.import_contacts(source)
+    assert (report.added, report.updated, report.unchanged) == (0, 0, 4)
+    assert db.contacts_file.stat().st_size == size
+
+    rows[1]["name"] = "changed"
+    report = db.import_contacts(_write_contacts(tmp_path / "contacts.csv", rows))
+    assert (report.updated, report.unchanged) == (1, 3)
+    assert db.contacts_file.stat().st_size > size
+    contacts = db.load_contacts()
+    assert [c.email for c in contacts] == [r["email"] for r in rows]
+    assert contacts[1].name == "changed"
+    assert len(pd.read_csv(db.contacts_file)) == 5
+
+    for i in range(4):
+        rows[i]["name"] = f"again{i}"
+    db.import_contacts(_write_contacts(tmp_path / "contacts.csv", rows))
+    assert len(pd.read_csv(db.contacts_file)) == 4
+    assert [c.name for c in db.load_contacts()] == [r["name"] for r in rows]
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+def test_import_quarantines_invalid_addresses(tmp_path, backend):
+    db = create_email_database(tmp_path / backend, backend=backend)
+    source = _write_contacts(
+        tmp_path / "in.csv",
+        [
+            {"email": "  Ann@Example.COM", "name": "Ann"},
+            {"email": "not-an-email", "name": "Bad"},
+            {"email": "two@@example.com", "name": "Bad2"},
+            {"email": "bob@dead.example", "name": "Bob"},
+            {"email": "cy@unknown.org", "name": "Cy"},
+            {"email": "ivan@example.xn--p1ai", "name": "Ivan"},
+            {"email": "dash@example.xn--p1ai-", "name": "Dash"},
+            {"email": "", "name": "Empty"},
+        ],
+    )
+    validator = EmailValidator({"example.com": True, "dead.example": False})
+
+    report = db.import_contacts(source, validator=validator)
+
+    assert (report.added, report.rejected, report.skipped) == (3, 4, 1)
+    assert [c.email for c in db.load_contacts()] == [
+        "ann@example.com",
+        "cy@unknown.org",
+        "ivan@example.xn--p1ai",
+    ]
+    quarantined = pd.read_csv(db.quarantine_file)
+    assert dict(zip(quarantined["name"], quarantined["reason"])) == {
+        "Bad": "invalid_syntax",
+        "Bad2": "invalid_syntax",
+        "Bob": "no_mx",
+        "Dash": "invalid_syntax",
+        "Empty": "missing_email",
+    }
+    assert quarantined["email"].iloc[0] == "not-an-email"
+
+
+def test_suppression_list_tail_index_and_other_processes(tmp_path):
+    suppression = SuppressionList(tmp_path / "suppression", compact_after=3)
+    other = SuppressionList(tmp_path / "suppression")
+
+    suppression.add(["Gone@Example.com "], reason="bounce")
+    assert suppression.is_suppressed("gone@example.com")
+    assert not suppression.is_suppressed("kept@example.com")
+
+    assert suppression.bulk_load([f"bulk{i}@example.com" for i in range(1000)]) == 1000
+    suppression.add(["a@example.com", "b@example.com"])  # tail reaches 3: compacts
+    assert not suppression.tail_file.exists()
+    assert len(suppression) == 1003
+
+    other.refresh()
+    mask = other.contains(["bulk7@example.com", "a@example.com", "new@example.com"])
+    assert mask.tolist() == [True, True, False]
+    assert other.is_suppressed("gone@example.com")
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+def test_iter_contacts_skips_suppressed(tmp_path, backend):
+    db = create_email_database(tmp_path / backend, backend=backend)
+    db.add_contacts_from_csv(
+        _write_contacts(
+            tmp_path / "in.csv",
+            [{"email": f"u{i}@example.com", "segment": "vip"} for i in range(6)],
+        )
+    )
+    db.suppression.add(["u1@example.com", "u4@example.com"], reason="complaint")
+
+    emails = [c.email for b in db.iter_contacts("vip", batch_size=2) for c in b]
+    assert emails == [
+        "u0@example.com",
+        "u2@example.com",
+        "u3@example.com",
+        "u5@example.com",
+    ]
+    assert len(db.get_contacts_by_segment("vip")) == 6
+
+
+def test_suppression_recorded_mid_stream_is_honoured(tmp_path):
+    from marketing_bot.senders.email_sender import prepare_email, send_prepared_email
+
+    db = EmailDatabase(tmp_path)
+    db.add_contacts_from_csv(
+        _write_contacts(
+            tmp_path / "in.csv",
+            [{"email": f"u{i}@example.com", "segment": "vip"} for i in range(6)],
+        )
+    )
+    other_process = SuppressionList(tmp_path / "suppression")
+    batches = db.iter_contacts("vip", batch_size=2)
+
+    assert [c.email for c in next(batches)] == ["u0@example.com", "u1@example.com"]
+    other_process.add(["u3@example.com", "u5@example.com"], reason="unsubscribe")
+    rest = [c.email for batch in batches for c in batch]
+    assert rest == ["u2@example.com", "u4@example.com"]
+
+    prepared = prepare_email("Hi", "Body")
+    assert send_prepared_email(prepared, "u4@example.com", db.suppression)
+    other_process.add(["u4@example.com"], reason="bounce")
+    assert not send_prepared_email(prepared, "u4@example.com", db.suppression)
+
+
+@pytest.mark.asyncio
+async def test_send_campaign_reports_suppressed_recipients_to_throttle(
+    tmp_path, monkeypatch
+):
+    from marketing_bot.services import email_campaign_service as module
+
+    service = module.EmailCampaignService(tmp_path)
+    _write_contacts(
+        service.db.contacts_file,
+        [{"email": f"u{i}@example.com", "segment": "vip"} for i in range(6)],
+    )
+    throttles = []
+    create_throttle = service._create_throttle
+    monkeypatch.setattr(
+        service,
+        "_create_throttle",
+        lambda dry_run: throttles.append(create_throttle(dry_run)) or throttles[-1],
+    )
+
+    def send(prepared, email, suppression):
+        if email == "u0@example.com":
+            SuppressionList(tmp_path / "suppression").add(
+                ["u2@example.com", "u4@example.com"]
+            )
+        suppression.refresh()
+        return not suppression.is_suppressed(email)
+
+    monkeypatch.setattr(module, "send_prepared_email", send)
+    campaign_id = await service.create_campaign("Spring", "Hi", "Body", "vip")
+
+    result = await service.send_campaign(campaign_id)
+
+    assert (result["sent"], result["suppressed"]) == (4, 2)
+    assert throttles[0]._in_flight == {}
+    assert throttles[0].stats()["example.com"]["failed"] == 0
+
+
+def test_campaign_counters_are_atomic_and_legacy_csv_migrates(tmp_path):
+    pd.DataFrame(
+        [
+            {
+                "campaign_id": "old",
+                "name": "Old",
+                "subject": "S",
+                "body": "B",
+                "segment": "vip",
+                "created_at": "2024-01-01T00:00:00",
+                "sent_count": 7,
+                "success_count": 6,
+            }
+        ]
+    ).to_csv(tmp_path / "campaigns.csv", index=False)
+    db = EmailDatabase(tmp_path)
+    assert (tmp_path / "campaigns.csv.migrated").exists()
+    assert db.get_campaign("old")["sent_count"] == 7
+
+    db.save_campaign("new", "New", "S", "B", "vip")
+    other = EmailDatabase(tmp_path)
+
+    def send(database):
+        for _ in range(200):
+            database.increment_campaign_stats("new", sent=1, success=1)
+
+    threads = [threading.Thread(target=send, args=(d,)) for d in (db, other) * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    campaigns = db.get_campaigns().set_index("campaign_id")
+    assert campaigns.loc["new", "sent_count"] == 800
+    assert list(campaigns.index) == ["old", "new"]
+
+
+def test_legacy_campaign_import_survives_failures(tmp_path):
+    legacy = tmp_path / "campaigns.csv"
+    claimed = tmp_path / "campaigns.csv.migrating"
+    pd.DataFrame([{"campaign_id": "old", "name": "Old"}]).to_csv(legacy, index=False)
+    store = EmailCampaignStore(tmp_path / "email.db")
+    store._conn.execute(
+        "CREATE TRIGGER fail BEFORE INSERT ON email_campaigns "
+        "BEGIN SELECT RAISE(ABORT, 'disk full'); END"
+    )
+
+    with pytest.raises(sqlite3.IntegrityError):
+        store.import_legacy(legacy)
+    assert legacy.exists() and not claimed.exists()
+
+    # A claim orphaned by a crash is resumed on the next start
+    store._conn.execute("DROP TRIGGER fail")
+    legacy.rename(claimed)
+    assert store.import_legacy(legacy) == 1
+    assert store.get("old")["name"] == "Old"
+    assert (tmp_path / "campaigns.csv.migrated").exists() and not claimed.exists()
+
+
+def test_jump_hash_shards_cover_contacts_once(tmp_path):
+    keys = np.arange(1, 5001, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    assert jump_hash_array(keys, 7).tolist() == [jump_hash(int(k), 7) for k in keys]
+    moved = (jump_hash_array(keys, 10) != jump_hash_array(keys, 11)).mean()
+    assert moved < 0.15  # only ~1/11 of keys move to the new shard
+
+    db = EmailDatabase(tmp_path)
+    db.add_contacts_from_csv(
+        _write_contacts(
+            tmp_path / "in.csv",
+            [{"email": f"u{i}@example.com", "segment": "vip"} for i in range(300)],
+        )
+    )
+    owned = [
+        [c.email for b in db.iter_contacts("vip", shard=Shard(k, 3)) for c in b]
+        for k in range(3)
+    ]
+    assert sorted(sum(owned, [])) == sorted(f"u{i}@example.com" for i in range(300))
+    assert all(shard_of(email, 3) == 1 for email in owned[1])
+    assert Shard.parse("2/3") == Shard(2, 3)
+    with pytest.raises(ValueError):
+        Shard.parse("3/3")
+
+
+def test_write_snapshot_streams_columns_across_chunks(tmp_path):
+    def chunk(rows):
+        return pd.DataFrame(rows).reindex(columns=list(CONTACT_COLUMNS))
+
+    first = chunk([{"email": "a@x.com", "name": "Ä"}, {"email": "b@x.com"}])
+    chunks = [
+        first,
+        first.iloc[:0],
+        chunk([{"email": "a@x.com", "name": "A2", "frequency": 3.0}]),
+    ]
+    assert write_snapshot(tmp_path / "v", chunks, source=None) == 3
+
+    snapshot = ContactSnapshot(tmp_path / "v")
+    assert (len(snapshot), snapshot.superseded_rows) == (2, 1)
+    assert np.load(tmp_path / "v" / "name.offsets.npy").tolist() == [0, 2, 2, 4]
+    contacts = snapshot.take(np.arange(2))
+    assert contacts["name"][0] == "A2" and pd.isna(contacts["name"][1])
+    assert contacts["frequency"].tolist()[0] == 3.0
+
+
+def test_contact_snapshot_is_shared_and_rebuilt_on_writes(tmp_path):
+    db = EmailDatabase(tmp_path)
+    db.add_contacts_from_csv(
+        _write_contacts(
+            tmp_path / "in.csv",
+            [
+                {"email": f"u{i}@example.com", "segment": "vip" if i % 3 else None}
+                for i in range(9)
+            ],
+        )
+    )
+    snapshot = db.snapshot()
+    assert isinstance(snapshot.segment_codes, np.memmap)
+    assert snapshot.count_by_segment() == {"vip": 6, "unknown": 3}
+
+    other = EmailDatabase(tmp_path)
+    assert other.snapshot().directory == snapshot.directory
+
+    other.add_contacts_from_csv(
+        _write_contacts(
+            tmp_path / "more.csv", [{"email": "u0@example.com", "name": "Zero"}]
+        ),
+        segment="new",
+    )
+    assert db.get_contact_count_by_segment() == {"vip": 6, "unknown": 2, "new": 1}
+    assert [c.name for c in db.get_contacts_by_segment("new")] == ["Zero"]
+    versions = [p.name for p in (tmp_path / "contacts_snapshot").glob("v-*")]
+    assert versions == [db.snapshot().directory.name]
+
+    db.contacts_file.write_text("email,segment\nz@example.com,late\n")
+    assert db.get_contact_count_by_segment() == {"late": 1}
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from marketing_bot.metrics.event_log import EventLog
+from marketing_bot.metrics.histogram import LatencyRecorder, LogLinearHistogram
+from marketing_bot.metrics.rollups import MetricRollups
+from marketing_bot.metrics.tracker import MetricsTracker
+from marketing_bot.metrics.writer import BackgroundMetricsWriter
+
+
+def test_event_log_rotates_and_reads_in_order(tmp_path):
+    log = EventLog(tmp_path, max_segment_bytes=40, flush_every=3)
+    for i in range(20):
+        log.append({"n": i})
+    log.close()
+
+    assert len(log.segments()) > 1
+    assert [e["n"] for e in log.iter_events()] == list(range(20))
+
+
+def test_event_log_reads_from_position(tmp_path):
+    log = EventLog(tmp_path)
+    log.append_many([{"n": 0}, {"n": 1}])
+    mark = log.position()
+    log.append_many([{"n": 2}])
+
+    assert [e["n"] for e in log.iter_events(start=mark)] == [2]
+
+
+@pytest.mark.asyncio
+async def test_tracker_migrates_legacy_json_once(tmp_path):
+    campaign_id = uuid4()
+    legacy = [
+        {"campaign_id": str(campaign_id), "customer_id": "C1", "success": True},
+        {"campaign_id": str(campaign_id), "customer_id": "C2", "success": False},
+    ]
+    (tmp_path / "metrics.json").write_text(json.dumps(legacy))
+
+    tracker = MetricsTracker(tmp_path)
+    await tracker.track_campaign_execution(campaign_id, "C3", success=True)
+    MetricsTracker(tmp_path)  # a second tracker must not re-import
+
+    summary = await tracker.get_campaign_metrics(campaign_id)
+    assert summary["total_executions"] == 3
+    assert summary["successful_executions"] == 2
+    assert not (tmp_path / "metrics.json").exists()
+    assert (tmp_path / "metrics.json.migrated").exists()
+
+
+def test_event_log_resumes_interrupted_legacy_migration(tmp_path):
+    log = EventLog(tmp_path / "log")
+    log.append({"n": "live"})
+    log.flush()
+    claimed = tmp_path / "metrics.json.migrating"
+    claimed.write_text(json.dumps([{"n": 0}, {"n": 1}]))  # crashed after claiming
+
+    assert log.migrate_json_array(tmp_path / "metrics.json") == 2
+    assert [e["n"] for e in log.iter_events()] == [0, 1, "live"]
+
+    # Crashed after the segment was linked in: finishing adds nothing twice
+    (tmp_path / "metrics.json.migrated").rename(claimed)
+    assert log.migrate_json_array(tmp_path / "metrics.json") == 0
+    assert [e["n"] for e in log.iter_events()] == [0, 1, "live"]
+    assert not claimed.exists() and not list((tmp_path / "log").glob("*.tmp"))
+
+
+def test_aggregates_snapshot_and_replay_tail(tmp_path):
+    from marketing_bot.metrics.aggregates import CampaignAggregates
+
+    log = EventLog(tmp_path / "log")
+    log.append_many(
+        [
+            {"campaign_id": "c1", "success": True},
+            {"campaign_id": "c1", "success": False, "error_class": "SMTPDataError"},
+            {"campaign_id": "c1", "generation_time_ms": 120, "success": True},
+        ]
+    )
+    view = CampaignAggregates(log, tmp_path / "snapshot.json")
+    view.refresh()
+    view.save()
+
+    log.append_many([{"campaign_id": "c1", "success": True}])
+    restored = CampaignAggregates(log, tmp_path / "snapshot.json")
+    summary = restored.get("c1").summary()
+
+    assert summary["total_executions"] == 3
+    assert summary["successful_executions"] == 2
+    assert summary["failures_by_error"] == {"SMTPDataError": 1}
+    assert summary["content_generation"]["avg_time_ms"] == 120
+
+
+@pytest.mark.asyncio
+async def test_campaign_metrics_only_scan_events_on_request(tmp_path):
+    campaign_id = uuid4()
+    tracker = MetricsTracker(tmp_path)
+    await tracker.track_campaign_execution(campaign_id, "C1", success=True)
+
+    summary = await tracker.get_campaign_metrics(campaign_id)
+    detailed = await tracker.get_campaign_metrics(campaign_id, include_events=True)
+
+    assert "metrics" not in summary
+    assert [m["customer_id"] for m in detailed["metrics"]] == ["C1"]
+
+
+def test_instruments_merge_thread_shards_in_openmetrics_output():
+    import threading
+
+    from marketing_bot.metrics.instruments import Counter, Histogram, Registry
+
+    registry = Registry()
+    sent = Counter("emails_sent", "Emails sent", ["provider"], registry=registry)
+    latency = Histogram(
+        "latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry
+    )
+
+    def work():
+        for _ in range(1000):
+            sent.labels(provider="smtp").inc()
+        latency.observe(0.05)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latency.observe(5.0)
+
+    text = registry.render()
+    assert 'emails_sent_total{provider="smtp"} 4000' in text
+    assert 'latency_seconds_bucket{le="0.1"} 4' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 5' in text
+    assert "latency_seconds_count 5" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_metrics_endpoint_serves_openmetrics():
+    from fastapi.testclient import TestClient
+
+    from marketing_bot.api import app
+
+    client = TestClient(app)
+    client.get("/healthz")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/openmetrics-text")
+    assert 'route="/healthz"' in response.text
+
+
+def test_histogram_percentiles_within_relative_error_and_mergeable():
+    first, second = LogLinearHistogram(), LogLinearHistogram()
+    for value in range(1, 5001):
+        first.record(value)
+    for value in range(5001, 10001):
+        second.record(value)
+    first.merge(LogLinearHistogram.from_dict(json.loads(json.dumps(second.to_dict()))))
+
+    assert first.count == 10000
+    assert first.max == 10000
+    for percentile, exact in ((50, 5000), (90, 9000), (99, 9900)):
+        assert abs(first.value_at_percentile(percentile) - exact) / exact < 0.01
+    assert len(first.counts) < 1000
+
+
+def test_latency_recorder_merges_windows_across_instances(tmp_path):
+    path = tmp_path / "latency.json"
+    a, b = LatencyRecorder(path), LatencyRecorder(path)
+    hour = time.time() // 3600 * 3600
+    for ms in range(1, 101):
+        a.record("generation:gpt", ms, at=hour - 3600)
+        b.record("generation:gpt", ms + 100, at=hour)
+    a.save()
+    b.save()
+
+    everything = LatencyRecorder(path).percentiles("generation:gpt")
+    assert everything["count"] == 200
+    assert everything["max_ms"] == 200
+    assert 99 <= everything["p50_ms"] <= 101
+    second_hour = a.percentiles("generation:gpt", since=hour)
+    assert second_hour["count"] == 100
+    assert second_hour["p99_ms"] >= 198
+
+
+def test_latency_recorder_saves_off_the_recording_thread(tmp_path, monkeypatch):
+    from marketing_bot.metrics import histogram
+    from marketing_bot.metrics.tracker import MetricsTracker
+
+    monkeypatch.setattr(histogram, "_default_data_dir", histogram._default_data_dir)
+    histogram.set_latency_data_dir(tmp_path)
+    MetricsTracker(tmp_path / "other")  # trackers leave the default alone
+    assert histogram.get_latency_recorder().path.parent == tmp_path.resolve()
+
+    recorder = LatencyRecorder(tmp_path / "latency.json", save_interval=0.05)
+    recorder.record("send:smtp", 12.0)
+    assert not recorder.path.exists()  # recording never writes the file
+    deadline = time.time() + 5
+    while not recorder.path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    recorder.close()
+    assert LatencyRecorder(recorder.path).percentiles("send:smtp")["count"] == 1
+
+
+def test_background_writer_batches_and_flushes_on_close(tmp_path):
+    log = EventLog(tmp_path)
+    writer = BackgroundMetricsWriter(log, batch_size=10, flush_interval=60)
+    for i in range(25):
+        writer.submit({"n": i})
+    writer.close()
+
+    assert [e["n"] for e in log.iter_events()] == list(range(25))
+    writer.submit({"n": 25})  # after shutdown events are written through
+    assert len(list(log.iter_events())) == 26
+
+
+@pytest.mark.parametrize(
+    "policy, kept", [("drop_newest", [0, 1, 2]), ("drop_oldest", [2, 3, 4])]
+)
+def test_background_writer_drop_policies(tmp_path, policy, kept):
+    log = EventLog(tmp_path)
+    writer = BackgroundMetricsWriter(
+        log, max_queue=3, batch_size=100, flush_interval=60, policy=policy
+    )
+    results = [writer.submit({"n": i}) for i in range(5)]
+    writer.close()
+
+    assert writer.dropped == 2
+    assert results.count(False) == (2 if policy == "drop_newest" else 0)
+    assert [e["n"] for e in log.iter_events()] == kept
+
+
+@pytest.mark.asyncio
+async def test_background_writer_asubmit_does_not_block_the_loop(tmp_path):
+    assert BackgroundMetricsWriter(EventLog(tmp_path / "d")).policy == "drop_oldest"
+    log = EventLog(tmp_path)
+    slow_append = log.append_many
+    log.append_many = lambda events: time.sleep(0.2) or slow_append(events)
+    writer = BackgroundMetricsWriter(
+        log, max_queue=1, batch_size=100, flush_interval=60, policy="block"
+    )
+    writer.submit({"n": 0})
+    ticks = []
+
+    async def tick():
+        for _ in range(10):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    added, _ = await asyncio.gather(writer.asubmit({"n": 1}), tick())
+    writer.close()
+
+    assert added and ticks[-1] - ticks[0] < 0.15
+    assert [e["n"] for e in log.iter_events()] == [0, 1]
+
+
+def test_rollups_bucket_outcomes_and_pick_resolution(tmp_path):
+    log = EventLog(tmp_path / "log")
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    log.append_many(
+        [
+            {"timestamp": now.isoformat(), "campaign_id": "c", "success": True},
+            {"timestamp": now.isoformat(), "campaign_id": "c", "success": False},
+            {
+                "timestamp": (now - timedelta(days=20)).isoformat(),
+                "campaign_id": "c",
+                "success": True,
+            },
+        ]
+    )
+    rollups = MetricRollups(log, tmp_path / "rollups.json")
+    end = time.time() + 60
+
+    recent = rollups.query("c", end - 3600, end)
+    assert recent["resolution"] == "minute"
+    assert recent["points"][-1]["success"] == 1
+    assert recent["points"][-1]["failure"] == 1
+
+    history = rollups.query("c", end - 30 * 86400, end)
+    assert history["resolution"] == "day"
+    assert sum(p.get("success", 0) for p in history["points"]) == 2
+
+    assert rollups.compact() == 1  # minute bucket of the 20-day-old event
+    rollups.save()
+    restored = MetricRollups(log, tmp_path / "rollups.json")
+    assert restored.query("c", end - 30 * 86400, end) == history
+
+
+@pytest.mark.asyncio
+async def test_retention_deletes_only_rolled_up_segments(tmp_path):
+    tracker = MetricsTracker(tmp_path)
+    tracker.log.max_segment_bytes = 100
+    campaign_id = uuid4()
+    for i in range(10):
+        await tracker.track_campaign_execution(campaign_id, f"c{i}", True)
+        tracker.writer.flush()
+    segments = tracker.log.segments()
+    assert len(segments) > 2
+    for _, path in segments:
+        os.utime(path, (0, 0))
+
+    result = tracker.apply_retention(raw_retention_days=1)
+
+    # The active segment and the one the views' position points into stay
+    assert result["segments_removed"] == len(segments) - 2
+    metrics = await tracker.get_campaign_metrics(campaign_id)
+    assert metrics["total_executions"] == 10
+    series = tracker.get_timeseries(campaign_id, datetime.utcnow() - timedelta(hours=1))
+    assert sum(p.get("success", 0) for p in series["points"]) == 10
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from uuid import uuid4
+
+import pytest
+
+from marketing_bot.models.campaign import (
+    Campaign,
+    CampaignResult,
+    CampaignResultBatch,
+    CampaignStatus,
+    CampaignType,
+)
+from marketing_bot.repositories.campaign_repository import CampaignRepository
+from marketing_bot.repositories.factory import (
+    create_campaign_repository,
+    migrate_json_to_sqlite,
+)
+from marketing_bot.repositories.pagination import encode_cursor
+from marketing_bot.repositories.result_store import PartitionedResultStore
+from marketing_bot.repositories.sqlite_campaign_repository import (
+    SqliteCampaignRepository,
+)
+
+
+def _campaign(name: str = "Spring") -> Campaign:
+    return Campaign(
+        name=name,
+        campaign_type=CampaignType.EMAIL,
+        segment_name="champions",
+        product_name="Widget",
+        goal="Sell",
+        offer="10% off",
+    )
+
+
+@pytest.mark.asyncio
+async def test_sqlite_repository_round_trip(tmp_path):
+    repo = SqliteCampaignRepository(tmp_path / "campaigns.db")
+    campaign = await repo.create(_campaign())
+    await repo.create(_campaign("Other"))
+
+    campaign.status = CampaignStatus.ACTIVE
+    await repo.update(campaign)
+    await repo.save_results(
+        [
+            CampaignResult(
+                campaign_id=campaign.id,
+                customer_id=f"c{i}",
+                content_type="email",
+                content="hi",
+                metrics={"opens": i},
+            )
+            for i in range(3)
+        ]
+    )
+
+    loaded = await repo.get_by_id(campaign.id)
+    assert loaded.status == "active"
+    assert [c.name for c in await repo.list(CampaignStatus.ACTIVE)] == ["Spring"]
+    results = await repo.get_results(campaign.id)
+    assert [r.metrics["opens"] for r in results] == [0, 1, 2]
+    mode = repo._query("PRAGMA journal_mode")[0][0]
+    assert mode == "wal"
+
+
+@pytest.mark.asyncio
+async def test_migrate_json_repository_to_sqlite(tmp_path):
+    json_repo = CampaignRepository(tmp_path)
+    campaign = await json_repo.create(_campaign())
+    await json_repo.save_results(
+        [
+            CampaignResult(
+                campaign_id=campaign.id,
+                customer_id="c1",
+                content_type="email",
+                content="hi",
+            )
+        ]
+    )
+
+    assert migrate_json_to_sqlite(tmp_path) == {"campaigns": 1, "results": 1}
+    assert migrate_json_to_sqlite(tmp_path) == {"campaigns": 0, "results": 0}
+
+    repo = create_campaign_repository(tmp_path, backend="sqlite")
+    assert (await repo.get_by_id(campaign.id)).name == "Spring"
+    assert len(await repo.get_results(campaign.id)) == 1
+    assert json.loads((tmp_path / "campaigns.json").read_text())  # left in place
+
+
+def test_partitioned_results_append_compact_and_legacy_import(tmp_path):
+    a, b = str(uuid4()), str(uuid4())
+    legacy = tmp_path / "campaign_results.json"
+    legacy.write_text(json.dumps([{"id": "r1", "campaign_id": a, "status": "sent"}]))
+    store = PartitionedResultStore(tmp_path / "campaign_results")
+
+    assert store.import_legacy(legacy) == 1
+    assert not legacy.exists()
+    store.append(
+        [
+            {"id": "r2", "campaign_id": b, "status": "sent"},
+            {"id": "r1", "campaign_id": a, "status": "bounced"},
+        ]
+    )
+    with open(store.partition_path(a), "ab") as f:
+        f.write(b"{corrupt\n")
+
+    assert [r["id"] for r in store.read(b)] == ["r2"]
+    assert store.manifest()[a]["results"] == 2
+    assert not store.manifest_file.exists()  # saves only append manifest deltas
+
+    stats = store.compact()
+    assert stats == {"partitions": 2, "results": 2, "removed": 2}
+    assert store.read(a) == [{"id": "r1", "campaign_id": a, "status": "bounced"}]
+    assert store.manifest()[a]["results"] == 1
+    assert store.manifest_log.stat().st_size == 0
+    store.append([{"id": "r3", "campaign_id": b, "status": "sent"}])
+    assert PartitionedResultStore(store.directory).manifest()[b]["results"] == 2
+
+    with pytest.raises(ValueError):
+        store.partition_path("../../etc/passwd")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+async def test_keyset_pagination_filters_and_pages(tmp_path, backend):
+    repo = create_campaign_repository(tmp_path, backend=backend)
+    created = []
+    for i in range(7):
+        campaign = _campaign(f"c{i}")
+        campaign.status = CampaignStatus.ACTIVE if i % 2 == 0 else CampaignStatus.DRAFT
+        created.append(await repo.create(campaign))
+    await repo.save_results(
+        [
+            CampaignResult(
+                campaign_id=created[0].id,
+                customer_id=f"u{i}",
+                content_type="email",
+                content="hi",
+            )
+            for i in range(5)
+        ]
+    )
+
+    names, cursor = [], None
+    while True:
+        page, cursor = await repo.list_page(CampaignStatus.ACTIVE, 2, cursor)
+        names.extend(c.name for c in page)
+        if cursor is None:
+            break
+    assert names == ["c0", "c2", "c4", "c6"]
+
+    first, cursor = await repo.results_page(created[0].id, limit=3)
+    rest, end = await repo.results_page(created[0].id, limit=3, cursor=cursor)
+    assert [r["customer_id"] for r in first + rest] == [f"u{i}" for i in range(5)]
+    assert end is None
+
+
+def test_results_endpoint_streams_ndjson(tmp_path):
+    from fastapi.testclient import TestClient
+
+    from marketing_bot.api import app, get_campaign_repo, get_metrics_tracker
+    from marketing_bot.metrics.tracker import MetricsTracker
+
+    repo = CampaignRepository(tmp_path)
+    campaign_id = _campaign().id
+    repo.results.append(
+        {"id": str(i), "campaign_id": str(campaign_id), "customer_id": f"u{i}"}
+        for i in range(2500)
+    )
+    app.dependency_overrides[get_campaign_repo] = lambda: repo
+    app.dependency_overrides[get_metrics_tracker] = lambda: MetricsTracker(tmp_path)
+    try:
+        client = TestClient(app)
+        response = client.get(f"/campaigns/{campaign_id}/results?format=ndjson")
+        page = client.get(f"/campaigns/{campaign_id}/results?limit=10").json()
+        bad = client.get(f"/campaigns/{campaign_id}/results?cursor=%%%")
+        # Cursors of the other listing are rejected before streaming starts
+        campaigns_cursor = encode_cursor("2025-01-01T00:00:00", str(campaign_id))
+        foreign = [
+            client.get(f"/campaigns?format=ndjson&cursor={page['next_cursor']}"),
+            client.get(
+                f"/campaigns/{campaign_id}/results?format=ndjson"
+                f"&cursor={campaigns_cursor}"
+            ),
+        ]
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert len(lines) == 2500
+    assert json.loads(lines[-1])["customer_id"] == "u2499"
+    assert len(page["results"]) == 10 and page["next_cursor"]
+    assert bad.status_code == 400
+    assert [r.status_code for r in foreign] == [400, 400]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+async def test_campaign_cache_writes_through_and_sees_external_writes(
+    tmp_path, backend
+):
+    repo = create_campaign_repository(tmp_path, backend=backend)
+    campaign = await repo.create(_campaign())
+    cache = repo._cache
+
+    hits = cache.hits
+    assert (await repo.get_by_id(campaign.id)).name == "Spring"
+    campaign.name = "Summer"
+    await repo.update(campaign)
+    assert (await repo.get_by_id(campaign.id)).name == "Summer"
+    assert cache.hits == hits + 2  # both served without reading the store
+
+    # Another process rewrites the store behind our back
+    if backend == "json":
+        records = json.loads(repo.campaigns_file.read_text())
+        records[0]["name"] = "Autumn sale"
+        repo.campaigns_file.write_text(json.dumps(records))
+    else:
+        with sqlite3.connect(repo.db_path) as other:
+            other.execute("UPDATE campaigns SET name = 'Autumn sale'")
+
+    assert (await repo.get_by_id(campaign.id)).name == "Autumn sale"
+    assert cache.misses >= 1
+
+
+@pytest.mark.asyncio
+async def test_json_cache_sees_same_size_rewrite_in_same_mtime_tick(tmp_path):
+    repo = create_campaign_repository(tmp_path, backend="json")
+    campaign = await repo.create(_campaign())
+    assert (await repo.get_by_id(campaign.id)).name == "Spring"
+    before = repo.campaigns_file.stat()
+
+    # Another process swaps in a same-size file with an identical mtime
+    records = json.loads(repo.campaigns_file.read_text())
+    records[0]["name"] = "Sprang"
+    other = tmp_path / "other.json"
+    other.write_text(json.dumps(records, indent=2, default=str))
+    assert other.stat().st_size == before.st_size
+    os.utime(other, ns=(before.st_atime_ns, before.st_mtime_ns))
+    os.replace(other, repo.campaigns_file)
+
+    assert (await repo.get_by_id(campaign.id)).name == "Sprang"
+    assert not list(tmp_path.glob("campaigns.json.*.tmp"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+async def test_save_result_batch_round_trips_to_models(tmp_path, backend):
+    repo = create_campaign_repository(tmp_path, backend=backend)
+    campaign = _campaign()
+    batch = CampaignResultBatch(campaign_id=campaign.id)
+    for i in range(3):
+        batch.add(f"u{i}", "email", f"hello {i}", sent_at=1_700_000_000 + i)
+    batch.add("u3", "social", "post", metrics={"clicks": 2}, sent_at=1_700_000_003)
+
+    await repo.save_result_batch(batch)
+
+    results = await repo.get_results(campaign.id)
+    assert [r.customer_id for r in results] == ["u0", "u1", "u2", "u3"]
+    assert results[3].metrics == {"clicks": 2}
+    assert len({r.id for r in results}) == 4
+    assert [r.model_dump() for r in batch.to_models()] == [
+        r.model_dump() for r in results
+    ]
+
+
+def test_result_batch_validates_once_per_batch():
+    batch = CampaignResultBatch(campaign_id=_campaign().id)
+    batch.add("u0", "email", "hi")
+    batch.add("u1", "fax", "hi", status="lost")
+    with pytest.raises(ValueError, match="fax"):
+        batch.validate()
+    batch.contents.pop()
+    with pytest.raises(ValueError, match="Ragged"):
+        batch.validate()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+import pytest
+
+from marketing_bot.scheduling.dispatcher import (
+    DispatchScheduler,
+    ManualClock,
+    ScheduledSend,
+    ScheduleStore,
+    SendWindow,
+    plan_send_window,
+)
+
+# 2025-06-02 07:00 UTC
+START = datetime(2025, 6, 2, 7, 0, tzinfo=timezone.utc).timestamp()
+
+
+def test_plan_spreads_recipients_over_local_window():
+    window = SendWindow.parse("08:00-10:00")
+    recipients = [(f"u{i}@example.com", None) for i in range(4)] + [
+        ("ny@example.com", "America/New_York")
+    ]
+
+    jobs = plan_send_window("c1", recipients, window, bucket_seconds=3600, after=START)
+
+    utc_hours = [datetime.fromtimestamp(j.due_at, timezone.utc).hour for j in jobs]
+    assert utc_hours[:4] == [8, 9, 8, 9]
+    # 08:00 in New York (EDT) is 12:00 UTC
+    assert utc_hours[4] == 12
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+@pytest.mark.asyncio
+async def test_schedule_campaign_uses_contact_timezones(tmp_path, backend, monkeypatch):
+    from marketing_bot.services.email_campaign_service import EmailCampaignService
+
+    monkeypatch.setattr("marketing_bot.config.settings.EMAIL_DB_BACKEND", backend)
+    service = EmailCampaignService(tmp_path)
+    source = tmp_path / "in.csv"
+    pd.DataFrame(
+        [
+            {"email": "kyiv@example.com", "segment": "vip", "timezone": "Europe/Kyiv"},
+            {"email": "la@example.com", "segment": "vip", "timezone": "US/Pacific"},
+            {"email": "odd@example.com", "segment": "vip", "timezone": "Nowhere/X"},
+        ]
+    ).to_csv(source, index=False)
+    service.db.add_contacts_from_csv(source)
+    campaign_id = await service.create_campaign("Spring", "Hi", "Body", "vip")
+
+    class Capture:
+        def schedule(self, jobs):
+            self.jobs = {job.recipient: job.due_at for job in jobs}
+            return len(jobs)
+
+    dispatcher = Capture()
+    window = SendWindow.parse("08:00-09:00", "UTC")
+    assert service.schedule_campaign(campaign_id, window, dispatcher=dispatcher) == 3
+
+    def local_hour(email, zone):
+        return datetime.fromtimestamp(dispatcher.jobs[email], ZoneInfo(zone)).hour
+
+    assert local_hour("kyiv@example.com", "Europe/Kyiv") == 8
+    assert local_hour("la@example.com", "US/Pacific") == 8
+    assert local_hour("odd@example.com", "UTC") == 8
+    assert dispatcher.jobs["kyiv@example.com"] != dispatcher.jobs["la@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_releases_at_rate_and_survives_restart(tmp_path):
+    clock = ManualClock(START)
+    window = SendWindow.parse("08:00-08:10")
+    jobs = plan_send_window(
+        "c1",
+        [(f"u{i}@example.com", None) for i in range(6)],
+        window,
+        bucket_seconds=300,
+        after=START,
+    )
+
+    first = DispatchScheduler(ScheduleStore(tmp_path), rate_per_second=1, clock=clock)
+    first.schedule(jobs)
+
+    # Simulate a restart before anything was sent
+    dispatcher = DispatchScheduler(
+        ScheduleStore(tmp_path), rate_per_second=1, clock=clock
+    )
+    assert dispatcher.pending() == 6
+
+    sent = []
+
+    async def handler(job):
+        sent.append((clock.now(), job.recipient))
+
+    dispatcher.register("email", handler)
+    assert await dispatcher.run() == 6
+
+    times = [t - START for t, _ in sent]
+    # Three sends per bucket (08:00 and 08:05), paced at one per second
+    assert times[:3] == [3600, 3601, 3602]
+    assert times[3] == 3900
+    assert dispatcher.pending() == 0
+    assert ScheduleStore(tmp_path).load() == []
+
+
+def test_schedule_store_poll_skips_corrupt_lines_and_follows_compaction(tmp_path):
+    reader, writer = ScheduleStore(tmp_path), ScheduleStore(tmp_path)
+    reader.load()
+
+    def job(n):
+        return ScheduledSend("c1", "email", f"u{n}@example.com", START, job_id=f"j{n}")
+
+    writer.add([job(0)])
+    with open(writer.journal_file, "a") as f:
+        f.write('{"op": "add", "campa\n')
+    writer.add([job(1)])
+    added, done = reader.poll()
+    assert [j.job_id for j in added] == ["j0", "j1"] and done == []
+
+    # The compacted journal is longer than the reader's old offset
+    writer.add([job(n) for n in range(2, 8)])
+    writer.mark_done("j0")
+    writer.compact()
+    added, done = reader.poll()
+    assert sorted(j.job_id for j in added) == [f"j{n}" for n in range(1, 8)]
+    assert reader.poll() == ([], [])
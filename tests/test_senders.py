@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import smtplib
+from dataclasses import dataclass
+
+import pytest
+
+from marketing_bot.senders.throttle import DomainThrottle, TokenBucket, is_deferral
+
+
+@dataclass
+class _Contact:
+    email: str
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_token_bucket_refills_at_rate():
+    clock = _FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=1, clock=clock)
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.time_until_available() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.try_acquire()
+
+
+def test_is_deferral_only_for_transient_codes():
+    assert is_deferral(smtplib.SMTPResponseException(421, b"try later"))
+    assert not is_deferral(smtplib.SMTPResponseException(550, b"no such user"))
+    assert not is_deferral(ValueError("boom"))
+
+
+@pytest.mark.asyncio
+async def test_throttle_interleaves_domains_and_backs_off():
+    clock = _FakeClock()
+    throttle = DomainThrottle(
+        rate_per_second=1.0,
+        burst=1,
+        backoff_seconds=10.0,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    contacts = [_Contact(f"u{i}@gmail.com") for i in range(3)] + [
+        _Contact(f"u{i}@outlook.com") for i in range(3)
+    ]
+
+    order = []
+    deferred_once = False
+    async for contact in throttle.schedule(contacts):
+        order.append(contact.email.split("@")[1])
+        if contact.email == "u0@outlook.com" and not deferred_once:
+            deferred_once = True
+            assert throttle.record_deferral(contact)
+            continue
+        throttle.record_sent(contact)
+
+    assert len(order) == 7
+    # Both domains are served before either sends its second message
+    assert set(order[:2]) == {"gmail.com", "outlook.com"}
+
+    stats = throttle.stats()
+    assert stats["gmail.com"]["sent"] == 3
+    assert stats["outlook.com"]["sent"] == 3
+    assert stats["outlook.com"]["deferred"] == 1
+    # The deferred domain paid at least its backoff on top of pacing
+    assert clock.now >= 10.0
+
+
+def test_prepared_email_stamps_recipient_headers():
+    from email import message_from_bytes, policy
+
+    from marketing_bot.senders.email_sender import prepare_email
+
+    prepared = prepare_email(
+        "Hello", "Line one\nLine two", "Marketing Bot", "marketing@example.com"
+    )
+    first = message_from_bytes(prepared.render_for("a@x.com"), policy=policy.SMTP)
+    second = message_from_bytes(prepared.render_for("b@y.com"), policy=policy.SMTP)
+
+    assert first["To"] == "a@x.com"
+    assert first["Subject"] == "Hello"
+    assert first["Message-ID"] != second["Message-ID"]
+    html = first.get_body(preferencelist=("html",)).get_content()
+    assert "Line one<br>Line two" in html
+    assert (
+        second.get_body(preferencelist=("plain",)).get_content().startswith("Line one")
+    )
+
+
+@pytest.mark.parametrize(
+    "address", ["a@x.com\r\nBcc: all@x.com", "a@x.com\nX-Evil: 1", "a\x00@x.com"]
+)
+def test_prepared_email_rejects_header_injection(address):
+    from marketing_bot.senders.email_sender import prepare_email
+
+    prepared = prepare_email("Hello", "Body", "Marketing Bot", "marketing@example.com")
+    with pytest.raises(ValueError):
+        prepared.render_for(address)
+    with pytest.raises(ValueError):
+        prepared.render_for("ünï@x.com\r\nBcc: all@x.com")
+
+
+@pytest.mark.asyncio
+async def test_publisher_posts_concurrently_and_retries_throttling():
+    from marketing_bot.senders.social_mock_server import MockSocialServer
+    from marketing_bot.senders.social_publisher import (
+        FacebookAdapter,
+        SocialPublisher,
+        TwitterAdapter,
+    )
+    from marketing_bot.senders.social_sender import SocialPost
+
+    async def no_sleep(seconds: float) -> None:
+        pass
+
+    with MockSocialServer(fail_first=1) as server:
+        publisher = SocialPublisher(
+            default_rate_per_sec=1000.0, retry_delay=0.0, sleep=no_sleep
+        )
+        publisher.register(TwitterAdapter("token", server.url))
+        publisher.register(FacebookAdapter("page-1", "token", server.url))
+        publisher.register(FacebookAdapter("page-2", "token", server.url), "brand")
+
+        results = await publisher.publish_many(
+            [
+                SocialPost(platform="twitter", content="hello"),
+                SocialPost(platform="facebook", content="hello"),
+                SocialPost(platform="facebook", content="hi", account="brand"),
+                SocialPost(platform="mastodon", content="nope"),
+            ]
+        )
+
+    assert [r.success for r in results] == [True, True, True, False]
+    assert sum(r.attempts for r in results[:3]) == 4  # one 429 was retried
+    paths = sorted(request["path"] for request in server.requests)
+    assert paths == ["/2/tweets", "/page-1/feed", "/page-2/feed"]
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_reuses_bounded_drivers():
+    import asyncio
+
+    from marketing_bot.senders.browser_pool import BrowserPool
+
+    created = []
+
+    def factory():
+        created.append(object())
+        return created[-1]
+
+    pool = BrowserPool(size=2, driver_factory=factory)
+    drivers = await asyncio.gather(*(pool.run(lambda d, i: d, i) for i in range(10)))
+    pool.close()
+
+    assert len(created) <= 2
+    assert set(map(id, drivers)) <= set(map(id, created))